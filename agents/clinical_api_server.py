@@ -0,0 +1,444 @@
+"""
+Clinical Decision Support - Headless HTTP API
+Serves the clinical agent over HTTP so it can be driven from any frontend and
+placed behind a load balancer. One process hosts many chat sessions; each
+session owns its own agent (and therefore its own conversation memory).
+
+Endpoints:
+    GET    /health                       Liveness + load information
+    POST   /sessions                     Create a session  {"patient": {...}}
+    POST   /sessions/{id}/messages       Chat turn         {"message": "...", "stream": true}
+    DELETE /sessions/{id}                End a session
+
+Chat turns stream back as Server-Sent Events:
+    event: token   data: {"text": "..."}
+    event: done    data: {"response": "...", "elapsed_seconds": 1.2}
+    event: error   data: {"error": "..."}
+
+Run it with:
+    python agents/clinical_api_server.py --port 8080
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from urllib.parse import urlsplit
+
+MAX_BODY_BYTES = 1024 * 1024
+HEADER_READ_TIMEOUT = 30.0
+
+HTTP_REASONS = {
+    200: "OK",
+    201: "Created",
+    204: "No Content",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+
+class HttpError(Exception):
+    """An error that maps directly onto an HTTP error response."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def default_agent_factory():
+    """Build a clinical agent that doesn't print to stdout."""
+    from clinical_tools import create_clinical_agent
+    return create_clinical_agent(callback_handler=None)
+
+
+def patient_context(patient: dict) -> str:
+    """Same patient context suffix the Streamlit app adds to each message."""
+    if not patient:
+        return ""
+    return (f"\n\n[Patient Context: Name: {patient.get('name')}, "
+            f"Age: {patient.get('age')}, Gender: {patient.get('gender')}]")
+
+
+# ============================================================================
+# SESSIONS
+# ============================================================================
+
+class ChatSession:
+    """One conversation: its agent, patient details and a turn lock."""
+
+    def __init__(self, session_id: str, agent, patient: dict = None):
+        self.session_id = session_id
+        self.agent = agent
+        self.patient = patient
+        # Strands agents can't run two invocations at once
+        self.lock = asyncio.Lock()
+        self.created_at = time.time()
+        self.last_active = time.monotonic()
+        self.turns = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "patient": self.patient,
+            "turns": self.turns,
+            "created_at": self.created_at
+        }
+
+
+class ClinicalChatService:
+    """Session registry plus the concurrency and timeout policy for chat turns."""
+
+    def __init__(self, agent_factory=None, max_sessions: int = 1000,
+                 max_concurrent_turns: int = 8, turn_timeout: float = 60.0,
+                 queue_timeout: float = 5.0, session_ttl: float = 1800.0):
+        self.agent_factory = agent_factory or default_agent_factory
+        self.max_sessions = max_sessions
+        self.max_concurrent_turns = max_concurrent_turns
+        self.turn_timeout = turn_timeout
+        self.queue_timeout = queue_timeout
+        self.session_ttl = session_ttl
+        self.sessions = {}
+        self.active_turns = 0
+        self._turn_slots = asyncio.Semaphore(max_concurrent_turns)
+
+    async def create_session(self, patient: dict = None) -> ChatSession:
+        self.expire_idle_sessions()
+        if len(self.sessions) >= self.max_sessions:
+            raise HttpError(503, "Too many active sessions, try again later")
+
+        # Agent construction is synchronous; keep it off the event loop
+        agent = await asyncio.to_thread(self.agent_factory)
+        session = ChatSession(uuid.uuid4().hex, agent, patient)
+        self.sessions[session.session_id] = session
+        return session
+
+    def get_session(self, session_id: str) -> ChatSession:
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise HttpError(404, f"Session '{session_id}' not found")
+        return session
+
+    def close_session(self, session_id: str):
+        if self.sessions.pop(session_id, None) is None:
+            raise HttpError(404, f"Session '{session_id}' not found")
+
+    def expire_idle_sessions(self):
+        """Drop sessions that have been idle for longer than session_ttl."""
+        cutoff = time.monotonic() - self.session_ttl
+        expired = [sid for sid, s in self.sessions.items()
+                   if s.last_active < cutoff and not s.lock.locked()]
+        for sid in expired:
+            del self.sessions[sid]
+
+    async def stream_turn(self, session: ChatSession, message: str):
+        """
+        Run one chat turn, yielding (event, data) pairs.
+
+        Rejects the turn if the session is already mid-turn or if no turn slot
+        frees up within queue_timeout; gives up once turn_timeout elapses.
+        """
+        if session.lock.locked():
+            raise HttpError(409, "This session is already processing a message")
+
+        try:
+            await asyncio.wait_for(self._turn_slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise HttpError(503, "Server is at capacity, try again later")
+
+        try:
+            async with session.lock:
+                self.active_turns += 1
+                session.last_active = time.monotonic()
+                try:
+                    async for event in self._run_agent(session, message):
+                        yield event
+                finally:
+                    self.active_turns -= 1
+                    session.turns += 1
+                    session.last_active = time.monotonic()
+        finally:
+            self._turn_slots.release()
+
+    async def _run_agent(self, session: ChatSession, message: str):
+        start = time.monotonic()
+        deadline = start + self.turn_timeout
+        prompt = message + patient_context(session.patient)
+        events = asyncio.Queue()
+
+        # The agent stream must be consumed from a single task: strands keeps
+        # tracing context in contextvars that can't cross task boundaries
+        async def pump():
+            try:
+                async for event in session.agent.stream_async(prompt):
+                    await events.put(("event", event))
+                await events.put(("end", None))
+            except Exception as e:
+                await events.put(("failed", e))
+
+        producer = asyncio.create_task(pump())
+        chunks = []
+        result = None
+
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                kind, event = await asyncio.wait_for(events.get(), remaining)
+                if kind == "end":
+                    break
+                if kind == "failed":
+                    yield "error", {"error": f"I encountered an issue: {str(event)}"}
+                    return
+
+                if "data" in event and event["data"]:
+                    chunks.append(event["data"])
+                    yield "token", {"text": event["data"]}
+                elif "result" in event:
+                    result = event["result"]
+        except asyncio.TimeoutError:
+            yield "error", {"error": f"Response timed out after {self.turn_timeout:g} seconds"}
+            return
+        finally:
+            if not producer.done():
+                producer.cancel()
+                try:
+                    await producer
+                except asyncio.CancelledError:
+                    pass
+
+        response = "".join(chunks) if chunks else str(result or "")
+        yield "done", {
+            "response": response,
+            "elapsed_seconds": round(time.monotonic() - start, 3)
+        }
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "sessions": len(self.sessions),
+            "active_turns": self.active_turns,
+            "max_concurrent_turns": self.max_concurrent_turns
+        }
+
+
+# ============================================================================
+# HTTP LAYER
+# ============================================================================
+
+class Request:
+    def __init__(self, method: str, path: str, headers: dict, body: bytes):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+
+    def json(self) -> dict:
+        if not self.body:
+            return {}
+        try:
+            data = json.loads(self.body)
+        except ValueError:
+            raise HttpError(400, "Request body must be valid JSON")
+        if not isinstance(data, dict):
+            raise HttpError(400, "Request body must be a JSON object")
+        return data
+
+
+async def read_request(reader: asyncio.StreamReader) -> Request:
+    request_line = await asyncio.wait_for(reader.readline(), HEADER_READ_TIMEOUT)
+    if not request_line:
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(400, "Malformed request line")
+
+    headers = {}
+    while True:
+        line = await asyncio.wait_for(reader.readline(), HEADER_READ_TIMEOUT)
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY_BYTES:
+        raise HttpError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return Request(method.upper(), urlsplit(target).path, headers, body)
+
+
+class ApiServer:
+    """Routes HTTP requests to a ClinicalChatService."""
+
+    def __init__(self, service: ClinicalChatService, cors_origin: str = None):
+        self.service = service
+        self.cors_origin = cors_origin
+
+    def _headers(self, content_type: str, extra: dict = None) -> dict:
+        headers = {"Content-Type": content_type, "Connection": "close"}
+        if self.cors_origin:
+            headers["Access-Control-Allow-Origin"] = self.cors_origin
+        headers.update(extra or {})
+        return headers
+
+    async def _write_head(self, writer, status: int, headers: dict):
+        lines = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+    async def send_json(self, writer, status: int, payload):
+        body = b"" if payload is None else json.dumps(payload).encode()
+        headers = self._headers("application/json", {"Content-Length": str(len(body))})
+        await self._write_head(writer, status, headers)
+        writer.write(body)
+        await writer.drain()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            try:
+                request = await read_request(reader)
+                if request is not None:
+                    await self.dispatch(request, writer)
+            except HttpError as e:
+                await self.send_json(writer, e.status, {"error": e.message})
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+                await self.send_json(writer, 400, {"error": "Incomplete request"})
+        except ConnectionError:
+            pass
+        except Exception as e:
+            try:
+                await self.send_json(writer, 500, {"error": str(e)})
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, request: Request, writer):
+        parts = [p for p in request.path.split("/") if p]
+
+        if request.method == "OPTIONS":
+            await self._write_head(writer, 204, self._headers("text/plain", {
+                "Access-Control-Allow-Methods": "GET, POST, DELETE, OPTIONS",
+                "Access-Control-Allow-Headers": "Content-Type",
+                "Content-Length": "0"
+            }))
+            return
+
+        if parts == ["health"] and request.method == "GET":
+            await self.send_json(writer, 200, self.service.health())
+        elif parts == ["sessions"] and request.method == "POST":
+            session = await self.service.create_session(request.json().get("patient"))
+            await self.send_json(writer, 201, session.to_dict())
+        elif len(parts) == 2 and parts[0] == "sessions":
+            if request.method == "GET":
+                await self.send_json(writer, 200, self.service.get_session(parts[1]).to_dict())
+            elif request.method == "DELETE":
+                self.service.close_session(parts[1])
+                await self.send_json(writer, 204, None)
+            else:
+                raise HttpError(405, "Method not allowed")
+        elif len(parts) == 3 and parts[0] == "sessions" and parts[2] == "messages":
+            if request.method != "POST":
+                raise HttpError(405, "Method not allowed")
+            await self.handle_message(request, parts[1], writer)
+        else:
+            raise HttpError(404, "Not found")
+
+    async def handle_message(self, request: Request, session_id: str, writer):
+        session = self.service.get_session(session_id)
+        payload = request.json()
+        message = str(payload.get("message", "")).strip()
+        if not message:
+            raise HttpError(400, "'message' is required")
+
+        turn = self.service.stream_turn(session, message)
+        # Pull the first event before committing to a status code, so
+        # capacity and busy-session errors still come back as plain HTTP errors
+        first = await turn.__anext__()
+
+        if not payload.get("stream", True):
+            events = [first] + [event async for event in turn]
+            event, data = events[-1]
+            status = 200 if event == "done" else 504 if "timed out" in data["error"] else 500
+            await self.send_json(writer, status, data)
+            return
+
+        await self._write_head(writer, 200, self._headers("text/event-stream", {
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }))
+        try:
+            await self._send_event(writer, *first)
+            async for event, data in turn:
+                await self._send_event(writer, event, data)
+        finally:
+            # Closing the generator ends the agent stream if the client left early
+            await turn.aclose()
+
+    async def _send_event(self, writer, event: str, data: dict):
+        writer.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode())
+        await writer.drain()
+
+
+async def serve(service: ClinicalChatService, host: str = "127.0.0.1", port: int = 8080,
+                cors_origin: str = None):
+    """Start the API server and run until cancelled."""
+    api = ApiServer(service, cors_origin=cors_origin)
+    server = await asyncio.start_server(api.handle_connection, host, port)
+
+    async def reap_sessions():
+        while True:
+            await asyncio.sleep(60)
+            service.expire_idle_sessions()
+
+    reaper = asyncio.create_task(reap_sessions())
+    print(f"Clinical API listening on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        reaper.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless HTTP API for the clinical agent")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-sessions", type=int, default=1000)
+    parser.add_argument("--max-concurrent-turns", type=int, default=8)
+    parser.add_argument("--turn-timeout", type=float, default=60.0, help="seconds per chat turn")
+    parser.add_argument("--queue-timeout", type=float, default=5.0,
+                        help="seconds to wait for a free turn slot before returning 503")
+    parser.add_argument("--session-ttl", type=float, default=1800.0, help="idle seconds before a session expires")
+    parser.add_argument("--cors-origin", help="value for Access-Control-Allow-Origin")
+    args = parser.parse_args()
+
+    # Import strands and the tools now rather than on the first request
+    default_agent_factory()
+
+    service = ClinicalChatService(
+        max_sessions=args.max_sessions,
+        max_concurrent_turns=args.max_concurrent_turns,
+        turn_timeout=args.turn_timeout,
+        queue_timeout=args.queue_timeout,
+        session_ttl=args.session_ttl
+    )
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.cors_origin))
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+
+
+if __name__ == "__main__":
+    main()
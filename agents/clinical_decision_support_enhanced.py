@@ -4,134 +4,15 @@ Integrates RxNorm API for real drug information and interactions
 """
 
 from strands import Agent, tool
-import requests
 from datetime import datetime
 import json
 
-# ============================================================================
-# REAL MEDICAL DATA TOOLS (RxNorm API)
-# ============================================================================
-
-@tool
-def get_real_drug_info(drug_name: str) -> dict:
-    """Get real drug information from RxNorm API (NIH)."""
-    try:
-        # Search for drug
-        search_url = f"https://rxnav.nlm.nih.gov/REST/drugs.json?name={drug_name}"
-        search_response = requests.get(search_url, timeout=5)
-        search_data = search_response.json()
-        
-        if not search_data.get('drugGroup', {}).get('conceptGroup'):
-            return {"error": f"Drug '{drug_name}' not found in RxNorm database"}
-        
-        # Get first result
-        concept = search_data['drugGroup']['conceptGroup'][0]['conceptProperties'][0]
-        rxcui = concept['rxcui']
-        
-        # Get drug properties
-        props_url = f"https://rxnav.nlm.nih.gov/REST/rxcui/{rxcui}/properties.json"
-        props_response = requests.get(props_url, timeout=5)
-        props_data = props_response.json()
-        
-        return {
-            "name": concept['name'],
-            "rxcui": rxcui,
-            "tty": concept['tty'],
-            "found": True,
-            "source": "RxNorm (NIH)"
-        }
-    except Exception as e:
-        return {"error": str(e), "found": False}
-
-
-@tool
-def check_real_drug_interactions(drug_names: list[str]) -> dict:
-    """Check real drug interactions from RxNorm API."""
-    try:
-        # Get RXCUIs for all drugs
-        rxcuis = []
-        drug_info = {}
-        
-        for drug in drug_names:
-            search_url = f"https://rxnav.nlm.nih.gov/REST/drugs.json?name={drug}"
-            response = requests.get(search_url, timeout=5)
-            data = response.json()
-            
-            if data.get('drugGroup', {}).get('conceptGroup'):
-                concept = data['drugGroup']['conceptGroup'][0]['conceptProperties'][0]
-                rxcui = concept['rxcui']
-                rxcuis.append(rxcui)
-                drug_info[drug] = concept['name']
-        
-        if len(rxcuis) < 2:
-            return {
-                "safe": True,
-                "interactions": [],
-                "note": "Need at least 2 valid drugs to check interactions"
-            }
-        
-        # Check interactions
-        interaction_url = "https://rxnav.nlm.nih.gov/REST/interaction/list.json"
-        params = {"rxcuis": "+".join(rxcuis)}
-        response = requests.get(interaction_url, params=params, timeout=5)
-        interaction_data = response.json()
-        
-        interactions = []
-        if 'fullInteractionTypeGroup' in interaction_data:
-            for group in interaction_data['fullInteractionTypeGroup']:
-                for interaction in group.get('fullInteractionType', []):
-                    for pair in interaction.get('interactionPair', []):
-                        interactions.append({
-                            "drugs": [pair['interactionConcept'][0]['sourceConceptItem']['name'],
-                                     pair['interactionConcept'][1]['sourceConceptItem']['name']],
-                            "severity": pair.get('severity', 'Unknown'),
-                            "description": pair.get('description', 'No description available')
-                        })
-        
-        return {
-            "safe": len(interactions) == 0,
-            "interactions": interactions,
-            "drugs_checked": drug_info,
-            "source": "RxNorm (NIH)"
-        }
-    except Exception as e:
-        return {"error": str(e), "safe": True, "interactions": []}
-
-
-@tool
-def get_drug_adverse_events(drug_name: str) -> dict:
-    """Get real adverse events from OpenFDA API."""
-    try:
-        url = "https://api.fda.gov/drug/event.json"
-        params = {
-            "search": f'patient.drug.openfda.generic_name:"{drug_name}"',
-            "limit": 5,
-            "count": "patient.reaction.reactionmeddrapt.exact"
-        }
-        response = requests.get(url, params=params, timeout=5)
-        data = response.json()
-        
-        if 'results' in data and data['results']:
-            adverse_events = []
-            for result in data['results'][:5]:
-                adverse_events.append({
-                    "reaction": result.get('term', 'Unknown'),
-                    "count": result.get('count', 0)
-                })
-            
-            return {
-                "drug": drug_name,
-                "adverse_events": adverse_events,
-                "source": "OpenFDA"
-            }
-        return {
-            "drug": drug_name,
-            "adverse_events": [],
-            "note": "No adverse event data found"
-        }
-    except Exception as e:
-        return {"error": str(e)}
-
+# Real medical data tools (RxNorm / OpenFDA)
+from medical_api_tools import (
+    get_real_drug_info,
+    check_real_drug_interactions,
+    get_drug_adverse_events
+)
 
 # ============================================================================
 # ORIGINAL TOOLS (Kept for compatibility)
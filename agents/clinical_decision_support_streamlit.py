@@ -305,6 +305,73 @@ def get_agent():
     )
 
 
+# ============================================================================
+# CHAT HISTORY
+# ============================================================================
+
+# Only the latest page of messages is rendered on each rerun; older messages
+# are loaded a page at a time on demand, so reruns don't slow down as the
+# conversation grows.
+HISTORY_PAGE_SIZE = 20
+
+
+def format_message_markdown(content):
+    """Prepare message text for st.markdown (runs once per message, not per rerun)."""
+    # Streamlit renders $...$ as LaTeX, so escape dollar signs in chat text
+    text = content.replace("$", "\\$")
+    # Keep the agent's line breaks instead of collapsing them into one paragraph
+    return text.replace("\n", "  \n")
+
+
+def add_message(role, content, kind="text"):
+    """Append a message to the chat history along with its rendered markdown.
+
+    kind is "text" or "error"; errors are redrawn with st.error on reruns.
+    """
+    st.session_state.messages.append({
+        "role": role,
+        "content": content,
+        "kind": kind,
+        "markdown": format_message_markdown(content)
+    })
+
+
+def render_message(message):
+    """Draw one history message in its chat bubble."""
+    # Messages stored before "markdown"/"kind" were added only have role/content
+    container = st.chat_message(message["role"])
+    markdown = message.get("markdown", message["content"])
+    if message.get("kind") == "error":
+        container.error(markdown)
+    else:
+        container.markdown(markdown)
+
+
+def load_older_messages():
+    """Widen the history window by one page."""
+    st.session_state.history_window += HISTORY_PAGE_SIZE
+
+
+# A fragment, so paging in older messages only redraws the history
+@st.fragment
+def render_chat_history():
+    """Render the most recent messages, with a button to page in older ones."""
+    messages = st.session_state.messages
+    window = st.session_state.history_window
+    hidden = len(messages) - window
+    
+    if hidden > 0:
+        st.button(
+            f"⬆️ Load older messages ({hidden} hidden)",
+            on_click=load_older_messages,
+            use_container_width=True,
+            key="btn_load_older"
+        )
+    
+    for message in messages[-window:]:
+        render_message(message)
+
+
 # ============================================================================
 # STREAMLIT UI
 # ============================================================================
@@ -312,6 +379,8 @@ def get_agent():
 # Initialize session state FIRST (before any UI elements)
 if "messages" not in st.session_state:
     st.session_state.messages = []
+if "history_window" not in st.session_state:
+    st.session_state.history_window = HISTORY_PAGE_SIZE
 if "agent" not in st.session_state:
     st.session_state.agent = get_agent()
 if "patient" not in st.session_state:
@@ -396,6 +465,7 @@ if st.session_state.patient:
     if st.button("🔄 Change Patient"):
         st.session_state.patient = None
         st.session_state.messages = []
+        st.session_state.history_window = HISTORY_PAGE_SIZE
         st.session_state.show_registration = True
         st.rerun()
     
@@ -432,20 +502,16 @@ with st.sidebar:
 # Chat display
 st.markdown("### 💬 Conversation")
 
-# Display chat history
-for message in st.session_state.messages:
-    if message["role"] == "user":
-        st.chat_message("user").write(message["content"])
-    else:
-        st.chat_message("assistant").write(message["content"])
+# Display chat history (latest page only)
+render_chat_history()
 
 # Chat input
 user_input = st.chat_input("Tell me about your health concern...")
 
 if user_input:
     # Add user message to history
-    st.session_state.messages.append({"role": "user", "content": user_input})
-    st.chat_message("user").write(user_input)
+    add_message("user", user_input)
+    render_message(st.session_state.messages[-1])
     
     # Get agent response
     with st.spinner("Thinking..."):
@@ -458,15 +524,15 @@ if user_input:
             
             full_input = user_input + patient_context
             response = process_agent_request(full_input, st.session_state.agent)
-            st.session_state.messages.append({"role": "assistant", "content": response})
+            add_message("assistant", response)
             
             # Stream the response
             with st.chat_message("assistant"):
                 stream_response(response)
         except Exception as e:
             error_msg = f"I encountered an issue: {str(e)}"
-            st.session_state.messages.append({"role": "assistant", "content": error_msg})
-            st.chat_message("assistant").error(error_msg)
+            add_message("assistant", error_msg, kind="error")
+            render_message(st.session_state.messages[-1])
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,357 @@
+"""
+Mock Medical APIs - Local RxNav, OpenFDA and SNOMED Stand-in
+Serves RxNorm, OpenFDA and SNOMED CT responses over HTTP with injectable
+latency and error rates, so the medical API tools can be benchmarked and
+regression-tested offline and deterministically.
+
+Responses come from, in order:
+    1. The real upstream API, when recording (--record); every response is
+       saved to the fixture file, replacing any fixture under the same key
+    2. Fixtures (fixtures/medical_api_fixtures.json by default). The shipped
+       file holds synthetic fixtures; each entry's "source" says whether it
+       is "synthetic" or "recorded" from the live APIs
+    3. Synthetic canned responses below, unless --strict
+
+Point the tools at it with:
+    RXNAV_BASE_URL=http://127.0.0.1:8790/REST
+    OPENFDA_BASE_URL=http://127.0.0.1:8790
+    SNOMED_BASE_URL=http://127.0.0.1:8790
+
+Run it with:
+    python agents/mock_medical_apis.py --port 8790 --latency 0.15 --error-rate 0.05
+    python agents/mock_medical_apis.py --record          # replace fixtures with live API responses
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, parse_qsl, urlsplit
+
+DEFAULT_RECORDINGS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                  "fixtures", "medical_api_fixtures.json")
+
+# First path segment -> real API host, used when recording
+UPSTREAMS = {
+    "REST": "https://rxnav.nlm.nih.gov",
+    "drug": "https://api.fda.gov",
+    "api": "https://browser.ihtsdotools.org",
+}
+
+# name -> (rxcui, full name, term type)
+DRUGS = {
+    "acetaminophen": ("161", "acetaminophen", "IN"),
+    "aspirin": ("1191", "aspirin", "IN"),
+    "ibuprofen": ("5640", "ibuprofen", "IN"),
+    "lisinopril": ("29046", "lisinopril", "IN"),
+    "metformin": ("6809", "metformin", "IN"),
+    "warfarin": ("11289", "warfarin", "IN"),
+}
+
+INTERACTIONS = {
+    frozenset(["1191", "11289"]): ("high", "Aspirin may increase the anticoagulant effect of warfarin, raising bleeding risk."),
+    frozenset(["1191", "5640"]): ("moderate", "Ibuprofen may reduce the cardioprotective effect of low-dose aspirin."),
+}
+
+# term -> (SNOMED CT concept id, fully specified name)
+SNOMED_CONCEPTS = {
+    "anxiety": ("48694002", "Anxiety (finding)"),
+    "diabetes": ("73211009", "Diabetes mellitus (disorder)"),
+    "hypertension": ("38341003", "Hypertensive disorder, systemic arterial (disorder)"),
+}
+
+ADVERSE_EVENTS = [
+    ("NAUSEA", 15234),
+    ("HEADACHE", 12011),
+    ("DIZZINESS", 9876),
+    ("FATIGUE", 8450),
+    ("DIARRHOEA", 7301),
+]
+
+
+# ============================================================================
+# CANNED RESPONSES
+# ============================================================================
+
+def rxnav_drugs(params: dict) -> dict:
+    name = params.get("name", [""])[0].lower()
+    if name not in DRUGS:
+        return {"drugGroup": {"name": None}}
+    rxcui, full_name, tty = DRUGS[name]
+    return {"drugGroup": {"name": None, "conceptGroup": [
+        {"tty": tty, "conceptProperties": [{"rxcui": rxcui, "name": full_name, "tty": tty}]}
+    ]}}
+
+
+def rxnav_properties(rxcui: str) -> dict:
+    for drug_rxcui, full_name, tty in DRUGS.values():
+        if drug_rxcui == rxcui:
+            return {"properties": {"rxcui": rxcui, "name": full_name, "tty": tty}}
+    return {}
+
+
+def rxnav_interactions(params: dict) -> dict:
+    rxcuis = params.get("rxcuis", [""])[0].replace(" ", "+").split("+")
+    names = {rxcui: name for rxcui, name, _ in DRUGS.values()}
+    pairs = []
+    for i, first in enumerate(rxcuis):
+        for second in rxcuis[i + 1:]:
+            found = INTERACTIONS.get(frozenset([first, second]))
+            if found:
+                pairs.append({
+                    "interactionConcept": [
+                        {"sourceConceptItem": {"id": first, "name": names.get(first, first)}},
+                        {"sourceConceptItem": {"id": second, "name": names.get(second, second)}}
+                    ],
+                    "severity": found[0],
+                    "description": found[1]
+                })
+    if not pairs:
+        return {"nlmDisclaimer": "Mock data"}
+    return {"fullInteractionTypeGroup": [
+        {"sourceName": "Mock", "fullInteractionType": [{"interactionPair": pairs}]}
+    ]}
+
+
+def openfda_events(params: dict) -> dict:
+    limit = int(params.get("limit", ["5"])[0])
+    return {"results": [{"term": term, "count": count} for term, count in ADVERSE_EVENTS[:limit]]}
+
+
+def snomed_concepts(params: dict) -> dict:
+    query = params.get("query", [""])[0].lower()
+    if query not in SNOMED_CONCEPTS:
+        return {"items": [], "total": 0}
+    concept_id, fsn = SNOMED_CONCEPTS[query]
+    return {"items": [{
+        "id": concept_id,
+        "conceptId": concept_id,
+        "active": True,
+        "fsn": {"term": fsn, "lang": "en"},
+        "pt": {"term": fsn.rsplit(" (", 1)[0], "lang": "en"}
+    }], "total": 1}
+
+
+def route(path: str, params: dict):
+    """Return (status, payload) for a request path from the synthetic data."""
+    parts = [p for p in path.split("/") if p]
+    if parts == ["REST", "drugs.json"]:
+        return 200, rxnav_drugs(params)
+    if len(parts) == 4 and parts[:2] == ["REST", "rxcui"] and parts[3] == "properties.json":
+        return 200, rxnav_properties(parts[2])
+    if parts == ["REST", "interaction", "list.json"]:
+        return 200, rxnav_interactions(params)
+    if parts == ["drug", "event.json"]:
+        return 200, openfda_events(params)
+    if parts == ["api", "v1", "concepts"]:
+        return 200, snomed_concepts(params)
+    return 404, {"error": {"code": "NOT_FOUND", "message": f"No mock for {path}"}}
+
+
+# ============================================================================
+# SERVER
+# ============================================================================
+
+def recording_key(method: str, path: str, query: str) -> str:
+    """Stable fixture key: method, path and the query with sorted parameters."""
+    pairs = sorted(parse_qsl(query, keep_blank_values=True))
+    if not pairs:
+        return f"{method} {path}"
+    return f"{method} {path}?" + "&".join(f"{k}={v}" for k, v in pairs)
+
+
+class MockMedicalApiServer:
+    """Threaded HTTP server answering RxNav, OpenFDA and SNOMED requests locally."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503, seed: int = None,
+                 recordings_path: str = DEFAULT_RECORDINGS, record: bool = False,
+                 strict: bool = False):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.recordings_path = recordings_path
+        self.record = record
+        self.strict = strict
+        self.request_count = 0
+        self.stats = {"recorded": 0, "replayed": 0, "synthetic": 0, "missing": 0, "injected_errors": 0}
+        self.recordings = self._load_recordings()
+        # Seeded so injected latency and failures repeat run to run
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    def _load_recordings(self) -> dict:
+        if not self.recordings_path or not os.path.exists(self.recordings_path):
+            return {}
+        with open(self.recordings_path) as f:
+            return json.load(f).get("recordings", {})
+
+    def _save_recordings(self):
+        os.makedirs(os.path.dirname(self.recordings_path), exist_ok=True)
+        if os.path.exists(self.recordings_path):
+            with open(self.recordings_path) as f:
+                data = json.load(f)
+        else:
+            data = {"version": 1}
+        data["recordings"] = dict(sorted(self.recordings.items()))
+        with open(self.recordings_path, "w") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, payload = server.respond("GET", self.path)
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def respond(self, method: str, raw_path: str):
+        """Resolve one request to (status, payload), applying latency and failures."""
+        parts = urlsplit(raw_path)
+        key = recording_key(method, parts.path, parts.query)
+
+        with self._lock:
+            self.request_count += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            self._count("injected_errors")
+            return self.error_status, {"error": {"code": "INJECTED_FAILURE",
+                                                 "message": "Injected failure from mock server"}}
+
+        # Recording goes to the live API first, so existing fixtures get refreshed
+        if self.record:
+            recording = self._fetch_upstream(parts.path, parts.query)
+            if recording is not None:
+                with self._lock:
+                    self.recordings[key] = recording
+                    self._save_recordings()
+                self._count("recorded")
+                return recording["status"], recording["body"]
+
+        recording = self.recordings.get(key)
+        if recording is not None:
+            self._count("replayed")
+            return recording["status"], recording["body"]
+
+        if not self.strict:
+            status, payload = route(parts.path, parse_qs(parts.query))
+            if status != 404:
+                self._count("synthetic")
+                return status, payload
+
+        self._count("missing")
+        return 404, {"error": {"code": "NOT_FOUND", "message": f"No fixture for {key}"}}
+
+    def _fetch_upstream(self, path: str, query: str):
+        segments = [p for p in path.split("/") if p]
+        upstream = UPSTREAMS.get(segments[0]) if segments else None
+        if upstream is None:
+            return None
+        url = upstream + path + (f"?{query}" if query else "")
+        try:
+            with urllib.request.urlopen(url, timeout=15) as response:
+                body = json.loads(response.read() or b"{}")
+            return {"status": response.status, "body": body, "source": "recorded"}
+        except urllib.error.HTTPError as e:
+            try:
+                body = json.loads(e.read() or b"{}")
+            except ValueError:
+                body = {"error": e.reason}
+            return {"status": e.code, "body": body, "source": "recorded"}
+        except (urllib.error.URLError, OSError, ValueError):
+            return None
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def environment(self) -> dict:
+        """Environment variables that point the medical API clients at this server."""
+        return {
+            "RXNAV_BASE_URL": f"{self.url}/REST",
+            "OPENFDA_BASE_URL": self.url,
+            "SNOMED_BASE_URL": self.url
+        }
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def start(self):
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local RxNav/OpenFDA/SNOMED stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status for injected failures")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for jitter and failures")
+    parser.add_argument("--recordings", default=DEFAULT_RECORDINGS, help="fixture file to replay/record")
+    parser.add_argument("--record", action="store_true", help="fetch every request from the live APIs and overwrite its fixture")
+    parser.add_argument("--strict", action="store_true", help="404 instead of synthetic data on a miss")
+    args = parser.parse_args()
+
+    server = MockMedicalApiServer(
+        args.host, args.port,
+        latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, error_status=args.error_status, seed=args.seed,
+        recordings_path=args.recordings, record=args.record, strict=args.strict
+    )
+    print(f"Mock medical APIs listening on {server.url} "
+          f"({len(server.recordings)} fixtures{', recording' if args.record else ''})")
+    for name, value in server.environment.items():
+        print(f"  {name}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nShutting down. {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
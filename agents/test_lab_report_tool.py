@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Lab Report Tool Tests - analyze_lab_report Treats Its Input as Text
+The model controls report_text, so a string naming a local PDF must be
+analyzed as text and never opened.
+Run with: python -m pytest -q agents/test_lab_report_tool.py
+"""
+
+import pytest
+
+from clinical_tools import _health_insights_agent, analyze_lab_report
+
+# Building the shared agent puts health_insights on sys.path
+_health_insights_agent()
+
+import health_insights_agent  # noqa: E402
+import pdf_extraction  # noqa: E402
+import result_cache  # noqa: E402
+
+
+@pytest.fixture
+def no_pdf_access(monkeypatch):
+    """Fail the test if anything tries to detect or read a PDF"""
+    def forbidden(*args, **kwargs):
+        raise AssertionError("analyze_lab_report must not touch PDF handling")
+
+    for module in (health_insights_agent, result_cache, pdf_extraction):
+        for name in ("is_pdf", "read_pdf_bytes", "extract_pdf_text", "pdf_processor"):
+            if hasattr(module, name):
+                monkeypatch.setattr(module, name, forbidden)
+
+
+def test_pdf_path_is_treated_as_plain_text(tmp_path, no_pdf_access):
+    # A local file with lab values; the tool must not read it
+    report = tmp_path / "private_labs.pdf"
+    report.write_text("Glucose: 300 mg/dL\nALT: 90 U/L\n")
+
+    result = analyze_lab_report(str(report))
+
+    assert result["status"] == "no_metrics"
+
+
+def test_pasted_results_are_analyzed(no_pdf_access):
+    result = analyze_lab_report("Glucose: 145 mg/dL\nHemoglobin: 14.2 g/dL", gender="Female")
+
+    assert result["status"] == "success"
+    assert result["metrics_analyzed"] == 2
+    assert [flag["metric"] for flag in result["abnormal"]] == ["Glucose"]
+    assert "report_id" not in result
+
+
+def test_repeat_report_is_served_from_cache(no_pdf_access):
+    cache = _health_insights_agent().result_cache
+    text = "LDL Cholesterol: 190 mg/dL"
+    first = analyze_lab_report(text, age=45)
+    hits = cache.stats["hits"]
+
+    assert analyze_lab_report(text, age=45) == first
+    assert cache.stats["hits"] == hits + 1
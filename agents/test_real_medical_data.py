@@ -1,11 +1,20 @@
 """
 Test Real Medical Data APIs
 Demonstrates RxNorm and OpenFDA integration
+
+Run against the live APIs, or offline against recorded fixtures with:
+    python agents/test_real_medical_data.py --offline
 """
 
+import argparse
+import os
 import requests
 import json
 
+RXNAV_BASE_URL = os.environ.get("RXNAV_BASE_URL", "https://rxnav.nlm.nih.gov/REST").rstrip("/")
+OPENFDA_BASE_URL = os.environ.get("OPENFDA_BASE_URL", "https://api.fda.gov").rstrip("/")
+SNOMED_BASE_URL = os.environ.get("SNOMED_BASE_URL", "https://browser.ihtsdotools.org").rstrip("/")
+
 def test_rxnorm_drug_lookup():
     """Test RxNorm drug lookup."""
     print("\n" + "="*70)
@@ -17,7 +26,7 @@ def test_rxnorm_drug_lookup():
     for drug in drugs:
         print(f"\nLooking up: {drug}")
         try:
-            url = f"https://rxnav.nlm.nih.gov/REST/drugs.json?name={drug}"
+            url = f"{RXNAV_BASE_URL}/drugs.json?name={drug}"
             response = requests.get(url, timeout=5)
             data = response.json()
             
@@ -50,7 +59,7 @@ def test_rxnorm_interactions():
             # Get RXCUIs
             rxcuis = []
             for drug in drugs:
-                url = f"https://rxnav.nlm.nih.gov/REST/drugs.json?name={drug}"
+                url = f"{RXNAV_BASE_URL}/drugs.json?name={drug}"
                 response = requests.get(url, timeout=5)
                 data = response.json()
                 
@@ -60,7 +69,7 @@ def test_rxnorm_interactions():
             
             if len(rxcuis) == 2:
                 # Check interactions
-                url = "https://rxnav.nlm.nih.gov/REST/interaction/list.json"
+                url = f"{RXNAV_BASE_URL}/interaction/list.json"
                 params = {"rxcuis": "+".join(rxcuis)}
                 response = requests.get(url, params=params, timeout=5)
                 data = response.json()
@@ -96,7 +105,7 @@ def test_openfda_adverse_events():
     for drug in drugs:
         print(f"\nLooking up adverse events for: {drug}")
         try:
-            url = "https://api.fda.gov/drug/event.json"
+            url = f"{OPENFDA_BASE_URL}/drug/event.json"
             params = {
                 "search": f'patient.drug.openfda.generic_name:"{drug}"',
                 "limit": 3,
@@ -126,7 +135,7 @@ def test_snomed_lookup():
     for term in terms:
         print(f"\nLooking up: {term}")
         try:
-            url = "https://browser.ihtsdotools.org/api/v1/concepts"
+            url = f"{SNOMED_BASE_URL}/api/v1/concepts"
             params = {"query": term, "limit": 1}
             response = requests.get(url, params=params, timeout=5)
             data = response.json()
@@ -143,20 +152,48 @@ def test_snomed_lookup():
 
 def main():
     """Run all tests."""
+    global RXNAV_BASE_URL, OPENFDA_BASE_URL, SNOMED_BASE_URL
+    
+    parser = argparse.ArgumentParser(description="Test the medical data APIs")
+    parser.add_argument("--offline", action="store_true",
+                        help="replay recorded responses from a local mock server")
+    parser.add_argument("--latency", type=float, default=0.0, help="offline: seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="offline: fraction of failed requests")
+    args = parser.parse_args()
+    
+    mock_server = None
+    if args.offline:
+        from mock_medical_apis import MockMedicalApiServer
+        mock_server = MockMedicalApiServer(latency=args.latency, error_rate=args.error_rate, seed=0).start()
+        env = mock_server.environment
+        RXNAV_BASE_URL = env["RXNAV_BASE_URL"]
+        OPENFDA_BASE_URL = env["OPENFDA_BASE_URL"]
+        SNOMED_BASE_URL = env["SNOMED_BASE_URL"]
+    
     print("\n" + "="*70)
     print("REAL MEDICAL DATA API TESTS")
     print("="*70)
-    print("\nTesting integration with real medical databases...")
+    if mock_server:
+        print(f"\nOffline mode: replaying recorded responses from {mock_server.url}")
+    else:
+        print("\nTesting integration with real medical databases...")
     
-    test_rxnorm_drug_lookup()
-    test_rxnorm_interactions()
-    test_openfda_adverse_events()
-    test_snomed_lookup()
+    try:
+        test_rxnorm_drug_lookup()
+        test_rxnorm_interactions()
+        test_openfda_adverse_events()
+        test_snomed_lookup()
+    finally:
+        if mock_server:
+            mock_server.stop()
     
     print("\n" + "="*70)
     print("TESTS COMPLETE")
     print("="*70)
-    print("\nAll APIs are working! You can now use real medical data in your chatbot.")
+    if mock_server:
+        print(f"\nMock server stats: {mock_server.stats}")
+    else:
+        print("\nAll APIs are working! You can now use real medical data in your chatbot.")
 
 
 if __name__ == "__main__":
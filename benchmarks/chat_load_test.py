@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Chat Load Test
+Replays scripted patient conversations against the chat stack with N
+concurrent virtual users and reports turn latency, time-to-first-token and
+throughput. By default everything runs locally: the agent uses
+FakeClinicalModel and the RxNorm/OpenFDA tools talk to MockMedicalApiServer.
+
+Targets:
+    api    - agents/clinical_api_server.py started in-process (HTTP + SSE)
+    agent  - the agent called directly, as the CLI and Streamlit apps do
+    --url  - an already running clinical_api_server (real model, real APIs)
+
+Usage:
+    python benchmarks/chat_load_test.py --users 20 --iterations 2
+    python benchmarks/chat_load_test.py --target agent --users 50 --model-latency 0.5
+    python benchmarks/chat_load_test.py --url http://127.0.0.1:8080 --users 5 --json load.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import sys
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "agents"))
+
+# Same flow as agents/test_clinical_agent.py, plus medication-heavy scripts
+# that exercise the RxNorm/OpenFDA tools
+CONVERSATIONS = [
+    [
+        "hey my blood pressure is 160 over 90",
+        "no dizziness or anything",
+        "i've also been stressed lately",
+        "i take metformin, just started lisinopril too",
+        "can you summarize what we talked about?"
+    ],
+    [
+        "i've had a headache and some fatigue for a few days",
+        "i've been taking ibuprofen for it",
+        "is it ok to take ibuprofen with aspirin?",
+        "thanks, what else can i do for the headaches?"
+    ],
+    [
+        "my doctor put me on warfarin last month",
+        "can i still take aspirin for aches?",
+        "what side effects should i watch for?"
+    ],
+]
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile; None for an empty list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values: list) -> dict:
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else None
+    }
+
+
+class TurnRecorder:
+    """Collects per-turn timings from every virtual user."""
+
+    def __init__(self):
+        self.latencies = []
+        self.ttfts = []
+        self.errors = []
+
+    def record(self, latency: float, ttft: float = None, error: str = None):
+        if error:
+            self.errors.append(error)
+            return
+        self.latencies.append(latency)
+        if ttft is not None:
+            self.ttfts.append(ttft)
+
+
+# ============================================================================
+# TARGETS
+# ============================================================================
+
+async def http_request(host: str, port: int, method: str, path: str, body: dict = None):
+    """Send one request; returns (status, reader, writer) with the body unread."""
+    reader, writer = await asyncio.open_connection(host, port)
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+        pass
+    return status, reader, writer
+
+
+class ApiTarget:
+    """Drives clinical_api_server over HTTP, reading the SSE stream."""
+
+    def __init__(self, url: str):
+        address = url.split("://", 1)[-1].rstrip("/")
+        self.host, _, port = address.partition(":")
+        self.port = int(port or 80)
+
+    async def start_conversation(self):
+        status, reader, writer = await http_request(self.host, self.port, "POST", "/sessions", {})
+        body = await reader.read()
+        writer.close()
+        if status != 201:
+            raise RuntimeError(f"session create failed: HTTP {status} {body[:200]!r}")
+        return json.loads(body)["session_id"]
+
+    async def send(self, session_id, message: str, recorder: TurnRecorder):
+        start = time.perf_counter()
+        ttft = None
+        status, reader, writer = await http_request(
+            self.host, self.port, "POST", f"/sessions/{session_id}/messages", {"message": message}
+        )
+        try:
+            if status != 200:
+                body = await reader.read()
+                recorder.record(0, error=f"HTTP {status}: {body[:120].decode(errors='replace')}")
+                return
+            event = None
+            async for line in reader:
+                line = line.decode().rstrip("\n")
+                if line.startswith("event: "):
+                    event = line[7:]
+                elif line.startswith("data: "):
+                    if event == "token" and ttft is None:
+                        ttft = time.perf_counter() - start
+                    elif event == "done":
+                        recorder.record(time.perf_counter() - start, ttft)
+                        return
+                    elif event == "error":
+                        recorder.record(0, error=json.loads(line[6:])["error"])
+                        return
+            recorder.record(0, error="stream ended without a done event")
+        finally:
+            writer.close()
+
+    async def end_conversation(self, session_id):
+        _, reader, writer = await http_request(self.host, self.port, "DELETE", f"/sessions/{session_id}")
+        await reader.read()
+        writer.close()
+
+
+class AgentTarget:
+    """Calls a fresh agent per conversation directly via stream_async."""
+
+    def __init__(self, agent_factory):
+        self.agent_factory = agent_factory
+
+    async def start_conversation(self):
+        return await asyncio.to_thread(self.agent_factory)
+
+    async def send(self, agent, message: str, recorder: TurnRecorder):
+        start = time.perf_counter()
+        ttft = None
+        try:
+            async for event in agent.stream_async(message):
+                if ttft is None and event.get("data"):
+                    ttft = time.perf_counter() - start
+        except Exception as e:
+            recorder.record(0, error=str(e))
+            return
+        recorder.record(time.perf_counter() - start, ttft)
+
+    async def end_conversation(self, agent):
+        pass
+
+
+# ============================================================================
+# LOCAL STACK
+# ============================================================================
+
+def local_agent_factory(args):
+    """Agent factory using the fake model and all clinical + medical API tools."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from fake_model import FakeClinicalModel
+    from clinical_tools import create_clinical_agent, CLINICAL_TOOLS
+    from medical_api_tools import MEDICAL_API_TOOLS
+
+    def factory():
+        model = FakeClinicalModel(
+            first_token_latency=args.model_latency,
+            token_latency=args.token_latency,
+            response_words=args.response_words
+        )
+        return create_clinical_agent(
+            model=model,
+            tools=CLINICAL_TOOLS + MEDICAL_API_TOOLS,
+            callback_handler=None
+        )
+
+    return factory
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_local_api_server(agent_factory, args) -> str:
+    """Run clinical_api_server on its own event loop thread; returns its URL."""
+    from clinical_api_server import ClinicalChatService, serve
+
+    port = free_port()
+
+    def run():
+        service = ClinicalChatService(
+            agent_factory=agent_factory,
+            max_sessions=args.users * 2 + 10,
+            max_concurrent_turns=args.max_concurrent_turns,
+            turn_timeout=args.turn_timeout,
+            queue_timeout=args.turn_timeout
+        )
+        asyncio.run(serve(service, "127.0.0.1", port))
+
+    threading.Thread(target=run, daemon=True).start()
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("local API server did not start")
+
+
+# ============================================================================
+# LOAD GENERATOR
+# ============================================================================
+
+async def virtual_user(user_id: int, target, args, recorder: TurnRecorder, stop_at: float):
+    iteration = 0
+    while True:
+        if args.duration and time.monotonic() >= stop_at:
+            return
+        if not args.duration and iteration >= args.iterations:
+            return
+
+        script = CONVERSATIONS[(user_id + iteration) % len(CONVERSATIONS)]
+        try:
+            conversation = await target.start_conversation()
+        except Exception as e:
+            recorder.record(0, error=f"start failed: {e}")
+            return
+        for message in script:
+            await target.send(conversation, message, recorder)
+            if args.think_time:
+                await asyncio.sleep(args.think_time)
+        await target.end_conversation(conversation)
+        iteration += 1
+
+
+async def run_load(target, args) -> dict:
+    recorder = TurnRecorder()
+    start = time.monotonic()
+    stop_at = start + (args.duration or 0)
+    users = []
+    for user_id in range(args.users):
+        users.append(asyncio.create_task(virtual_user(user_id, target, args, recorder, stop_at)))
+        if args.ramp_up:
+            await asyncio.sleep(args.ramp_up / args.users)
+    await asyncio.gather(*users)
+    elapsed = time.monotonic() - start
+
+    completed = len(recorder.latencies)
+    return {
+        "users": args.users,
+        "elapsed_seconds": round(elapsed, 3),
+        "turns_completed": completed,
+        "turns_failed": len(recorder.errors),
+        "throughput_turns_per_second": round(completed / elapsed, 3) if elapsed else None,
+        "turn_latency_seconds": summarize(recorder.latencies),
+        "time_to_first_token_seconds": summarize(recorder.ttfts),
+        "sample_errors": recorder.errors[:5]
+    }
+
+
+def print_results(results: dict):
+    def fmt(value):
+        return "   n/a" if value is None else f"{value * 1000:7.0f} ms"
+
+    print("\n" + "=" * 80)
+    print("CHAT LOAD TEST RESULTS")
+    print("=" * 80)
+    print(f"  Target:       {results['target']}")
+    print(f"  Users:        {results['users']}")
+    print(f"  Elapsed:      {results['elapsed_seconds']:.1f} s")
+    print(f"  Turns:        {results['turns_completed']} ok, {results['turns_failed']} failed")
+    print(f"  Throughput:   {results['throughput_turns_per_second']} turns/s")
+    print()
+    print(f"  {'':22}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for label, key in [("Turn latency", "turn_latency_seconds"),
+                       ("Time to first token", "time_to_first_token_seconds")]:
+        s = results[key]
+        print(f"  {label:22}{fmt(s['p50']):>10}{fmt(s['p95']):>10}{fmt(s['p99']):>10}{fmt(s['max']):>10}")
+    if results["sample_errors"]:
+        print("\n  Sample errors:")
+        for error in results["sample_errors"]:
+            print(f"    - {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the clinical chat stack")
+    parser.add_argument("--target", choices=["api", "agent"], default="api")
+    parser.add_argument("--url", help="drive an already running clinical_api_server instead")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=1, help="conversations per user")
+    parser.add_argument("--duration", type=float, help="run for this many seconds instead of --iterations")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="seconds over which to start users")
+    parser.add_argument("--think-time", type=float, default=0.0, help="pause between a user's turns")
+    parser.add_argument("--model-latency", type=float, default=0.3, help="fake model time to first token")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="fake model delay per word")
+    parser.add_argument("--response-words", type=int, default=40)
+    parser.add_argument("--api-latency", type=float, default=0.1, help="mock RxNorm/OpenFDA latency")
+    parser.add_argument("--api-jitter", type=float, default=0.05)
+    parser.add_argument("--api-error-rate", type=float, default=0.0, help="mock API failure rate")
+    parser.add_argument("--max-concurrent-turns", type=int, default=64, help="local API server turn limit")
+    parser.add_argument("--turn-timeout", type=float, default=120.0)
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    args = parser.parse_args()
+
+    mock_apis = None
+    if args.url:
+        target, label = ApiTarget(args.url), args.url
+    else:
+        from mock_medical_apis import MockMedicalApiServer
+
+        mock_apis = MockMedicalApiServer(
+            latency=args.api_latency,
+            jitter=args.api_jitter,
+            error_rate=args.api_error_rate,
+            seed=0
+        ).start()
+        # Must be set before medical_api_tools is imported
+        os.environ.update(mock_apis.environment)
+        factory = local_agent_factory(args)
+        if args.target == "api":
+            target, label = ApiTarget(start_local_api_server(factory, args)), "api (local, fake model)"
+        else:
+            target, label = AgentTarget(factory), "agent (in-process, fake model)"
+
+    print(f"Running {args.users} virtual users against {label}...")
+    try:
+        results = asyncio.run(run_load(target, args))
+        results["target"] = label
+        if mock_apis:
+            results["mock_api_requests"] = mock_apis.request_count
+            results["mock_api_stats"] = mock_apis.stats
+    finally:
+        if mock_apis:
+            mock_apis.stop()
+    print_results(results)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
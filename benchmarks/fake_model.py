@@ -0,0 +1,127 @@
+"""
+Fake Clinical Model - Local LLM Stand-in for Load Tests
+A strands Model that needs no network or credentials. It streams canned
+replies with configurable latency and, when a message mentions known drugs,
+calls the RxNorm tools first, so load tests exercise the real agent loop,
+tool execution and medical API round trips.
+"""
+
+import asyncio
+import json
+import re
+import uuid
+
+from strands.models import Model
+
+KNOWN_DRUGS = {"acetaminophen", "aspirin", "ibuprofen", "lisinopril", "metformin", "warfarin"}
+
+FILLER = ("Thanks for sharing that with me. It sounds like something worth keeping an eye on, "
+          "and a few simple changes can really help. Remember I'm a clinical assistant, not a "
+          "replacement for your doctor, so please check in with them if anything gets worse. "
+          "How have you been feeling otherwise lately?").split()
+
+
+def canned_input(schema, root=None):
+    """A placeholder value that satisfies a JSON schema (defaults where given)."""
+    root = root or schema
+    if "$ref" in schema:
+        name = schema["$ref"].rsplit("/", 1)[-1]
+        return canned_input(root.get("$defs", {})[name], root)
+    if "default" in schema:
+        return schema["default"]
+    if "const" in schema:
+        return schema["const"]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    for key in ("anyOf", "oneOf", "allOf"):
+        options = [option for option in schema.get(key, []) if option.get("type") != "null"]
+        if options:
+            return canned_input(options[0], root)
+
+    kind = schema.get("type", "object")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        # Fill every property: tool specs don't always list Optional fields as required
+        return {name: canned_input(prop, root) for name, prop in schema.get("properties", {}).items()}
+    return {"array": [], "string": "fake", "integer": 0, "number": 0.0,
+            "boolean": False}.get(kind)
+
+
+class FakeClinicalModel(Model):
+    """
+    Streams a fixed-length reply after `first_token_latency` seconds, one word
+    every `token_latency` seconds. Set `tool_calls=False` to never use tools.
+    """
+
+    def __init__(self, first_token_latency: float = 0.3, token_latency: float = 0.01,
+                 response_words: int = 40, tool_calls: bool = True):
+        self.config = {
+            "model_id": "fake-clinical-model",
+            "first_token_latency": first_token_latency,
+            "token_latency": token_latency,
+            "response_words": response_words,
+            "tool_calls": tool_calls,
+        }
+
+    def update_config(self, **model_config):
+        self.config.update(model_config)
+
+    def get_config(self):
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        """Yield a placeholder instance of `output_model` after the first-token latency."""
+        await asyncio.sleep(self.config["first_token_latency"])
+        yield {"output": output_model.model_validate(canned_input(output_model.model_json_schema()))}
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        await asyncio.sleep(self.config["first_token_latency"])
+        yield {"messageStart": {"role": "assistant"}}
+
+        tool_use = self._pick_tool(messages, tool_specs, kwargs.get("tool_choice"))
+        if tool_use:
+            yield {"contentBlockStart": {"start": {"toolUse": {
+                "toolUseId": f"tooluse_{uuid.uuid4().hex[:12]}", "name": tool_use[0]
+            }}}}
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps(tool_use[1])}}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "tool_use"}}
+        else:
+            words = self.config["response_words"]
+            for i in range(words):
+                if i:
+                    await asyncio.sleep(self.config["token_latency"])
+                yield {"contentBlockDelta": {"delta": {"text": FILLER[i % len(FILLER)] + " "}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "end_turn"}}
+
+        yield {"metadata": {
+            "usage": {"inputTokens": 0, "outputTokens": 0, "totalTokens": 0},
+            "metrics": {"latencyMs": 0}
+        }}
+
+    def _pick_tool(self, messages, tool_specs, tool_choice=None):
+        """Decide on a drug lookup when the latest user text names known drugs."""
+        # A forced choice is how strands asks for structured output; its tool
+        # is registered last
+        if tool_choice and tool_specs:
+            name = tool_choice.get("tool", {}).get("name", tool_specs[-1]["name"])
+            spec = next(spec for spec in tool_specs if spec["name"] == name)
+            return name, canned_input(spec["inputSchema"]["json"])
+        if not self.config["tool_calls"] or not messages:
+            return None
+        content = messages[-1].get("content", [])
+        # A tool result means the lookup already happened; answer now
+        if any("toolResult" in block for block in content):
+            return None
+
+        text = " ".join(block.get("text", "") for block in content).lower()
+        drugs = sorted(set(re.findall(r"[a-z]+", text)) & KNOWN_DRUGS)
+        available = {spec["name"] for spec in tool_specs or []}
+
+        if len(drugs) >= 2 and "check_real_drug_interactions" in available:
+            return "check_real_drug_interactions", {"drug_names": drugs}
+        if drugs and "get_real_drug_info" in available:
+            return "get_real_drug_info", {"drug_name": drugs[0]}
+        return None
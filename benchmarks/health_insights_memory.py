@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Health Insights Memory Benchmark
+Measures peak RSS while analyzing synthetic lab reports, scaled to 100k
+reports. Each mode runs in a fresh child process so peaks don't mix:
+
+    stream          run_batch results consumed and dropped (working set only)
+    retain-dicts    every finished report kept as its serialized dict
+    retain-records  every finished report kept as a slotted ReportRecord
+
+Usage:
+    python benchmarks/health_insights_memory.py
+    python benchmarks/health_insights_memory.py --reports 20000 --modes stream retain-records
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from itertools import islice
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "health_insights"))
+
+MODES = ["stream", "retain-dicts", "retain-records"]
+CHUNK = 1000
+
+
+def current_rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# ============================================================================
+# CHILD
+# ============================================================================
+
+def run_child(mode: str, count: int, analytes: int, noise: float):
+    from synthetic_reports import generate_reports
+    from health_insights_agent import HealthInsightsAgent
+
+    agent = HealthInsightsAgent()
+    # Warm up imports and caches before taking the baseline
+    for _ in agent.run_batch(generate_reports(100, analytes, noise, seed=1), workers=1):
+        pass
+    baseline = current_rss_mb()
+
+    start = time.perf_counter()
+    kept = []
+    reports = generate_reports(count, analytes, noise)
+    if mode == "stream":
+        for _ in agent.run_batch(reports, workers=1):
+            pass
+    else:
+        while True:
+            chunk = list(islice(reports, CHUNK))
+            if not chunk:
+                break
+            metrics_list = [agent.extract_metrics(report_text) for report_text in chunk]
+            if mode == "retain-dicts":
+                kept.extend(agent.analyze_batch(metrics_list))
+            else:
+                kept.extend(agent.analyze_batch_records(metrics_list))
+    elapsed = time.perf_counter() - start
+
+    peak = peak_rss_mb()
+    print(json.dumps({
+        "mode": mode,
+        "reports": count,
+        "kept": len(kept),
+        "baseline_rss_mb": baseline,
+        "peak_rss_mb": peak,
+        "growth_mb": peak - baseline,
+        "growth_mb_per_100k": (peak - baseline) / count * 100000,
+        "seconds": elapsed
+    }))
+
+
+# ============================================================================
+# PARENT
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak RSS of the health insights pipeline")
+    parser.add_argument("--reports", type=int, default=100000)
+    parser.add_argument("--analytes", type=int, default=10, help="analytes per report")
+    parser.add_argument("--noise", type=float, default=0.3)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.reports, args.analytes, args.noise)
+        return
+
+    print("=" * 80)
+    print("HEALTH INSIGHTS MEMORY BENCHMARK")
+    print("=" * 80)
+    print(f"{args.reports} reports x {args.analytes} analytes, noise {args.noise}")
+    print(f"\n{'mode':<16} {'baseline':>11} {'peak':>11} {'growth':>11} "
+          f"{'per 100k':>11} {'time':>9}")
+
+    results = []
+    for mode in args.modes:
+        child = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", mode,
+             "--reports", str(args.reports), "--analytes", str(args.analytes),
+             "--noise", str(args.noise)],
+            capture_output=True, text=True, check=True
+        )
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(f"{mode:<16} {result['baseline_rss_mb']:>8.1f} MB {result['peak_rss_mb']:>8.1f} MB "
+              f"{result['growth_mb']:>8.1f} MB {result['growth_mb_per_100k']:>8.1f} MB "
+              f"{result['seconds']:>8.1f}s")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Health Insights Pipeline Benchmark
+Times every stage of the health insights pipeline on synthetic lab reports,
+then the whole HealthInsightsAgent.run and the batch path, and reports
+reports/sec plus a per-stage breakdown. Results can be written as JSON and a
+previous JSON file passed to --compare, so runs are comparable across commits.
+
+Usage:
+    python benchmarks/health_insights_pipeline.py
+    python benchmarks/health_insights_pipeline.py --reports 2000 --analytes 14 --noise 0.6
+    python benchmarks/health_insights_pipeline.py --json before.json
+    python benchmarks/health_insights_pipeline.py --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "health_insights"))
+
+from synthetic_reports import generate_reports  # noqa: E402
+from health_insights_agent import (  # noqa: E402
+    HealthInsightsAgent, _standard_metrics, abnormal_flag_detector, clinical_reference_lookup,
+    explain_report, lab_metric_extractor, pattern_detector, pdf_processor, report_builder,
+    risk_scorer, text_cleaner, unit_normalizer
+)
+
+# In pipeline order; text_cleaner is off the run path since the scanner reads raw text,
+# and explain_report only runs when explanations are requested
+STAGES = ["text_cleaner", "pdf_processor", "lab_metric_extractor", "unit_normalizer",
+          "clinical_reference_lookup", "abnormal_flag_detector", "pattern_detector",
+          "risk_scorer", "report_builder", "explain_report"]
+
+
+# ============================================================================
+# TIMING
+# ============================================================================
+
+def time_stages(reports: list, gender: str) -> dict:
+    """Seconds spent in each stage over one pass of `reports`"""
+    totals = defaultdict(float)
+    clock = time.perf_counter
+
+    for report_text in reports:
+        start = clock()
+        text_cleaner(report_text)
+        totals["text_cleaner"] += clock() - start
+
+        start = clock()
+        text = pdf_processor(report_text)["extracted_text"]
+        totals["pdf_processor"] += clock() - start
+
+        start = clock()
+        metrics = lab_metric_extractor(text)["metrics"]
+        totals["lab_metric_extractor"] += clock() - start
+
+        start = clock()
+        normalized = unit_normalizer(metrics)["normalized_metrics"]
+        standard_metrics = _standard_metrics(metrics, normalized)
+        totals["unit_normalizer"] += clock() - start
+
+        abnormal_flags = []
+        for metric_name, data in standard_metrics.items():
+            start = clock()
+            ref_result = clinical_reference_lookup(metric_name, gender=gender)
+            totals["clinical_reference_lookup"] += clock() - start
+            if ref_result["status"] == "success" and ref_result["reference_range"]:
+                start = clock()
+                abnormal_flags.append(abnormal_flag_detector(metric_name, data["value"],
+                                                             ref_result["reference_range"]))
+                totals["abnormal_flag_detector"] += clock() - start
+
+        start = clock()
+        patterns = pattern_detector(standard_metrics)["patterns"]
+        totals["pattern_detector"] += clock() - start
+
+        start = clock()
+        risk = risk_scorer(abnormal_flags, patterns)
+        totals["risk_scorer"] += clock() - start
+
+        start = clock()
+        report = report_builder(standard_metrics, abnormal_flags, patterns, risk)["report"]
+        totals["report_builder"] += clock() - start
+
+        # Off the run path unless explain=True
+        start = clock()
+        explain_report(report)
+        totals["explain_report"] += clock() - start
+
+    return totals
+
+
+def time_run(agent: HealthInsightsAgent, reports: list, gender: str) -> float:
+    start = time.perf_counter()
+    for report_text in reports:
+        agent.run(report_text, gender=gender)
+    return time.perf_counter() - start
+
+
+def time_run_batch(agent: HealthInsightsAgent, reports: list, gender: str) -> float:
+    start = time.perf_counter()
+    for _ in agent.run_batch(reports, workers=1, gender=gender):
+        pass
+    return time.perf_counter() - start
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def run_benchmark(count: int, analytes: int, noise: float, seed: int, repeats: int,
+                  gender: str) -> dict:
+    reports = list(generate_reports(count, analytes, noise, seed))
+    # No result cache, so every pass does the full work
+    agent = HealthInsightsAgent()
+
+    # Warm-up pass fills the scanner's name cache and the lazy imports
+    time_stages(reports[:50], gender)
+    agent.run(reports[0], gender=gender)
+
+    stage_samples = defaultdict(list)
+    run_samples = []
+    batch_samples = []
+    for _ in range(repeats):
+        for stage, seconds in time_stages(reports, gender).items():
+            stage_samples[stage].append(seconds)
+        run_samples.append(time_run(agent, reports, gender))
+        batch_samples.append(time_run_batch(agent, reports, gender))
+
+    run_seconds = statistics.median(run_samples)
+    batch_seconds = statistics.median(batch_samples)
+    stages = {}
+    for stage in STAGES:
+        seconds = statistics.median(stage_samples[stage]) if stage_samples[stage] else 0.0
+        stages[stage] = {
+            "total_ms": seconds * 1000,
+            "us_per_report": seconds / count * 1e6,
+            "percent_of_run": seconds / run_seconds * 100
+        }
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "reports": count,
+            "analytes_per_report": analytes,
+            "noise": noise,
+            "seed": seed,
+            "repeats": repeats,
+            "gender": gender
+        },
+        "stages": stages,
+        "run": {
+            "total_ms": run_seconds * 1000,
+            "ms_per_report": run_seconds / count * 1000,
+            "reports_per_second": count / run_seconds
+        },
+        "run_batch": {
+            "total_ms": batch_seconds * 1000,
+            "ms_per_report": batch_seconds / count * 1000,
+            "reports_per_second": count / batch_seconds
+        }
+    }
+
+
+def _delta(current: float, baseline: float) -> str:
+    if not baseline:
+        return ""
+    return f"{(current - baseline) / baseline * 100:+.1f}%"
+
+
+def print_results(results: dict, baseline: dict = None):
+    meta = results["meta"]
+    base_stages = (baseline or {}).get("stages", {})
+
+    print("=" * 80)
+    print("HEALTH INSIGHTS PIPELINE BENCHMARK")
+    print("=" * 80)
+    print(f"commit {meta['commit']}, {meta['reports']} reports x {meta['analytes_per_report']} "
+          f"analytes, noise {meta['noise']}, median of {meta['repeats']}")
+    if baseline:
+        print(f"compared with commit {baseline['meta'].get('commit', 'unknown')}")
+
+    print(f"\n{'stage':<28} {'total':>12} {'per report':>14} {'of run':>8} {'vs base':>9}")
+    for stage, figures in results["stages"].items():
+        base = base_stages.get(stage, {}).get("us_per_report")
+        print(f"{stage:<28} {figures['total_ms']:>9.1f} ms {figures['us_per_report']:>11.1f} us "
+              f"{figures['percent_of_run']:>7.1f}% {_delta(figures['us_per_report'], base):>9}")
+
+    print()
+    for path in ("run", "run_batch"):
+        figures = results[path]
+        base = (baseline or {}).get(path, {}).get("reports_per_second")
+        print(f"{'HealthInsightsAgent.' + path:<28} {figures['total_ms']:>9.1f} ms "
+              f"{figures['ms_per_report']:>11.3f} ms "
+              f"{figures['reports_per_second']:>9.0f} reports/sec "
+              f"{_delta(figures['reports_per_second'], base)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the health insights pipeline")
+    parser.add_argument("--reports", type=int, default=500)
+    parser.add_argument("--analytes", type=int, default=10, help="analytes per report")
+    parser.add_argument("--noise", type=float, default=0.3,
+                        help="formatting variation from 0 (clean) to 1")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--gender", default="general")
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    parser.add_argument("--compare", help="results JSON from an earlier run to compare against")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = run_benchmark(args.reports, args.analytes, args.noise, args.seed,
+                            args.repeats, args.gender)
+    print_results(results, baseline)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Import-Time Benchmark
+Measures the cold-start cost of each entry point in a fresh interpreter, and
+lists the heaviest top-level imports so startup regressions are easy to spot.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --runs 5 --json import_times.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = {
+    "streamlit_app": "streamlit_app.py",
+    "cli_agent": "agents/clinical_decision_support_agent.py",
+    "cli_agent_enhanced": "agents/clinical_decision_support_enhanced.py",
+    "health_insights": "health_insights/health_insights_agent.py",
+}
+
+# Executed in the child interpreter: load the entry point without running its
+# __main__ block and print how long that took
+CHILD_SNIPPET = """
+import runpy, sys, time
+path = sys.argv[1]
+sys.path.insert(0, sys.argv[2])
+start = time.perf_counter()
+runpy.run_path(path, run_name="__import_bench__")
+print("IMPORT_SECONDS", time.perf_counter() - start)
+"""
+
+
+def parse_importtime(stderr: str, top: int) -> list:
+    """Return the slowest top-level imports from `python -X importtime` output."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|", 2)
+        # Nested imports are indented under their parent
+        if name.startswith("  "):
+            continue
+        entries.append({"module": name.strip(), "cumulative_ms": int(cumulative_us) / 1000})
+    entries.sort(key=lambda e: e["cumulative_ms"], reverse=True)
+    return entries[:top]
+
+
+def measure_entry_point(path: str, runs: int, top: int) -> dict:
+    """Import one entry point `runs` times, each in a new interpreter."""
+    full_path = os.path.join(REPO_ROOT, path)
+    timings = []
+    top_imports = []
+
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", CHILD_SNIPPET,
+             full_path, os.path.dirname(full_path)],
+            cwd=os.path.dirname(full_path),
+            capture_output=True,
+            text=True,
+            timeout=300
+        )
+        seconds = None
+        for line in proc.stdout.splitlines():
+            if line.startswith("IMPORT_SECONDS"):
+                seconds = float(line.split()[1])
+        if proc.returncode != 0 or seconds is None:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "unknown error"
+            return {"status": "error", "error": error}
+        timings.append(seconds)
+        top_imports = parse_importtime(proc.stderr, top)
+
+    return {
+        "status": "success",
+        "runs": runs,
+        "median_seconds": statistics.median(timings),
+        "min_seconds": min(timings),
+        "max_seconds": max(timings),
+        "top_imports": top_imports
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start time of each entry point")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per entry point")
+    parser.add_argument("--top", type=int, default=5, help="heaviest imports to list")
+    parser.add_argument("--only", choices=sorted(ENTRY_POINTS), action="append",
+                        help="limit to these entry points")
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    args = parser.parse_args()
+
+    names = args.only or list(ENTRY_POINTS)
+    results = {}
+
+    print("=" * 80)
+    print("IMPORT-TIME BENCHMARK")
+    print("=" * 80)
+
+    for name in names:
+        result = measure_entry_point(ENTRY_POINTS[name], args.runs, args.top)
+        results[name] = result
+
+        print(f"\n{name} ({ENTRY_POINTS[name]})")
+        if result["status"] != "success":
+            print(f"  ❌ {result['error']}")
+            continue
+        print(f"  median {result['median_seconds'] * 1000:8.1f} ms   "
+              f"min {result['min_seconds'] * 1000:8.1f} ms   "
+              f"max {result['max_seconds'] * 1000:8.1f} ms")
+        for entry in result["top_imports"]:
+            print(f"    {entry['cumulative_ms']:8.1f} ms  {entry['module']}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Metric Extraction Benchmark
+Compares the original two-pass extraction (text_cleaner regex substitutions
+followed by the lazy name regex and keyword loop) against the single-pass
+metric scanner, on synthetic lab reports of increasing size.
+
+Usage:
+    python benchmarks/metric_extraction.py
+    python benchmarks/metric_extraction.py --reports 500 --sizes 10 100 1000
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "health_insights"))
+
+from health_insights_agent import lab_metric_extractor  # noqa: E402
+
+ANALYTES = [
+    ("Glucose", "mg/dL", 60, 200), ("Total Cholesterol", "mg/dL", 120, 300),
+    ("LDL Cholesterol", "mg/dL", 50, 220), ("HDL Cholesterol", "mg/dL", 20, 90),
+    ("Triglycerides", "mg/dL", 50, 400), ("Hemoglobin", "g/dL", 9, 18),
+    ("ALT", "U/L", 5, 150), ("AST", "U/L", 5, 120), ("Creatinine", "mg/dL", 0.5, 3),
+    ("BUN", "mg/dL", 5, 40), ("Bilirubin", "mg/dL", 0.2, 3), ("Albumin", "g/dL", 2.5, 5.5),
+]
+SECTIONS = ["METABOLIC PANEL:", "LIPID PANEL:", "LIVER FUNCTION:", "KIDNEY FUNCTION:"]
+
+
+# ============================================================================
+# BASELINE (the extractor as it was before the scanner)
+# ============================================================================
+
+def legacy_extract(raw_text: str) -> dict:
+    cleaned = re.sub(r'\s+', ' ', raw_text).strip()
+    cleaned = re.sub(r'[^\w\s\.\,\:\-\(\)\/]', '', cleaned)
+    cleaned.split('.')
+
+    metrics = {}
+    pattern = r'([A-Za-z\s]+?):\s*([\d\.]+)\s*([A-Za-z/%]*)'
+    skip_keywords = ['date', 'patient', 'age', 'gender', 'time', 'result', 'test', 'laboratory']
+    for metric_name, value, unit in re.findall(pattern, cleaned):
+        metric_name = metric_name.strip()
+        metric_lower = metric_name.lower()
+        if any(skip in metric_lower for skip in skip_keywords):
+            continue
+        try:
+            metrics[metric_name] = {"value": float(value), "unit": unit.strip() or "unknown",
+                                    "raw": f"{value} {unit}"}
+        except ValueError:
+            continue
+    return metrics
+
+
+def scanner_extract(raw_text: str) -> dict:
+    return lab_metric_extractor(raw_text)["metrics"]
+
+
+# ============================================================================
+# SYNTHETIC REPORTS
+# ============================================================================
+
+def make_report(rng: random.Random, lines: int) -> str:
+    """A lab report with roughly `lines` result lines plus headers and notes"""
+    out = ["LABORATORY TEST RESULTS", "Patient: Jane Doe", "Date: 2024-02-05", ""]
+    for i in range(lines):
+        if i % 12 == 0:
+            out.append(SECTIONS[(i // 12) % len(SECTIONS)])
+        name, unit, low, high = rng.choice(ANALYTES)
+        out.append(f"{name}: {round(rng.uniform(low, high), 1)} {unit}")
+        if i % 25 == 24:
+            out.append("Comment: specimen received ambient, see reference notes")
+    return "\n".join(out)
+
+
+def time_per_report(extract, reports: list, repeats: int) -> float:
+    """Median seconds per report over `repeats` passes"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for report in reports:
+            extract(report)
+        samples.append((time.perf_counter() - start) / len(reports))
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lab metric extraction")
+    parser.add_argument("--reports", type=int, default=200, help="reports per size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000],
+                        help="result lines per report")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    results = []
+
+    print("=" * 80)
+    print("METRIC EXTRACTION BENCHMARK")
+    print("=" * 80)
+    print(f"\n{'lines/report':>12} {'legacy':>14} {'scanner':>14} {'speedup':>9}")
+
+    for size in args.sizes:
+        # Keep total work roughly constant as reports grow
+        count = max(5, args.reports * 10 // max(size, 10))
+        reports = [make_report(rng, size) for _ in range(count)]
+        legacy = time_per_report(legacy_extract, reports, args.repeats)
+        scanner = time_per_report(scanner_extract, reports, args.repeats)
+        results.append({"lines": size, "reports": count,
+                        "legacy_ms": legacy * 1000, "scanner_ms": scanner * 1000,
+                        "speedup": legacy / scanner})
+        print(f"{size:>12} {legacy * 1000:>11.3f} ms {scanner * 1000:>11.3f} ms "
+              f"{legacy / scanner:>8.1f}x")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
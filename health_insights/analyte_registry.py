@@ -0,0 +1,139 @@
+"""
+Analyte Registry - Canonical Lab Analytes
+Loads analytes.json once: a canonical id and LOINC code per analyte, the
+aliases it appears under in reports, its standard unit and conversions,
+sex/age-specific reference ranges and plain-language explanation templates.
+Every alias is indexed up front so name resolution is a single dict lookup,
+and each analyte's ranges are indexed by sex and age band so a reference
+range lookup is a bisection however many bands the table holds.
+"""
+
+import json
+import os
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Optional
+
+DEFAULT_REGISTRY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "analytes.json")
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase and collapse whitespace so "LDL  Cholesterol" == "ldl cholesterol" """
+    return " ".join(name.lower().split())
+
+
+class AgeBandIndex:
+    """Reference ranges of one analyte and sex, searched by age
+
+    Age bands are half-open [age_min, age_max) intervals that may not overlap,
+    kept sorted by age_min so the band covering an age is found by bisection.
+    A range without age_min/age_max applies to every age not in a band.
+    """
+
+    __slots__ = ("starts", "ends", "ranges", "all_ages")
+
+    def __init__(self, label: str, references: list):
+        self.all_ages = None
+        bands = []
+        for reference in references:
+            if "age_min" in reference or "age_max" in reference:
+                bands.append((reference.get("age_min", 0), reference.get("age_max", float("inf")),
+                              reference))
+            elif self.all_ages is None:
+                self.all_ages = reference
+            else:
+                raise ValueError(f"{label} has more than one range for all ages")
+
+        bands.sort(key=lambda band: band[0])
+        for (_, previous_end, _), (start, end, _) in zip(bands, bands[1:]):
+            if start < previous_end:
+                raise ValueError(f"{label} has overlapping age bands at age {start}")
+        self.starts = [start for start, _, _ in bands]
+        self.ends = [end for _, end, _ in bands]
+        self.ranges = [reference for _, _, reference in bands]
+
+    def band(self, age: Optional[float]) -> Optional[dict]:
+        """The age band covering `age`, or None"""
+        if age is None or not self.starts:
+            return None
+        i = bisect_right(self.starts, age) - 1
+        if i >= 0 and age < self.ends[i]:
+            return self.ranges[i]
+        return None
+
+
+class AnalyteRegistry:
+    """Canonical analytes with an O(1) alias index"""
+
+    def __init__(self, analytes: list, version: int = 1):
+        self.version = version
+        self.by_id = {}
+        self.alias_index = {}
+        # analyte id -> {"male" | "female" | None: AgeBandIndex}
+        self.range_index = {}
+
+        for analyte in analytes:
+            analyte_id = analyte["id"]
+            # Reference ranges carry their unit so callers get a complete range dict
+            analyte["ranges"] = [
+                {**reference, "unit": analyte["unit"]} for reference in analyte.get("ranges", [])
+            ]
+            self.by_id[analyte_id] = analyte
+            by_sex = {}
+            for reference in analyte["ranges"]:
+                by_sex.setdefault(reference.get("sex"), []).append(reference)
+            self.range_index[analyte_id] = {
+                sex: AgeBandIndex(f"{analyte_id} ({sex or 'any sex'})", references)
+                for sex, references in by_sex.items()
+            }
+            for alias in [analyte_id, analyte["name"], *analyte.get("aliases", [])]:
+                self.alias_index[normalize_name(alias)] = analyte_id
+            if analyte.get("loinc"):
+                self.alias_index[analyte["loinc"]] = analyte_id
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_REGISTRY_PATH) -> "AnalyteRegistry":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["analytes"], version=data.get("version", 1))
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Canonical id for a metric name, alias or LOINC code, or None"""
+        return self.alias_index.get(normalize_name(name))
+
+    def get(self, analyte_id: str) -> Optional[dict]:
+        return self.by_id.get(analyte_id)
+
+    def aliases(self) -> dict:
+        """{analyte id: [aliases]} for building the metric scanner"""
+        return {analyte_id: analyte.get("aliases", [])
+                for analyte_id, analyte in self.by_id.items()}
+
+    def reference_range(self, analyte_id: str, sex: str = "general",
+                        age: float = None) -> Optional[dict]:
+        """Most specific range for the patient, or None
+
+        An age band covering the patient wins over an all-ages range, and
+        within each a range for the patient's sex wins over one with no sex.
+        Age bands only apply when `age` (in years) is given. The returned
+        dict is shared, so treat it as read-only.
+        """
+        by_sex = self.range_index.get(analyte_id)
+        if not by_sex:
+            return None
+
+        sexed = by_sex.get(sex) if sex in ("male", "female") else None
+        unsexed = by_sex.get(None)
+        if age is not None:
+            reference = ((sexed.band(age) if sexed else None)
+                         or (unsexed.band(age) if unsexed else None))
+            if reference is not None:
+                return reference
+        return ((sexed.all_ages if sexed else None)
+                or (unsexed.all_ages if unsexed else None))
+
+
+@lru_cache(maxsize=None)
+def get_registry(path: str = DEFAULT_REGISTRY_PATH) -> AnalyteRegistry:
+    """The registry loaded from `path`, parsed once per process"""
+    return AnalyteRegistry.load(path)
@@ -0,0 +1,227 @@
+"""
+Cohort Aggregator - Population Statistics over Health Insights Reports
+Folds finished reports into running counts in one pass: abnormal rates per
+analyte, pattern prevalence and the risk-level distribution. Counts are kept
+per time bucket (day, hour or month) so any window can be queried by merging
+buckets. Every statistic is a count, sum, min or max, so partial aggregates
+from worker shards or separate runs merge into the same result as one pass
+(means agree up to float rounding).
+"""
+
+import re
+from datetime import datetime
+from typing import Iterable, Optional
+
+from analyte_registry import get_registry
+
+BUCKET_WIDTHS = {"month": 7, "day": 10, "hour": 13}
+RISK_LEVELS = ["low", "moderate", "high"]
+
+# "Date: 2024-02-05" style lines in report text
+REPORT_DATE_RE = re.compile(r"^\s*(?:Date|Collected|Collection Date)\s*:\s*(\d{4}-\d{2}-\d{2})",
+                            re.IGNORECASE | re.MULTILINE)
+
+
+def report_date(report_text: str) -> Optional[str]:
+    """The ISO date a report text was collected on, if it states one"""
+    match = REPORT_DATE_RE.search(report_text)
+    return match.group(1) if match else None
+
+
+class CohortAggregate:
+    """Additive statistics for a set of reports"""
+
+    def __init__(self):
+        self.reports = 0
+        self.failed = 0
+        self.risk_levels = {}
+        self.risk_score_sum = 0
+        self.patterns = {}
+        # analyte id -> [results, low, high, sum, min, max]
+        self.analytes = {}
+
+    def add(self, report: dict):
+        self.reports += 1
+        risk = report["risk_assessment"]
+        level = risk.get("risk_level", "unknown")
+        self.risk_levels[level] = self.risk_levels.get(level, 0) + 1
+        self.risk_score_sum += risk.get("risk_score", 0)
+
+        for pattern in report["patterns"]:
+            name = pattern["pattern"]
+            self.patterns[name] = self.patterns.get(name, 0) + 1
+
+        registry = get_registry()
+        analysis = report["metrics_analysis"]
+        for flag in analysis["normal"] + analysis["abnormal"]:
+            analyte_id = registry.resolve(flag["metric"]) or flag["metric"]
+            value = flag["value"]
+            stats = self.analytes.get(analyte_id)
+            if stats is None:
+                stats = self.analytes[analyte_id] = [0, 0, 0, 0.0, value, value]
+            stats[0] += 1
+            if flag["severity"] == "low":
+                stats[1] += 1
+            elif flag["severity"] == "high":
+                stats[2] += 1
+            stats[3] += value
+            if value < stats[4]:
+                stats[4] = value
+            if value > stats[5]:
+                stats[5] = value
+
+    def merge(self, other: "CohortAggregate") -> "CohortAggregate":
+        self.reports += other.reports
+        self.failed += other.failed
+        self.risk_score_sum += other.risk_score_sum
+        for level, count in other.risk_levels.items():
+            self.risk_levels[level] = self.risk_levels.get(level, 0) + count
+        for name, count in other.patterns.items():
+            self.patterns[name] = self.patterns.get(name, 0) + count
+        for analyte_id, theirs in other.analytes.items():
+            ours = self.analytes.get(analyte_id)
+            if ours is None:
+                self.analytes[analyte_id] = list(theirs)
+                continue
+            for i in range(4):
+                ours[i] += theirs[i]
+            ours[4] = min(ours[4], theirs[4])
+            ours[5] = max(ours[5], theirs[5])
+        return self
+
+    def summary(self) -> dict:
+        """Rates and distributions for display"""
+        reports = self.reports
+        registry = get_registry()
+        analytes = []
+        for analyte_id, (results, low, high, total, low_value, high_value) in self.analytes.items():
+            analyte = registry.get(analyte_id)
+            analytes.append({
+                "analyte_id": analyte_id,
+                "name": analyte["name"] if analyte else analyte_id,
+                "unit": analyte["unit"] if analyte else None,
+                "results": results,
+                "low": low,
+                "high": high,
+                "abnormal_rate": (low + high) / results,
+                "mean": total / results,
+                "min": low_value,
+                "max": high_value
+            })
+        analytes.sort(key=lambda item: item["abnormal_rate"], reverse=True)
+
+        return {
+            "status": "success",
+            "reports": reports,
+            "failed": self.failed,
+            "mean_risk_score": self.risk_score_sum / reports if reports else 0.0,
+            "risk_distribution": {
+                level: {"count": self.risk_levels.get(level, 0),
+                        "share": self.risk_levels.get(level, 0) / reports if reports else 0.0}
+                for level in RISK_LEVELS + sorted(set(self.risk_levels) - set(RISK_LEVELS))
+            },
+            "pattern_prevalence": sorted(
+                ({"pattern": name, "reports": count, "prevalence": count / reports}
+                 for name, count in self.patterns.items()),
+                key=lambda item: item["reports"], reverse=True
+            ),
+            "analytes": analytes
+        }
+
+    def to_dict(self) -> dict:
+        return {"reports": self.reports, "failed": self.failed,
+                "risk_levels": dict(self.risk_levels), "risk_score_sum": self.risk_score_sum,
+                "patterns": dict(self.patterns),
+                "analytes": {key: list(stats) for key, stats in self.analytes.items()}}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CohortAggregate":
+        aggregate = cls()
+        aggregate.reports = data["reports"]
+        aggregate.failed = data["failed"]
+        aggregate.risk_levels = dict(data["risk_levels"])
+        aggregate.risk_score_sum = data["risk_score_sum"]
+        aggregate.patterns = dict(data["patterns"])
+        aggregate.analytes = {key: list(stats) for key, stats in data["analytes"].items()}
+        return aggregate
+
+
+class CohortAggregator:
+    """CohortAggregates per time bucket, queryable by window
+
+    Reports are bucketed by `observed_at` (an ISO date or datetime), falling
+    back to the report's generated_at timestamp.
+    """
+
+    def __init__(self, bucket: str = "day"):
+        if bucket not in BUCKET_WIDTHS:
+            raise ValueError(f"bucket must be one of {sorted(BUCKET_WIDTHS)}")
+        self.bucket = bucket
+        self.buckets = {}
+
+    def _key(self, when) -> str:
+        if isinstance(when, datetime):
+            when = when.isoformat()
+        return str(when)[:BUCKET_WIDTHS[self.bucket]]
+
+    def _aggregate(self, key: str) -> CohortAggregate:
+        aggregate = self.buckets.get(key)
+        if aggregate is None:
+            aggregate = self.buckets[key] = CohortAggregate()
+        return aggregate
+
+    def add(self, report: dict, observed_at=None):
+        self._aggregate(self._key(observed_at or report["generated_at"])).add(report)
+
+    def add_result(self, result: dict, observed_at=None):
+        """Add a run_batch/stream result; errors only count as failures"""
+        observed_at = observed_at or result.get("observed_at")
+        if result["status"] == "success":
+            self.add(result["report"], observed_at)
+        else:
+            self._aggregate(self._key(observed_at or datetime.now())).failed += 1
+
+    def add_results(self, results: Iterable[dict], observed_at: dict = None) -> "CohortAggregator":
+        """Add many results; `observed_at` optionally maps result index -> date"""
+        observed_at = observed_at or {}
+        for result in results:
+            self.add_result(result, observed_at.get(result.get("index")))
+        return self
+
+    def merge(self, other: "CohortAggregator") -> "CohortAggregator":
+        if other.bucket != self.bucket:
+            raise ValueError("Cannot merge aggregators with different buckets")
+        for key, aggregate in other.buckets.items():
+            self._aggregate(key).merge(aggregate)
+        return self
+
+    def query(self, start=None, end=None) -> CohortAggregate:
+        """Combined statistics of the buckets between `start` and `end`, inclusive"""
+        start = self._key(start) if start is not None else None
+        end = self._key(end) if end is not None else None
+        combined = CohortAggregate()
+        for key, aggregate in self.buckets.items():
+            if (start is None or key >= start) and (end is None or key <= end):
+                combined.merge(aggregate)
+        return combined
+
+    def timeline(self) -> list:
+        """(bucket, reports, high-risk share) per bucket, oldest first"""
+        rows = []
+        for key in sorted(self.buckets):
+            aggregate = self.buckets[key]
+            high = aggregate.risk_levels.get("high", 0)
+            rows.append({"bucket": key, "reports": aggregate.reports,
+                         "high_risk_share": high / aggregate.reports if aggregate.reports else 0.0})
+        return rows
+
+    def to_dict(self) -> dict:
+        return {"bucket": self.bucket,
+                "buckets": {key: aggregate.to_dict() for key, aggregate in self.buckets.items()}}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CohortAggregator":
+        aggregator = cls(data["bucket"])
+        aggregator.buckets = {key: CohortAggregate.from_dict(aggregate)
+                              for key, aggregate in data["buckets"].items()}
+        return aggregator
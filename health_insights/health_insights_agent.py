@@ -6,19 +6,64 @@ Always consult with healthcare professionals for medical advice.
 """
 
 import json
+import os
 import re
-from typing import Any
+import time
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from typing import Any, Iterable, Iterator, Optional
 from datetime import datetime
 
+from analyte_registry import get_registry
+from instrumentation import NULL_TRACE, PipelineInstrumentation
+from metric_scanner import default_scanner
+from pattern_rules import get_rule_engine
+from pdf_extraction import extract_pdf_text, is_pdf
+from records import (FlagRecord, MetricRecord, ReportRecord, RiskRecord, flag_dict,
+                     report_dict, risk_dict, risk_level)
+from report_columns import ReportColumns
+from result_cache import ResultCache
+from trend_store import TrendStore
+from unit_conversion import convert
+
 # ============================================================================
 # TOOL IMPLEMENTATIONS
 # ============================================================================
 
-def pdf_processor(pdf_content: str) -> dict:
-    """Extract text from PDF content"""
+def pdf_processor(pdf_content) -> dict:
+    """Extract text from PDF content
+    
+    Accepts PDF bytes or a path to a .pdf file; anything else is treated as
+    already-extracted report text and passed through unchanged.
+    """
+    if not is_pdf(pdf_content):
+        return {
+            "status": "success",
+            "extracted_text": pdf_content,
+            "source_type": "text",
+            "extraction_timestamp": datetime.now().isoformat()
+        }
+    
+    try:
+        extraction = extract_pdf_text(pdf_content)
+    except Exception as e:
+        return {
+            "status": "error",
+            "error": f"Could not read PDF: {e}",
+            "extracted_text": "",
+            "source_type": "pdf"
+        }
+    
     return {
         "status": "success",
-        "extracted_text": pdf_content,
+        "extracted_text": extraction["text"],
+        "source_type": "pdf",
+        "page_count": extraction["page_count"],
+        "content_hash": extraction["content_hash"],
+        "cached": extraction["cached"],
         "extraction_timestamp": datetime.now().isoformat()
     }
 
@@ -36,32 +81,8 @@ def text_cleaner(raw_text: str) -> dict:
 
 
 def lab_metric_extractor(text: str) -> dict:
-    """Extract lab metrics and values from text"""
-    metrics = {}
-    
-    # Pattern: metric_name: value unit
-    pattern = r'([A-Za-z\s]+?):\s*([\d\.]+)\s*([A-Za-z/%]*)'
-    matches = re.findall(pattern, text)
-    
-    # Keywords to skip (not actual metrics)
-    skip_keywords = ['date', 'patient', 'age', 'gender', 'time', 'result', 'test', 'laboratory']
-    
-    for metric_name, value, unit in matches:
-        metric_name = metric_name.strip()
-        metric_lower = metric_name.lower()
-        
-        # Skip non-metric entries
-        if any(skip in metric_lower for skip in skip_keywords):
-            continue
-        
-        try:
-            metrics[metric_name] = {
-                "value": float(value),
-                "unit": unit.strip() if unit else "unknown",
-                "raw": f"{value} {unit}"
-            }
-        except ValueError:
-            continue
+    """Extract lab metrics and values from raw or cleaned text in a single pass"""
+    metrics = default_scanner.scan(text)
     
     return {
         "status": "success",
@@ -70,25 +91,22 @@ def lab_metric_extractor(text: str) -> dict:
     }
 
 
+def _analyte_id(metric_name: str, data: dict):
+    """Canonical analyte of an extracted metric, resolving the name if the extractor didn't"""
+    return data.get("analyte_id") or get_registry().resolve(metric_name)
+
+
 def unit_normalizer(metrics: dict) -> dict:
-    """Normalize units to standard forms"""
-    unit_conversions = {
-        "mg/dL": {"glucose": 1, "cholesterol": 1},
-        "mmol/L": {"glucose": 0.0555, "cholesterol": 0.0259},
-        "g/dL": {"hemoglobin": 1},
-        "g/L": {"hemoglobin": 10},
-        "IU/L": {"alt": 1, "ast": 1},
-        "U/L": {"alt": 1, "ast": 1},
-    }
-    
+    """Normalize units to the standard units used by the reference ranges"""
     normalized = {}
     for metric_name, data in metrics.items():
+        value, unit, applied = convert(_analyte_id(metric_name, data), data["value"], data["unit"])
         normalized[metric_name] = {
             "original_value": data["value"],
             "original_unit": data["unit"],
-            "normalized_value": data["value"],
-            "normalized_unit": data["unit"],
-            "conversion_applied": False
+            "normalized_value": value,
+            "normalized_unit": unit,
+            "conversion_applied": applied
         }
     
     return {
@@ -97,133 +115,53 @@ def unit_normalizer(metrics: dict) -> dict:
     }
 
 
-def clinical_reference_lookup(metric_name: str, gender: str = "general") -> dict:
-    """Look up clinical reference ranges"""
-    reference_ranges = {
-        "glucose": {
-            "normal": {"min": 70, "max": 100, "unit": "mg/dL"},
-            "fasting": {"min": 70, "max": 100, "unit": "mg/dL"},
-            "postprandial": {"min": 70, "max": 140, "unit": "mg/dL"}
-        },
-        "hemoglobin": {
-            "male": {"min": 13.5, "max": 17.5, "unit": "g/dL"},
-            "female": {"min": 12.0, "max": 15.5, "unit": "g/dL"}
-        },
-        "cholesterol": {
-            "total": {"min": 0, "max": 200, "unit": "mg/dL", "optimal": True},
-            "ldl": {"min": 0, "max": 100, "unit": "mg/dL", "optimal": True},
-            "hdl": {"min": 40, "max": 999, "unit": "mg/dL", "optimal": True}
-        },
-        "triglycerides": {
-            "normal": {"min": 0, "max": 150, "unit": "mg/dL"}
-        },
-        "alt": {
-            "normal": {"min": 7, "max": 56, "unit": "U/L"}
-        },
-        "ast": {
-            "normal": {"min": 10, "max": 40, "unit": "U/L"}
-        },
-        "creatinine": {
-            "male": {"min": 0.7, "max": 1.3, "unit": "mg/dL"},
-            "female": {"min": 0.6, "max": 1.1, "unit": "mg/dL"}
-        },
-        "bun": {
-            "normal": {"min": 7, "max": 20, "unit": "mg/dL"}
-        }
-    }
-    
-    metric_lower = metric_name.lower()
-    
-    # Handle variations in metric names
-    metric_map = {
-        "fasting glucose": "glucose",
-        "total cholesterol": "cholesterol",
-        "ldl cholesterol": "ldl",
-        "hdl cholesterol": "hdl",
-        "ldl": "cholesterol",
-        "hdl": "cholesterol",
-        "total": "cholesterol"
-    }
+def clinical_reference_lookup(metric_name: str, gender: str = "general", age: float = None) -> dict:
+    """Look up clinical reference ranges
     
-    # Check if it's a mapped metric
-    if metric_lower in metric_map:
-        metric_lower = metric_map[metric_lower]
+    `metric_name` may be any alias or LOINC code known to the analyte
+    registry ("LDL Cholesterol", "ldl", "2089-1"). Sex-specific ranges are
+    used for "male"/"female"; "general" gets the range covering both. With
+    the patient's `age` in years, an age band covering it is preferred.
+    """
+    registry = get_registry()
+    analyte_id = registry.resolve(metric_name)
+    reference_range = registry.reference_range(analyte_id, gender, age) if analyte_id else None
     
-    if metric_lower in reference_ranges:
-        ranges = reference_ranges[metric_lower]
-        if gender in ranges:
-            return {"status": "success", "reference_range": ranges[gender]}
-        elif "normal" in ranges:
-            return {"status": "success", "reference_range": ranges["normal"]}
+    if reference_range is None:
+        return {"status": "not_found", "reference_range": None}
     
-    return {"status": "not_found", "reference_range": None}
+    return {
+        "status": "success",
+        "analyte_id": analyte_id,
+        "loinc": registry.get(analyte_id).get("loinc"),
+        "reference_range": dict(reference_range)
+    }
 
 
 def abnormal_flag_detector(metric_name: str, value: float, reference_range: dict) -> dict:
     """Detect abnormal values"""
-    is_abnormal = False
     severity = "normal"
-    direction = None
-    
     if value < reference_range["min"]:
-        is_abnormal = True
         severity = "low"
-        direction = "below"
     elif value > reference_range["max"]:
-        is_abnormal = True
         severity = "high"
-        direction = "above"
     
-    return {
-        "status": "success",
-        "metric": metric_name,
-        "value": value,
-        "is_abnormal": is_abnormal,
-        "severity": severity,
-        "direction": direction,
-        "reference_range": reference_range
-    }
+    return flag_dict(metric_name, value, severity, reference_range)
+
+
+def _analyte_values(metrics: dict) -> dict:
+    """{analyte id: value} for the metrics the registry recognizes"""
+    values = {}
+    for metric_name, data in metrics.items():
+        analyte_id = _analyte_id(metric_name, data)
+        if analyte_id:
+            values[analyte_id] = data["value"]
+    return values
 
 
 def pattern_detector(metrics: dict) -> dict:
-    """Detect multi-marker risk patterns"""
-    patterns = []
-    
-    # Metabolic syndrome pattern
-    if ("glucose" in metrics and metrics["glucose"]["value"] > 100 and
-        "triglycerides" in metrics and metrics["triglycerides"]["value"] > 150):
-        patterns.append({
-            "pattern": "metabolic_concern",
-            "markers": ["glucose", "triglycerides"],
-            "description": "Elevated glucose and triglycerides may indicate metabolic concerns"
-        })
-    
-    # Lipid profile concern
-    if ("cholesterol" in metrics and metrics["cholesterol"]["value"] > 200 and
-        "hdl" in metrics and metrics["hdl"]["value"] < 40):
-        patterns.append({
-            "pattern": "lipid_concern",
-            "markers": ["cholesterol", "hdl"],
-            "description": "Lipid profile shows potential cardiovascular risk markers"
-        })
-    
-    # Liver function concern
-    if ("alt" in metrics and metrics["alt"]["value"] > 56 and
-        "ast" in metrics and metrics["ast"]["value"] > 40):
-        patterns.append({
-            "pattern": "liver_concern",
-            "markers": ["alt", "ast"],
-            "description": "Elevated liver enzymes may indicate liver stress"
-        })
-    
-    # Kidney function concern
-    if ("creatinine" in metrics and metrics["creatinine"]["value"] > 1.3 and
-        "bun" in metrics and metrics["bun"]["value"] > 20):
-        patterns.append({
-            "pattern": "kidney_concern",
-            "markers": ["creatinine", "bun"],
-            "description": "Elevated kidney markers may indicate kidney function concerns"
-        })
+    """Detect multi-marker risk patterns using the rules in pattern_rules.json"""
+    patterns = get_rule_engine().evaluate(_analyte_values(metrics))
     
     return {
         "status": "success",
@@ -234,95 +172,88 @@ def pattern_detector(metrics: dict) -> dict:
 
 def risk_scorer(abnormal_metrics: list, patterns: list) -> dict:
     """Assign risk severity score"""
-    score = 0
-    risk_level = "low"
-    
-    # Score abnormal metrics
-    for metric in abnormal_metrics:
-        if metric["severity"] == "high" or metric["severity"] == "low":
-            score += 1
-    
-    # Score patterns
+    # One point per out-of-range metric, two per pattern
+    score = sum(1 for metric in abnormal_metrics if metric["severity"] in ("high", "low"))
     score += len(patterns) * 2
+    return risk_dict(score, risk_level(score), len(abnormal_metrics), len(patterns))
+
+
+# Used for registry analytes that have no template of their own for a severity
+GENERIC_EXPLANATIONS = {
+    "high": "Your {name} result ({value} {unit}) is above the reference range ({min}-{max} {unit}).",
+    "low": "Your {name} result ({value} {unit}) is below the reference range ({min}-{max} {unit}).",
+    "normal": "Your {name} result ({value} {unit}) is within the reference range."
+}
+
+
+@lru_cache(maxsize=4096)
+def _explanation_template(metric_name: str, severity: str):
+    """Bound format method of the explanation template for a metric name and severity
     
-    if score >= 5:
-        risk_level = "high"
-    elif score >= 2:
-        risk_level = "moderate"
-    else:
-        risk_level = "low"
-    
-    return {
-        "status": "success",
-        "risk_score": score,
-        "risk_level": risk_level,
-        "abnormal_count": len(abnormal_metrics),
-        "pattern_count": len(patterns)
-    }
+    Metric names repeat across reports, so each (name, severity) pair is
+    resolved against the registry once.
+    """
+    registry = get_registry()
+    analyte_id = registry.resolve(metric_name)
+    if analyte_id is None or severity not in GENERIC_EXPLANATIONS:
+        fallback = f"{metric_name} value is {severity}."
+        return lambda **fields: fallback
+    analyte = registry.get(analyte_id)
+    template = analyte.get("explanations", {}).get(severity)
+    if template is None:
+        template = GENERIC_EXPLANATIONS[severity].replace("{name}", analyte["name"])
+    return template.format
+
+
+def _render_explanation(metric_name: str, value: float, reference_range: dict,
+                        severity: str) -> str:
+    return _explanation_template(metric_name, severity)(
+        value=value,
+        unit=reference_range.get("unit", ""),
+        min=reference_range.get("min"),
+        max=reference_range.get("max")
+    )
 
 
 def plain_language_explainer(metric_name: str, value: float, 
                             reference_range: dict, severity: str) -> dict:
     """Generate plain language explanations"""
-    explanations = {
-        "glucose": {
-            "high": f"Your glucose level ({value} mg/dL) is above the normal range (70-100 mg/dL). This may indicate your body is having difficulty regulating blood sugar.",
-            "low": f"Your glucose level ({value} mg/dL) is below the normal range. This may indicate low blood sugar.",
-            "normal": f"Your glucose level ({value} mg/dL) is within normal range."
-        },
-        "hemoglobin": {
-            "high": f"Your hemoglobin ({value} g/dL) is elevated, which may indicate dehydration or other conditions.",
-            "low": f"Your hemoglobin ({value} g/dL) is low, which may indicate anemia or reduced oxygen-carrying capacity.",
-            "normal": f"Your hemoglobin ({value} g/dL) is normal."
-        },
-        "cholesterol": {
-            "high": f"Your total cholesterol ({value} mg/dL) is above 200 mg/dL. Higher levels may increase cardiovascular risk.",
-            "low": f"Your cholesterol is low.",
-            "normal": f"Your cholesterol ({value} mg/dL) is at a healthy level."
-        }
-    }
-    
-    metric_lower = metric_name.lower()
-    if metric_lower in explanations and severity in explanations[metric_lower]:
-        return {
-            "status": "success",
-            "metric": metric_name,
-            "explanation": explanations[metric_lower][severity]
-        }
-    
     return {
         "status": "success",
         "metric": metric_name,
-        "explanation": f"{metric_name} value is {severity}."
+        "explanation": _render_explanation(metric_name, value, reference_range, severity)
     }
 
 
+def explain_report(report: dict, include_normal: bool = False) -> dict:
+    """Add an "explanation" to each flagged metric of a finished report, in place
+    
+    Only the metrics present in the report are rendered, and normal results
+    only when `include_normal` is set. Reports are built and cached without
+    explanations, so this runs on demand when a report is shown.
+    """
+    groups = ("abnormal", "normal") if include_normal else ("abnormal",)
+    for group in groups:
+        for flag in report["metrics_analysis"][group]:
+            if "explanation" not in flag:
+                flag["explanation"] = _render_explanation(
+                    flag["metric"], flag["value"], flag["reference_range"], flag["severity"]
+                )
+    return report
+
+
 def report_builder(metrics: dict, abnormal_flags: list, patterns: list, 
-                  risk_score: dict) -> dict:
-    """Build structured health insight report"""
-    report = {
-        "report_type": "Health Insights Report",
-        "generated_at": datetime.now().isoformat(),
-        "disclaimer": "MEDICAL DISCLAIMER: This report provides educational information only and is NOT a medical diagnosis. Always consult with qualified healthcare professionals for medical advice, diagnosis, or treatment.",
-        "summary": {
-            "total_metrics_analyzed": len(metrics),
-            "abnormal_metrics": len(abnormal_flags),
-            "patterns_detected": len(patterns),
-            "overall_risk_level": risk_score.get("risk_level", "unknown")
-        },
-        "metrics_analysis": {
-            "normal": [m for m in abnormal_flags if m["severity"] == "normal"],
-            "abnormal": [m for m in abnormal_flags if m["severity"] != "normal"]
-        },
-        "patterns": patterns,
-        "risk_assessment": risk_score,
-        "recommendations": [
-            "Consult with your healthcare provider to discuss these results",
-            "Consider lifestyle modifications if recommended by your doctor",
-            "Schedule follow-up testing as advised by your healthcare team",
-            "Maintain a healthy diet and regular exercise routine"
-        ]
-    }
+                  risk_score: dict, trends: list = None, explain: bool = False) -> dict:
+    """Build structured health insight report
+    
+    `trends` (from a TrendStore) adds a section comparing each analyte with
+    the patient's earlier results. `explain` adds plain-language explanations
+    for the abnormal metrics (see explain_report).
+    """
+    report = report_dict(len(metrics), abnormal_flags, patterns, risk_score, trends)
+    
+    if explain:
+        explain_report(report)
     
     return {
         "status": "success",
@@ -334,58 +265,510 @@ def report_builder(metrics: dict, abnormal_flags: list, patterns: list,
 # AGENT DEFINITION (Simplified for standalone use)
 # ============================================================================
 
+def _standard_metrics(metrics: dict, normalized_metrics: dict) -> dict:
+    """Metrics with values and units replaced by their normalized forms"""
+    return {
+        metric_name: {**metrics[metric_name],
+                      "value": data['normalized_value'],
+                      "unit": data['normalized_unit']}
+        for metric_name, data in normalized_metrics.items()
+    }
+
+
+def _analyze_shard(shard: list, gender: str, instrument: bool = False, age: float = None) -> tuple:
+    """Analyze a shard of (index, report_text) pairs inside a worker process.
+
+    Failures are caught per report so one malformed report never loses the
+    rest of its shard. Returns (results, instrumentation snapshot or None).
+    """
+    agent = HealthInsightsAgent(instrumentation=PipelineInstrumentation() if instrument else None)
+    trace = agent._trace("batch")
+    results = []
+    extracted = []
+    for index, report_text in shard:
+        try:
+            extracted.append((index, agent.extract_metrics(report_text)))
+        except Exception as e:
+            results.append({"index": index, "status": "error",
+                            "error": f"{type(e).__name__}: {e}"})
+    trace.mark("extract_metrics", len(shard))
+    
+    # The whole shard is normalized, flagged and scored in vectorized passes;
+    # if that fails, fall back to one report at a time to isolate the culprit
+    try:
+        reports = agent.analyze_batch([metrics for _, metrics in extracted], gender=gender,
+                                      age=age, trace=trace)
+        results.extend({"index": index, "status": "success", "report": report}
+                       for (index, _), report in zip(extracted, reports))
+    except Exception:
+        for index, metrics in extracted:
+            try:
+                results.append({"index": index, "status": "success",
+                                "report": agent.analyze_metrics(metrics, gender=gender, age=age)})
+            except Exception as e:
+                results.append({"index": index, "status": "error",
+                                "error": f"{type(e).__name__}: {e}"})
+    
+    trace.finish()
+    snapshot = agent.instrumentation.snapshot() if instrument else None
+    return results, snapshot
+
+
 class HealthInsightsAgent:
     """Simplified Health Insights Agent for standalone use"""
     
-    def __init__(self):
+    def __init__(self, trend_store: TrendStore = None, result_cache: ResultCache = None,
+                 instrumentation: PipelineInstrumentation = None):
         self.name = "Health Insights Agent"
         self.description = "Analyzes medical reports and lab tests to provide educational health insights"
+        self.trend_store = trend_store
+        self.result_cache = result_cache
+        self.instrumentation = instrumentation
+        self.last_batch_stats = None
+    
+    def _trace(self, kind: str = "report"):
+        """A stage trace, or the no-op NULL_TRACE when instrumentation is off"""
+        if self.instrumentation is None:
+            return NULL_TRACE
+        return self.instrumentation.trace(kind)
+    
+    def run(self, report_text, gender: str = "general", age: float = None, patient_id: str = None,
+            observed_at=None, explain: bool = False) -> dict:
+        """Run complete analysis on a medical report (text, PDF bytes or PDF path)
+        
+        `age` (years) selects age-banded reference ranges where there are any.
+        With a trend store and a `patient_id`, the results are recorded as of
+        `observed_at` (default: now) and the report gains a trends section.
+        `explain` adds plain-language explanations of the abnormal metrics.
+        """
+        trace = self._trace()
+        # Recording trends is a side effect, so those runs always execute
+        key = self._cache_key(report_text, gender, age) if patient_id is None else None
+        if key:
+            cached = self.result_cache.get(key)
+            trace.mark("cache_lookup", 0 if cached is None else 1)
+            if cached is not None:
+                if explain:
+                    explain_report(cached)
+                    trace.mark("explain", len(cached["metrics_analysis"]["abnormal"]))
+                trace.finish()
+                return cached
+        
+        metrics = self.extract_metrics(report_text, trace=trace)
+        report = self.analyze_metrics(metrics, gender=gender, age=age, patient_id=patient_id,
+                                      observed_at=observed_at, trace=trace)
+        if key:
+            self.result_cache.put(key, report)
+            trace.mark("cache_store", 1)
+        # Explanations are rendered after caching so cached reports stay lean
+        if explain:
+            explain_report(report)
+            trace.mark("explain", len(report["metrics_analysis"]["abnormal"]))
+        trace.finish()
+        return report
+    
+    def analyze_text(self, report_text: str, gender: str = "general", age: float = None) -> dict:
+        """run() for report text only: the input is never read as PDF bytes or a path
+        
+        For untrusted input such as a model's tool call, where a string that
+        happens to name a local PDF must not open that file.
+        """
+        if not isinstance(report_text, str):
+            raise TypeError(f"report_text must be str, not {type(report_text).__name__}")
+        trace = self._trace()
+        key = self.result_cache.text_key(report_text, gender, age) if self.result_cache else None
+        if key:
+            cached = self.result_cache.get(key)
+            trace.mark("cache_lookup", 0 if cached is None else 1)
+            if cached is not None:
+                trace.finish()
+                return cached
+        
+        extract_result = lab_metric_extractor(report_text)
+        trace.mark("extract_metrics", extract_result['metrics_found'])
+        report = self.analyze_metrics(extract_result['metrics'], gender=gender, age=age,
+                                      trace=trace)
+        if key:
+            self.result_cache.put(key, report)
+            trace.mark("cache_store", 1)
+        trace.finish()
+        return report
+    
+    def _cache_key(self, report_text, gender: str, age: float = None):
+        """Result cache key, or None when caching is off or the input can't be hashed"""
+        if self.result_cache is None:
+            return None
+        try:
+            return self.result_cache.key(report_text, gender, age)
+        except (AttributeError, TypeError, OSError):
+            return None
     
-    def run(self, report_text: str, gender: str = "general") -> dict:
-        """Run complete analysis on a medical report"""
+    def _lookup_cached(self, reports: Iterable, gender: str, age: Optional[float],
+                       cache_keys: dict) -> Iterator[tuple]:
+        """Yield ("hit", result) for cached reports and ("miss", (index, text)) for the rest
+        
+        The cache key of each miss is left in `cache_keys` so its report can be
+        stored once it has been analyzed.
+        """
+        for index, report_text in enumerate(reports):
+            key = self._cache_key(report_text, gender, age)
+            if key:
+                cached = self.result_cache.get(key)
+                if cached is not None:
+                    yield "hit", {"index": index, "status": "success", "report": cached}
+                    continue
+                cache_keys[index] = key
+            yield "miss", (index, report_text)
+    
+    def extract_metrics(self, report_text, trace=NULL_TRACE) -> dict:
+        """Run steps 1-2 (text extraction and metric extraction)"""
         
-        # Step 1: Process text
-        clean_result = text_cleaner(report_text)
-        cleaned_text = clean_result['cleaned_text']
+        # Step 1: Extract text
+        pdf_result = pdf_processor(report_text)
+        if pdf_result['status'] != 'success':
+            raise ValueError(pdf_result['error'])
+        report_text = pdf_result['extracted_text']
+        trace.mark("extract_text", pdf_result.get('page_count', 1))
         
-        # Step 2: Extract metrics
-        extract_result = lab_metric_extractor(cleaned_text)
-        metrics = extract_result['metrics']
+        # Step 2: Extract metrics (the scanner tokenizes raw text itself,
+        # so a separate text_cleaner pass is not needed)
+        extract_result = lab_metric_extractor(report_text)
+        trace.mark("extract_metrics", extract_result['metrics_found'])
+        return extract_result['metrics']
+    
+    def analyze_metrics(self, metrics: dict, gender: str = "general", age: float = None,
+                        patient_id: str = None, observed_at=None, trace=None) -> dict:
+        """Run steps 3-7 (normalize through report) on already extracted metrics
+        
+        Stage timings go to `trace` when run() passes one; a direct call with
+        instrumentation on records a trace of its own.
+        """
+        own_trace = trace is None
+        if own_trace:
+            trace = self._trace()
+        
+        record = self.analyze_records(metrics, gender=gender, age=age, patient_id=patient_id,
+                                      observed_at=observed_at, trace=trace)
+        report = record.to_dict()
+        trace.mark("build_report", 1)
+        
+        if own_trace:
+            trace.finish()
+        return report
+    
+    def analyze_records(self, metrics: dict, gender: str = "general", age: float = None,
+                        patient_id: str = None, observed_at=None,
+                        trace=NULL_TRACE) -> ReportRecord:
+        """Steps 3-7 as compact records, without building any report dicts
+        
+        Produces the same content as the tool functions (unit_normalizer,
+        clinical_reference_lookup, abnormal_flag_detector, pattern_detector,
+        risk_scorer) but skips their per-call result dicts.
+        """
+        registry = get_registry()
         
         # Step 3: Normalize units
-        normalize_result = unit_normalizer(metrics)
-        normalized_metrics = normalize_result['normalized_metrics']
+        records = []
+        for metric_name, data in metrics.items():
+            analyte_id = data.get("analyte_id") or registry.resolve(metric_name)
+            value, unit, applied = convert(analyte_id, data["value"], data["unit"])
+            records.append(MetricRecord(metric_name, analyte_id, value, unit,
+                                        data["value"], data["unit"], applied))
+        trace.mark("normalize_units", len(records))
         
         # Step 4: Check references and flag abnormals
-        abnormal_flags = []
-        for metric_name, data in metrics.items():
-            ref_result = clinical_reference_lookup(metric_name, gender=gender)
-            
-            if ref_result['status'] == 'success' and ref_result['reference_range']:
-                ref_range = ref_result['reference_range']
-                flag_result = abnormal_flag_detector(
-                    metric_name,
-                    data['value'],
-                    ref_range
-                )
-                abnormal_flags.append(flag_result)
+        flags = []
+        abnormal = 0
+        for metric in records:
+            reference_range = (registry.reference_range(metric.analyte_id, gender, age)
+                               if metric.analyte_id else None)
+            if reference_range:
+                if metric.value < reference_range["min"]:
+                    severity = "low"
+                elif metric.value > reference_range["max"]:
+                    severity = "high"
+                else:
+                    severity = "normal"
+                abnormal += severity != "normal"
+                flags.append(FlagRecord(metric.name, metric.value, severity, reference_range))
+        trace.mark("flag_abnormal", len(flags))
         
         # Step 5: Detect patterns
-        pattern_result = pattern_detector(metrics)
-        patterns = pattern_result['patterns']
+        patterns = get_rule_engine().evaluate(
+            {metric.analyte_id: metric.value for metric in records if metric.analyte_id}
+        )
+        trace.mark("detect_patterns", len(patterns))
         
         # Step 6: Score risk
-        risk_result = risk_scorer(abnormal_flags, patterns)
+        score = abnormal + len(patterns) * 2
+        risk = RiskRecord(score, risk_level(score), len(flags), len(patterns))
+        trace.mark("score_risk", len(flags))
+        
+        # Step 7: Record history
+        trends = None
+        if self.trend_store is not None and patient_id is not None:
+            trends = self.record_trends(records, patient_id, observed_at, gender, age)
+            trace.mark("record_trends", len(trends))
+        
+        return ReportRecord(records, flags, patterns, risk, trends)
+    
+    def record_trends(self, records: list, patient_id: str, observed_at=None,
+                      gender: str = "general", age: float = None) -> list:
+        """Append a report's recognized analytes (MetricRecords) to the trend store and return their trends"""
+        registry = get_registry()
+        observations = {}
+        for metric in records:
+            if metric.analyte_id:
+                unit = metric.unit if metric.unit != "unknown" else registry.get(metric.analyte_id)["unit"]
+                observations[metric.analyte_id] = (metric.analyte_id, metric.value, unit)
+        trends = self.trend_store.record_many(patient_id, list(observations.values()),
+                                              observed_at=observed_at, gender=gender, age=age)
+        return list(trends.values())
+    
+    def analyze_batch(self, metrics_list: list, gender: str = "general", age: float = None,
+                      trace=None) -> list:
+        """analyze_metrics for many reports, with steps 3-6 vectorized across the batch
+        
+        Produces the same reports as calling analyze_metrics on each one.
+        Stage timings are recorded as one "batch" trace. Report dicts are
+        built straight from the columns with the records module's layout
+        helpers; building ReportRecords first made this slower than
+        analyzing one report at a time.
+        """
+        own_trace = trace is None
+        if own_trace:
+            trace = self._trace("batch")
+        
+        columns, ranges, flagged_rows, severities, patterns_list, scores, levels, flag_counts = \
+            self._batch_columns(metrics_list, gender, age, trace)
+        
+        names = columns.names
+        values = columns.values.tolist()
+        flags = [flag_dict(names[row], values[row], severity, ranges[row])
+                 for row, severity in zip(flagged_rows, severities)]
+        
+        # Rows are contiguous per report, so each report's flags are one slice
+        generated_at = datetime.now().isoformat()
+        reports = []
+        flag_start = 0
+        for metric_count, flag_count, patterns, score, level in zip(
+                columns.metric_counts, flag_counts, patterns_list, scores, levels):
+            reports.append(report_dict(
+                metric_count, flags[flag_start:flag_start + flag_count], patterns,
+                risk_dict(score, level, flag_count, len(patterns)), generated_at=generated_at
+            ))
+            flag_start += flag_count
+        trace.mark("build_report", len(reports))
         
-        # Step 7: Build report
-        report_result = report_builder(metrics, abnormal_flags, patterns, risk_result)
+        if own_trace:
+            trace.finish()
+        return reports
+    
+    def _batch_columns(self, metrics_list: list, gender: str, age: Optional[float], trace) -> tuple:
+        """Steps 3-6 over a whole batch, shared by analyze_batch and analyze_batch_records
+        
+        Returns the ReportColumns, the range per row, the flagged rows and
+        their severities, then per report: patterns, scores, levels and flag
+        counts (as lists).
+        """
+        columns = ReportColumns(metrics_list)
+        trace.mark("normalize_units", len(columns.names))
+        ranges, has_range, low, high = columns.flag(gender, age)
+        flagged_rows, severities = columns.severities(has_range, low, high)
+        trace.mark("flag_abnormal", len(columns.names))
+        patterns_list = columns.patterns()
+        trace.mark("detect_patterns", len(metrics_list))
+        scores, levels, flag_counts = columns.risk(
+            has_range, low, high, [len(patterns) for patterns in patterns_list]
+        )
+        trace.mark("score_risk", len(metrics_list))
+        return (columns, ranges, flagged_rows, severities, patterns_list,
+                scores.tolist(), levels.tolist(), flag_counts.tolist())
+    
+    def analyze_batch_records(self, metrics_list: list, gender: str = "general",
+                              age: float = None, trace=NULL_TRACE) -> list:
+        """analyze_records for many reports, vectorized across the batch
+        
+        The metrics are laid out as columns once (see report_columns) and
+        normalized, flagged, pattern-matched and scored with NumPy. For
+        callers that hold many finished reports at once: records take less
+        memory than report dicts (benchmarks/health_insights_memory.py) and
+        serialize with ReportRecord.to_dict when needed.
+        """
+        columns, ranges, flagged_rows, severities, patterns_list, scores, levels, flag_counts = \
+            self._batch_columns(metrics_list, gender, age, trace)
+        
+        # Build every record with one C-level map, then slice per report; rows
+        # are contiguous per report so the slices keep run()'s order
+        values = columns.values.tolist()
+        metric_records = list(map(MetricRecord, columns.names, columns.analyte_ids, values,
+                                  columns.units, columns.raw_values, columns.raw_units,
+                                  columns.conversion_applied.tolist()))
+        flag_records = list(map(FlagRecord, [columns.names[row] for row in flagged_rows],
+                                [values[row] for row in flagged_rows], severities,
+                                [ranges[row] for row in flagged_rows]))
         
-        return report_result['report']
+        records = []
+        metric_start = flag_start = 0
+        for metric_count, flag_count, patterns, score, level in zip(
+                columns.metric_counts, flag_counts, patterns_list, scores, levels):
+            records.append(ReportRecord(
+                metric_records[metric_start:metric_start + metric_count],
+                flag_records[flag_start:flag_start + flag_count],
+                patterns,
+                RiskRecord(score, level, flag_count, len(patterns))
+            ))
+            metric_start += metric_count
+            flag_start += flag_count
+        return records
+    
+    def run_batch(self, reports: Iterable[str], workers: int = None, gender: str = "general",
+                  age: float = None, shard_size: int = 64, explain: bool = False) -> Iterator[dict]:
+        """Analyze many reports across a process pool.
+
+        Reports are sent to workers in shards of `shard_size` and results are
+        yielded as shards finish, so they arrive in completion order rather
+        than input order; each result carries the report's input `index`.
+        Results look like {"index", "status": "success", "report"} or
+        {"index", "status": "error", "error"}. Only a few shards per worker
+        are in flight at once, so `reports` can be a lazy iterable of any
+        size. Throughput figures are stored in `last_batch_stats` once the
+        generator is exhausted. `workers=1` runs in-process without a pool.
+        With a result cache, cached reports are yielded without being sent to
+        a worker and new reports are cached as they complete. With
+        instrumentation on, each shard's stage timings are merged into it.
+        `explain` renders explanations as each report is yielded. `gender` and
+        `age` apply to every report in the batch. If a worker process dies,
+        the pool is restarted and the shards it took down are retried, so
+        only a report that crashes a worker on its own comes back as an error.
+        """
+        workers = workers or os.cpu_count() or 1
+        stats = {"workers": workers, "total": 0, "succeeded": 0, "failed": 0, "cached": 0}
+        self.last_batch_stats = None
+        start = time.perf_counter()
+        cache_keys = {}
+        items = self._lookup_cached(reports, gender, age, cache_keys)
+
+        def next_shard():
+            """Pull up to shard_size reports; cache hits are returned separately"""
+            pulled = list(islice(items, shard_size))
+            hits = [item[1] for item in pulled if item[0] == "hit"]
+            shard = [item[1] for item in pulled if item[0] == "miss"]
+            return pulled, hits, shard
+
+        instrument = self.instrumentation is not None
+        
+        def tally(results, snapshot=None):
+            if snapshot is not None:
+                self.instrumentation.merge(snapshot)
+            for result in results:
+                stats["total"] += 1
+                stats["succeeded" if result["status"] == "success" else "failed"] += 1
+                key = cache_keys.pop(result["index"], None)
+                if key and result["status"] == "success":
+                    self.result_cache.put(key, result["report"])
+                if explain and result["status"] == "success":
+                    explain_report(result["report"])
+            return results
+
+        if workers == 1:
+            while True:
+                pulled, hits, shard = next_shard()
+                if not pulled:
+                    break
+                stats["cached"] += len(hits)
+                yield from tally(hits)
+                if shard:
+                    yield from tally(*_analyze_shard(shard, gender, instrument, age))
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            pending = {}  # future -> (shard, attempt)
+            # A crashed worker breaks the whole pool and fails every shard in
+            # flight, without saying which report crashed it. Those shards are
+            # retried one report per shard; a report lost in a second crash is
+            # rerun alone, so only the report that crashes a worker by itself
+            # is marked failed.
+            retry = deque()
+            isolate = deque()
+
+            def submit(shard, attempt):
+                nonlocal executor
+                try:
+                    future = executor.submit(_analyze_shard, shard, gender, instrument, age)
+                except BrokenProcessPool:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = ProcessPoolExecutor(max_workers=workers)
+                    future = executor.submit(_analyze_shard, shard, gender, instrument, age)
+                pending[future] = (shard, attempt)
+
+            def collect(future):
+                """Results of a finished shard; a shard lost with the pool is requeued"""
+                shard, attempt = pending.pop(future)
+                try:
+                    return future.result()
+                except BrokenProcessPool as e:
+                    if attempt == "shard":
+                        retry.extend([item] for item in shard)
+                        return [], None
+                    if attempt == "retry":
+                        isolate.extend(shard)
+                        return [], None
+                    error = f"{type(e).__name__}: {e}"
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                return [{"index": index, "status": "error", "error": error}
+                        for index, _ in shard], None
+
+            try:
+                exhausted = False
+                while pending or retry or isolate or not exhausted:
+                    if isolate:
+                        # Suspects run alone, so a crash can only be their own
+                        if not pending:
+                            submit([isolate.popleft()], "isolated")
+                    else:
+                        # Keep two shards per worker queued so no worker sits idle
+                        while len(pending) < workers * 2 and (retry or not exhausted):
+                            if retry:
+                                submit(retry.popleft(), "retry")
+                                continue
+                            pulled, hits, shard = next_shard()
+                            if not pulled:
+                                exhausted = True
+                                break
+                            stats["cached"] += len(hits)
+                            yield from tally(hits)
+                            if shard:
+                                submit(shard, "shard")
+                    if not pending:
+                        continue
+                    
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    broken = any(isinstance(future.exception(), BrokenProcessPool)
+                                 for future in done)
+                    if broken:
+                        # Every other shard in flight went down with the pool
+                        done = list(pending)
+                        wait(done)
+                    for future in done:
+                        yield from tally(*collect(future))
+                    if broken:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        executor = ProcessPoolExecutor(max_workers=workers)
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        elapsed = time.perf_counter() - start
+        stats["elapsed_seconds"] = elapsed
+        stats["reports_per_second"] = stats["total"] / elapsed if elapsed > 0 else 0.0
+        self.last_batch_stats = stats
 
 
-def create_health_insights_agent():
+def create_health_insights_agent(trend_store: TrendStore = None, result_cache: ResultCache = None,
+                                 instrumentation: PipelineInstrumentation = None):
     """Create and configure the Health Insights Agent"""
-    return HealthInsightsAgent()
+    return HealthInsightsAgent(trend_store=trend_store, result_cache=result_cache,
+                               instrumentation=instrumentation)
 
 
 # ============================================================================
@@ -0,0 +1,213 @@
+"""
+Instrumentation - Per-Stage Timing for the Health Insights Pipeline
+Records wall time and item counts for every stage of every report (or batch),
+aggregates them into fixed-bucket histograms and exports them as JSON or in
+the Prometheus text format. Agents without instrumentation use NULL_TRACE,
+whose methods do nothing, so the disabled cost is a few no-op calls per report.
+"""
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+# Upper bounds in seconds; values above the last one land in +Inf
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001,
+                   0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+ITEM_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000, 5000)
+
+
+class Histogram:
+    """Counts per bucket plus sum and count; buckets are upper bounds"""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other: "Histogram"):
+        if other.buckets != self.buckets:
+            raise ValueError("Cannot merge histograms with different buckets")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+    def to_dict(self) -> dict:
+        return {"buckets": list(self.buckets), "counts": list(self.counts),
+                "sum": self.sum, "count": self.count,
+                "mean": self.sum / self.count if self.count else 0.0}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Histogram":
+        histogram = cls(data["buckets"])
+        histogram.counts = list(data["counts"])
+        histogram.sum = data["sum"]
+        histogram.count = data["count"]
+        return histogram
+
+
+class _NullTrace:
+    """Stand-in trace used when instrumentation is off"""
+
+    __slots__ = ()
+
+    def mark(self, stage: str, items: int = None):
+        pass
+
+    def finish(self):
+        return None
+
+
+NULL_TRACE = _NullTrace()
+
+
+class Trace:
+    """Stage timings of one report or batch
+
+    Each mark() closes a stage: its time is measured from the previous mark
+    (or from creation), so marks go right after the work they describe.
+    """
+
+    __slots__ = ("kind", "stages", "_owner", "_started", "_last")
+
+    def __init__(self, owner: "PipelineInstrumentation", kind: str):
+        self.kind = kind
+        self.stages = []
+        self._owner = owner
+        self._started = self._last = time.perf_counter()
+
+    def mark(self, stage: str, items: int = None):
+        now = time.perf_counter()
+        self.stages.append((stage, now - self._last, items))
+        self._last = now
+
+    def finish(self) -> dict:
+        record = {
+            "kind": self.kind,
+            "total_seconds": self._last - self._started,
+            "stages": [{"stage": stage, "seconds": seconds, "items": items}
+                       for stage, seconds, items in self.stages]
+        }
+        self._owner.record(record)
+        return record
+
+
+class PipelineInstrumentation:
+    """Histograms of stage wall time and item counts, per trace kind
+
+    `hooks` are called with every finished trace record (in the process that
+    recorded it), and the last `keep_traces` records are kept in `traces`.
+    Worker processes send back snapshot() and the parent merge()s it.
+    """
+
+    def __init__(self, hooks: list = None, keep_traces: int = 0):
+        self.hooks = list(hooks or [])
+        self.traces = deque(maxlen=keep_traces)
+        self._lock = threading.Lock()
+        self.stage_seconds = {}
+        self.stage_items = {}
+        self.total_seconds = {}
+
+    def trace(self, kind: str = "report") -> Trace:
+        return Trace(self, kind)
+
+    def record(self, record: dict):
+        kind = record["kind"]
+        with self._lock:
+            for stage in record["stages"]:
+                key = (kind, stage["stage"])
+                if key not in self.stage_seconds:
+                    self.stage_seconds[key] = Histogram(LATENCY_BUCKETS)
+                    self.stage_items[key] = Histogram(ITEM_BUCKETS)
+                self.stage_seconds[key].observe(stage["seconds"])
+                if stage["items"] is not None:
+                    self.stage_items[key].observe(stage["items"])
+            if kind not in self.total_seconds:
+                self.total_seconds[kind] = Histogram(LATENCY_BUCKETS)
+            self.total_seconds[kind].observe(record["total_seconds"])
+            if self.traces.maxlen:
+                self.traces.append(record)
+        for hook in self.hooks:
+            hook(record)
+
+    def snapshot(self) -> dict:
+        """JSON-serializable histograms"""
+        with self._lock:
+            stages = {}
+            for (kind, stage), seconds in self.stage_seconds.items():
+                stages.setdefault(kind, {})[stage] = {
+                    "seconds": seconds.to_dict(),
+                    "items": self.stage_items[(kind, stage)].to_dict()
+                }
+            totals = {kind: histogram.to_dict() for kind, histogram in self.total_seconds.items()}
+        return {"stages": stages, "totals": totals}
+
+    def merge(self, snapshot: dict):
+        """Add the histograms of a snapshot(), e.g. one from a worker process"""
+        with self._lock:
+            for kind, stages in snapshot["stages"].items():
+                for stage, data in stages.items():
+                    key = (kind, stage)
+                    seconds = Histogram.from_dict(data["seconds"])
+                    items = Histogram.from_dict(data["items"])
+                    if key in self.stage_seconds:
+                        self.stage_seconds[key].merge(seconds)
+                        self.stage_items[key].merge(items)
+                    else:
+                        self.stage_seconds[key] = seconds
+                        self.stage_items[key] = items
+            for kind, data in snapshot["totals"].items():
+                total = Histogram.from_dict(data)
+                if kind in self.total_seconds:
+                    self.total_seconds[kind].merge(total)
+                else:
+                    self.total_seconds[kind] = total
+
+    def reset(self):
+        with self._lock:
+            self.stage_seconds.clear()
+            self.stage_items.clear()
+            self.total_seconds.clear()
+            self.traces.clear()
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix: str = "health_insights") -> str:
+        """Histograms in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+
+        def histogram_lines(name: str, labels: str, data: dict):
+            cumulative = 0
+            for bound, count in zip(data["buckets"], data["counts"]):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {data["count"]}')
+            lines.append(f"{name}_sum{{{labels}}} {data['sum']:.9g}")
+            lines.append(f"{name}_count{{{labels}}} {data['count']}")
+
+        for metric, field, help_text in (
+                ("stage_seconds", "seconds", "Wall time per pipeline stage"),
+                ("stage_items", "items", "Items handled per pipeline stage")):
+            name = f"{prefix}_{metric}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for kind, stages in sorted(snapshot["stages"].items()):
+                for stage, data in sorted(stages.items()):
+                    histogram_lines(name, f'kind="{kind}",stage="{stage}"', data[field])
+
+        name = f"{prefix}_total_seconds"
+        lines.append(f"# HELP {name} Wall time per report or batch")
+        lines.append(f"# TYPE {name} histogram")
+        for kind, data in sorted(snapshot["totals"].items()):
+            histogram_lines(name, f'kind="{kind}"', data)
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,100 @@
+"""
+Metric Scanner - Single-Pass Lab Metric Extraction
+Finds every "name: value unit" measurement in one pass of a single
+precompiled pattern and resolves each name against a reversed-token trie of
+the analyte registry's aliases, so there are no cleaning passes or per-match
+keyword loops. Works on raw or cleaned report text.
+"""
+
+import re
+from typing import Dict, Iterable
+
+from analyte_registry import get_registry
+
+# Words that mark report metadata rather than a measurement; only applied to
+# names that are not known aliases
+SKIP_RE = re.compile(r"date|patient|age|gender|time|result|test|laboratory")
+
+# Distinct metric names remembered by MetricScanner.metric_key
+NAME_CACHE_SIZE = 4096
+
+# One linear pass over the text: each match is a run of name words on a
+# single line followed by ": value [unit]". A unit is not taken when it is
+# really the next metric's name.
+MEASUREMENT_RE = re.compile(r"""
+    (?<![A-Za-z0-9])(?P<name>[A-Za-z][A-Za-z0-9]*(?:[ \t]+[A-Za-z][A-Za-z0-9]*)*)
+    [ \t]*:[ \t]*(?:[<>]=?[ \t]*)?
+    (?P<value>\d[\d,]*(?:\.\d+)?|\.\d+)
+    (?:[ \t]*(?P<unit>%|[A-Za-zµμ%][\w/%]*(?:\.\d+[\w/%]*)*)(?![\w/%]|\s*:))?
+""", re.VERBOSE)
+
+
+class MetricScanner:
+    """Extracts {name: {value, unit, raw, analyte_id}} from report text in one pass"""
+
+    def __init__(self, aliases: Dict[str, Iterable[str]] = None):
+        self._keys = {}
+        self.trie = {}
+        for canonical, spellings in (aliases or get_registry().aliases()).items():
+            for spelling in spellings:
+                node = self.trie
+                # Stored last word first so names are matched backwards from the colon
+                for word in reversed(spelling.lower().split()):
+                    node = node.setdefault(word, {})
+                node[None] = canonical
+
+    def resolve(self, words: list):
+        """Longest known alias ending at the last word, as (canonical, word count)"""
+        node = self.trie
+        match = (None, 0)
+        for depth, word in enumerate(reversed(words), 1):
+            node = node.get(word.lower())
+            if node is None:
+                break
+            if None in node:
+                match = (node[None], depth)
+        return match
+
+    def metric_key(self, name: str):
+        """(key, analyte id) to store a matched name under; key is None for metadata
+
+        The key is the known alias right before the colon, or the whole run
+        of words for analytes we don't know. Results are memoized because the
+        same few names repeat across every report.
+        """
+        resolved = self._keys.get(name)
+        if resolved is not None:
+            return resolved
+
+        words = name.split()
+        canonical, depth = self.resolve(words)
+        if canonical:
+            resolved = (" ".join(words[-depth:]), canonical)
+        elif SKIP_RE.search(name.lower()):
+            resolved = (None, None)
+        else:
+            resolved = (" ".join(words), None)
+
+        if len(self._keys) >= NAME_CACHE_SIZE:
+            self._keys.clear()
+        self._keys[name] = resolved
+        return resolved
+
+    def scan(self, text: str) -> dict:
+        """Return metrics keyed by their name as written in the report"""
+        metrics = {}
+        metric_key = self.metric_key
+        for name, value, unit in MEASUREMENT_RE.findall(text):
+            key, analyte_id = metric_key(name)
+            if key is None:
+                continue
+            metrics[key] = {
+                "value": float(value.replace(",", "")),
+                "unit": unit or "unknown",
+                "raw": f"{value} {unit}",
+                "analyte_id": analyte_id
+            }
+        return metrics
+
+
+default_scanner = MetricScanner()
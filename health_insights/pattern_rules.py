@@ -0,0 +1,104 @@
+"""
+Pattern Rules - Declarative Multi-Marker Pattern Engine
+Loads multi-marker rules from pattern_rules.json and compiles each condition
+once into an (analyte id, comparison, threshold) predicate. A report is
+checked against every rule in a single pass over its analyte values, and a
+batch of reports can be checked at once as a NumPy matrix.
+"""
+
+import json
+import operator
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from analyte_registry import get_registry
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pattern_rules.json")
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+class PatternRuleEngine:
+    """Rules compiled to predicates over canonical analyte ids"""
+
+    def __init__(self, rules: list):
+        registry = get_registry()
+        self.rules = []
+        for rule in rules:
+            conditions = []
+            for condition in rule["all"]:
+                analyte_id = registry.resolve(condition["analyte"])
+                if analyte_id is None:
+                    raise ValueError(f"Rule {rule['pattern']!r} uses unknown analyte "
+                                     f"{condition['analyte']!r}")
+                if condition["op"] not in OPERATORS:
+                    raise ValueError(f"Rule {rule['pattern']!r} uses unknown operator "
+                                     f"{condition['op']!r}")
+                conditions.append((analyte_id, OPERATORS[condition["op"]], float(condition["value"])))
+
+            self.rules.append({
+                "conditions": conditions,
+                # Template of the pattern dict reported when the rule fires
+                "result": {
+                    "pattern": rule["pattern"],
+                    "markers": tuple(analyte_id for analyte_id, _, _ in conditions),
+                    "description": rule["description"]
+                }
+            })
+
+        # Column order for the batch matrix: every analyte any rule looks at
+        self.analytes = sorted({analyte_id for rule in self.rules
+                                for analyte_id, _, _ in rule["conditions"]})
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_RULES_PATH) -> "PatternRuleEngine":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f)["rules"])
+
+    def evaluate(self, values: dict) -> list:
+        """Patterns that fire for one report's {analyte id: value}"""
+        patterns = []
+        for rule in self.rules:
+            for analyte_id, compare, threshold in rule["conditions"]:
+                value = values.get(analyte_id)
+                if value is None or not compare(value, threshold):
+                    break
+            else:
+                patterns.append(fired_pattern(rule))
+        return patterns
+
+    def evaluate_matrix(self, matrix) -> list:
+        """Patterns per row of a reports x `self.analytes` matrix
+
+        Missing analytes must be NaN; every comparison with NaN is False.
+        """
+        column = {analyte_id: i for i, analyte_id in enumerate(self.analytes)}
+        fired = np.ones((matrix.shape[0], len(self.rules)), dtype=bool)
+        for r, rule in enumerate(self.rules):
+            for analyte_id, compare, threshold in rule["conditions"]:
+                fired[:, r] &= compare(matrix[:, column[analyte_id]], threshold)
+
+        patterns = [[] for _ in range(matrix.shape[0])]
+        for row, r in zip(*(index.tolist() for index in np.nonzero(fired))):
+            patterns[row].append(fired_pattern(self.rules[r]))
+        return patterns
+
+
+def fired_pattern(rule: dict) -> dict:
+    """A fresh pattern dict for a fired rule, so reports never share one"""
+    result = rule["result"]
+    return {"pattern": result["pattern"], "markers": list(result["markers"]),
+            "description": result["description"]}
+
+
+@lru_cache(maxsize=None)
+def get_rule_engine(path: str = DEFAULT_RULES_PATH) -> PatternRuleEngine:
+    """The rule engine compiled from `path`, built once per process"""
+    return PatternRuleEngine.load(path)
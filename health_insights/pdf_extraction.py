@@ -0,0 +1,129 @@
+"""
+PDF Extraction - Lab Report Text from PDF Files
+Pure-Python PDF text extraction (pypdf) for the Health Insights pipeline.
+Pages can be streamed one at a time, large documents are split across worker
+processes, and extracted text is cached by the SHA-256 of the file so a
+re-uploaded report is not parsed twice.
+"""
+
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Union
+
+PdfSource = Union[bytes, bytearray, str, os.PathLike]
+
+# Documents with at least this many pages are extracted in parallel
+PARALLEL_PAGE_THRESHOLD = 16
+PAGES_PER_TASK = 8
+TEXT_CACHE_SIZE = 128
+
+_text_cache = OrderedDict()
+# Shared by every thread that extracts PDFs (agent tools, API worker threads)
+_text_cache_lock = threading.Lock()
+
+
+def _pdf_reader(data: bytes):
+    """Open a PdfReader, importing pypdf only when a PDF is actually seen"""
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:
+        raise ImportError("PDF support requires pypdf: pip install pypdf") from e
+    return PdfReader(io.BytesIO(data))
+
+
+def is_pdf(source) -> bool:
+    """True for PDF bytes or a path to a .pdf file"""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source[:5]) == b"%PDF-"
+    if isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        # Guard against treating multi-line report text as a path
+        return "\n" not in path and path.lower().endswith(".pdf") and os.path.isfile(path)
+    return False
+
+
+def read_pdf_bytes(source: PdfSource) -> bytes:
+    """Return the raw bytes of a PDF given as bytes or a file path"""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def content_hash(data: bytes) -> str:
+    """SHA-256 of the file contents, used as the text cache key"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def iter_pdf_pages(source: PdfSource) -> Iterator[str]:
+    """Yield the text of each page in order, parsing one page at a time"""
+    reader = _pdf_reader(read_pdf_bytes(source))
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def _extract_page_range(data: bytes, start: int, stop: int) -> list:
+    """Worker task: extract pages [start, stop) from the PDF bytes"""
+    reader = _pdf_reader(data)
+    return [(reader.pages[i].extract_text() or "") for i in range(start, stop)]
+
+
+def _extract_pages(data: bytes, workers: int = None) -> list:
+    """Extract every page, fanning large documents out to a process pool"""
+    reader = _pdf_reader(data)
+    page_count = len(reader.pages)
+    workers = workers or os.cpu_count() or 1
+
+    if page_count < PARALLEL_PAGE_THRESHOLD or workers == 1:
+        return [(page.extract_text() or "") for page in reader.pages]
+
+    ranges = [(start, min(start + PAGES_PER_TASK, page_count))
+              for start in range(0, page_count, PAGES_PER_TASK)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+        futures = [executor.submit(_extract_page_range, data, start, stop)
+                   for start, stop in ranges]
+        # Results are collected in submission order so pages stay in order
+        return [text for future in futures for text in future.result()]
+
+
+def extract_pdf_text(source: PdfSource, workers: int = None, use_cache: bool = True) -> dict:
+    """Extract all text from a PDF, reusing cached text for identical files"""
+    data = read_pdf_bytes(source)
+    digest = content_hash(data)
+
+    pages = None
+    if use_cache:
+        with _text_cache_lock:
+            pages = _text_cache.get(digest)
+            if pages is not None:
+                _text_cache.move_to_end(digest)
+    cached = pages is not None
+
+    if not cached:
+        # Parsing happens outside the lock; two threads that miss on the same
+        # file both parse it and the later one's pages are kept
+        pages = _extract_pages(data, workers=workers)
+        if use_cache:
+            with _text_cache_lock:
+                _text_cache[digest] = pages
+                _text_cache.move_to_end(digest)
+                if len(_text_cache) > TEXT_CACHE_SIZE:
+                    _text_cache.popitem(last=False)
+
+    return {
+        "status": "success",
+        "text": "\n".join(pages),
+        "page_count": len(pages),
+        "content_hash": digest,
+        "cached": cached
+    }
+
+
+def clear_text_cache():
+    """Forget all cached PDF text"""
+    with _text_cache_lock:
+        _text_cache.clear()
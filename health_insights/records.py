@@ -0,0 +1,137 @@
+"""
+Pipeline Records - Compact Results Passed Between Pipeline Stages
+Slotted dataclasses for a normalized metric, a reference-range flag, a risk
+score and a finished report. They carry no per-instance __dict__ and no
+{"status": "success"} wrappers. The JSON-ready dicts that callers, caches and
+writers see are laid out here and nowhere else: flag_dict, risk_dict and
+report_dict serve the records, the tool functions and the batch path alike.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+DISCLAIMER = ("MEDICAL DISCLAIMER: This report provides educational information only and is NOT "
+              "a medical diagnosis. Always consult with qualified healthcare professionals for "
+              "medical advice, diagnosis, or treatment.")
+
+RECOMMENDATIONS = [
+    "Consult with your healthcare provider to discuss these results",
+    "Consider lifestyle modifications if recommended by your doctor",
+    "Schedule follow-up testing as advised by your healthcare team",
+    "Maintain a healthy diet and regular exercise routine"
+]
+
+DIRECTIONS = {"low": "below", "high": "above"}
+
+
+@dataclass(slots=True)
+class MetricRecord:
+    """One extracted metric, normalized to its analyte's standard unit"""
+    name: str
+    analyte_id: Optional[str]
+    value: float
+    unit: str
+    original_value: float
+    original_unit: str
+    conversion_applied: bool = False
+
+
+@dataclass(slots=True)
+class FlagRecord:
+    """A metric compared with its reference range"""
+    metric: str
+    value: float
+    severity: str  # "low", "high" or "normal"
+    reference_range: dict  # shared registry dict; flag_dict() hands out copies
+
+
+@dataclass(slots=True)
+class RiskRecord:
+    score: int
+    level: str
+    abnormal_count: int
+    pattern_count: int
+
+    def to_dict(self) -> dict:
+        return risk_dict(self.score, self.level, self.abnormal_count, self.pattern_count)
+
+
+def risk_level(score: int) -> str:
+    if score >= 5:
+        return "high"
+    if score >= 2:
+        return "moderate"
+    return "low"
+
+
+@dataclass(slots=True)
+class ReportRecord:
+    """Everything a health insights report holds, before serialization
+
+    `patterns` are the pattern dicts fired for this report.
+    """
+    metrics: list
+    flags: list
+    patterns: list
+    risk: RiskRecord
+    trends: Optional[list] = None
+    generated_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    def to_dict(self) -> dict:
+        flags = [flag_dict(flag.metric, flag.value, flag.severity, flag.reference_range)
+                 for flag in self.flags]
+        return report_dict(len(self.metrics), flags, self.patterns, self.risk.to_dict(),
+                           self.trends, self.generated_at)
+
+
+def flag_dict(metric: str, value: float, severity: str, reference_range: dict) -> dict:
+    """A metric's entry in a report's metrics_analysis"""
+    return {
+        "status": "success",
+        "metric": metric,
+        "value": value,
+        "is_abnormal": severity != "normal",
+        "severity": severity,
+        "direction": DIRECTIONS.get(severity),
+        # A copy, so editing a report can't change the registry's range
+        "reference_range": dict(reference_range)
+    }
+
+
+def risk_dict(score: int, level: str, abnormal_count: int, pattern_count: int) -> dict:
+    """A report's risk_assessment"""
+    return {
+        "status": "success",
+        "risk_score": score,
+        "risk_level": level,
+        "abnormal_count": abnormal_count,
+        "pattern_count": pattern_count
+    }
+
+
+def report_dict(metric_count: int, flags: list, patterns: list, risk: dict,
+                trends: list = None, generated_at: str = None) -> dict:
+    """A whole report; `flags` are the flag dicts of every metric with a reference range"""
+    report = {
+        "report_type": "Health Insights Report",
+        "generated_at": generated_at or datetime.now().isoformat(),
+        "disclaimer": DISCLAIMER,
+        "summary": {
+            "total_metrics_analyzed": metric_count,
+            "abnormal_metrics": len(flags),
+            "patterns_detected": len(patterns),
+            "overall_risk_level": risk.get("risk_level", "unknown")
+        },
+        "metrics_analysis": {
+            "normal": [flag for flag in flags if flag["severity"] == "normal"],
+            "abnormal": [flag for flag in flags if flag["severity"] != "normal"]
+        },
+        "patterns": patterns,
+        "risk_assessment": risk,
+        "recommendations": list(RECOMMENDATIONS)
+    }
+
+    if trends is not None:
+        report["trends"] = trends
+    return report
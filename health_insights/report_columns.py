@@ -0,0 +1,96 @@
+"""
+Report Columns - Columnar Batch Evaluation
+Flattens the extracted metrics of many reports into parallel columns (report,
+metric name, analyte, value, unit) once, then normalizes units, flags values
+against reference ranges, evaluates pattern rules and scores risk with NumPy
+over whole columns instead of looping per metric per report.
+"""
+
+import numpy as np
+
+from analyte_registry import get_registry
+from pattern_rules import get_rule_engine
+from unit_conversion import convert_batch
+
+# Indexed by low + 2 * high
+SEVERITIES = ("normal", "low", "high")
+
+
+class ReportColumns:
+    """Metrics of many reports laid out as one row per metric"""
+
+    def __init__(self, metrics_list: list):
+        registry = get_registry()
+        self.report_count = len(metrics_list)
+        self.metric_counts = [len(metrics) for metrics in metrics_list]
+
+        # One flat pass per column; comprehensions beat appending to four lists
+        items = [item for metrics in metrics_list for item in metrics.items()]
+        self.names = [metric_name for metric_name, _ in items]
+        self.analyte_ids = [data.get("analyte_id") or registry.resolve(metric_name)
+                            for metric_name, data in items]
+        self.raw_values = [data["value"] for _, data in items]
+        self.raw_units = [data["unit"] for _, data in items]
+
+        # Each row's analyte as a code into `self.analytes`, so per-analyte
+        # lookups run once per distinct analyte rather than once per row
+        codes = {}
+        self.analyte_codes = np.fromiter(
+            (codes.setdefault(analyte_id, len(codes)) for analyte_id in self.analyte_ids),
+            dtype=np.intp, count=len(self.analyte_ids)
+        )
+        self.analytes = list(codes)
+
+        self.report_index = np.repeat(np.arange(self.report_count), self.metric_counts)
+        self.values, self.units, self.conversion_applied = convert_batch(
+            self.analyte_ids, self.raw_values, self.raw_units
+        )
+
+    def flag(self, gender: str = "general", age: float = None):
+        """Reference range per row plus low/high masks
+
+        Returns (ranges, has_range, low, high); `ranges` holds the range dict
+        or None for each row.
+        """
+        registry = get_registry()
+        distinct = [registry.reference_range(analyte_id, gender, age) if analyte_id else None
+                    for analyte_id in self.analytes]
+        codes = self.analyte_codes
+        ranges = [distinct[code] for code in codes.tolist()]
+
+        has_range = np.array([r is not None for r in distinct], dtype=bool)[codes]
+        mins = np.array([r["min"] if r else np.nan for r in distinct], dtype=float)[codes]
+        maxs = np.array([r["max"] if r else np.nan for r in distinct], dtype=float)[codes]
+        # Comparisons against NaN are False, so rows without a range are never flagged
+        low = self.values < mins
+        high = ~low & (self.values > maxs)
+        return ranges, has_range, low, high
+
+    def severities(self, has_range, low, high):
+        """(rows with a reference range, their severities) as lists
+
+        Severities are the shared SEVERITIES strings rather than one new
+        string per row from a NumPy string array.
+        """
+        codes = (low.astype(np.int8) + high.astype(np.int8) * 2)[has_range].tolist()
+        return np.flatnonzero(has_range).tolist(), [SEVERITIES[code] for code in codes]
+
+    def patterns(self) -> list:
+        """Fired pattern dicts per report, evaluating every rule over the whole batch"""
+        engine = get_rule_engine()
+        column = {analyte_id: i for i, analyte_id in enumerate(engine.analytes)}
+        matrix = np.full((self.report_count, len(engine.analytes)), np.nan)
+        cols = np.array([column.get(analyte_id, -1) for analyte_id in self.analytes],
+                        dtype=np.intp)[self.analyte_codes]
+        used = cols >= 0
+        matrix[self.report_index[used], cols[used]] = self.values[used]
+        return engine.evaluate_matrix(matrix)
+
+    def risk(self, has_range, low, high, pattern_counts):
+        """(scores, levels, flag counts) per report, matching risk_scorer"""
+        flagged = has_range & (low | high)
+        abnormal = np.bincount(self.report_index[flagged], minlength=self.report_count)
+        flag_counts = np.bincount(self.report_index[has_range], minlength=self.report_count)
+        scores = abnormal + np.asarray(pattern_counts, dtype=int) * 2
+        levels = np.select([scores >= 5, scores >= 2], ["high", "moderate"], default="low")
+        return scores, levels, flag_counts
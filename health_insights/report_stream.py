@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Report Stream - Streaming Analysis of Multi-Report Lab Exports
+Splits a large export containing many concatenated reports on a delimiter,
+pushes each report through the extraction and report-building stages as
+chained generators, and writes results in buffered chunks as they are
+produced, as JSON Lines and optionally as a per-analyte CSV or Parquet table.
+Only one chunk of results is held in memory at a time.
+
+Usage:
+    python report_stream.py lab_export.txt -o results.jsonl
+    python report_stream.py lab_export.txt --delimiter '\\f' --workers 4
+    python report_stream.py lab_export.txt -o results.jsonl --columnar analytes.parquet
+    cat lab_export.txt | python report_stream.py - > results.jsonl
+"""
+
+import argparse
+import codecs
+import sys
+import time
+from typing import IO, Iterable, Iterator
+
+from health_insights_agent import HealthInsightsAgent, create_health_insights_agent
+from report_writers import write_results, writer_for
+
+DEFAULT_DELIMITER = "\n---\n"
+READ_CHUNK_SIZE = 64 * 1024
+
+
+# ============================================================================
+# READER
+# ============================================================================
+
+def iter_reports(source: IO[str], delimiter: str = DEFAULT_DELIMITER,
+                 chunk_size: int = READ_CHUNK_SIZE) -> Iterator[str]:
+    """Yield one report at a time from a text stream split on `delimiter`.
+
+    The stream is read in fixed-size chunks, so the buffer never holds more
+    than the current report plus one chunk. Blank reports (e.g. a trailing
+    delimiter) are skipped.
+    """
+    if not delimiter:
+        raise ValueError("delimiter must not be empty")
+    
+    buffer = ""
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        buffer += chunk
+        # The unfinished tail stays buffered, so a delimiter split across
+        # two chunks is still found on the next pass
+        *complete, buffer = buffer.split(delimiter)
+        for report in complete:
+            if report.strip():
+                yield report
+    
+    if buffer.strip():
+        yield buffer
+
+
+# ============================================================================
+# PIPELINE STAGES
+# ============================================================================
+
+def extract_stage(reports: Iterable[str], agent: HealthInsightsAgent) -> Iterator[tuple]:
+    """Number each report and extract its lab metrics
+    
+    The scanner reads the raw report text, as HealthInsightsAgent.run() and
+    run_batch do, so every path sees the same metrics.
+    """
+    for index, report_text in enumerate(reports):
+        try:
+            yield index, agent.extract_metrics(report_text), None
+        except Exception as e:
+            yield index, None, f"{type(e).__name__}: {e}"
+
+
+def report_stage(extracted: Iterable[tuple], agent: HealthInsightsAgent,
+                 gender: str = "general", age: float = None) -> Iterator[dict]:
+    """Build the insights report for each set of extracted metrics"""
+    for index, metrics, error in extracted:
+        if error:
+            yield {"index": index, "status": "error", "error": error}
+            continue
+        try:
+            yield {"index": index, "status": "success",
+                   "report": agent.analyze_metrics(metrics, gender=gender, age=age)}
+        except Exception as e:
+            yield {"index": index, "status": "error", "error": f"{type(e).__name__}: {e}"}
+
+
+def analyze_stream(reports: Iterable[str], gender: str = "general",
+                   age: float = None) -> Iterator[dict]:
+    """Lazily analyze reports, yielding run_batch-style results in input order"""
+    agent = create_health_insights_agent()
+    return report_stage(extract_stage(reports, agent), agent, gender=gender, age=age)
+
+
+# ============================================================================
+# OUTPUT
+# ============================================================================
+
+def process_file(source: IO[str], out, delimiter: str = DEFAULT_DELIMITER,
+                 gender: str = "general", workers: int = 1, columnar: str = None,
+                 age: float = None) -> dict:
+    """Stream every report in `source` to `out`.
+
+    `out` is a file object (JSON Lines) or a path whose extension picks the
+    format (.jsonl, .csv or .parquet). `columnar` additionally writes one row
+    per report and analyte to a .csv or .parquet path. With `workers` > 1 the
+    reports are fanned out through HealthInsightsAgent.run_batch and written
+    in completion order.
+    """
+    start = time.perf_counter()
+    reports = iter_reports(source, delimiter)
+    
+    if workers > 1:
+        results = create_health_insights_agent().run_batch(reports, workers=workers,
+                                                           gender=gender, age=age)
+    else:
+        results = analyze_stream(reports, gender=gender, age=age)
+    
+    writers = [writer_for(out)]
+    if columnar:
+        writers.append(writer_for(columnar))
+    counts = write_results(results, writers)
+    counts["elapsed_seconds"] = time.perf_counter() - start
+    return {"status": "success", **counts}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a multi-report lab export as a stream")
+    parser.add_argument("input", help="export file, or - for stdin")
+    parser.add_argument("-o", "--output",
+                        help="output file; .csv or .parquet for columnar output, "
+                             "anything else is JSON Lines (default: JSON Lines to stdout)")
+    parser.add_argument("--columnar", help="also write one row per analyte to this .csv/.parquet file")
+    parser.add_argument("--delimiter", default=DEFAULT_DELIMITER,
+                        help="text between reports; backslash escapes like \\f are decoded "
+                             "(default: a line containing ---)")
+    parser.add_argument("--gender", default="general", choices=["general", "male", "female"])
+    parser.add_argument("--age", type=float, help="patient age in years, for age-banded reference ranges")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (default: 1)")
+    args = parser.parse_args()
+    
+    delimiter = codecs.decode(args.delimiter, "unicode_escape")
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    
+    try:
+        summary = process_file(source, args.output or sys.stdout, delimiter=delimiter,
+                               gender=args.gender, workers=args.workers, columnar=args.columnar,
+                               age=args.age)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    
+    print(f"Processed {summary['total']} reports ({summary['failed']} failed) "
+          f"in {summary['elapsed_seconds']:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
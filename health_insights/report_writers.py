@@ -0,0 +1,218 @@
+"""
+Report Writers - JSON Lines and Columnar Output for Batch Results
+Writers take the {"index", "status", "report"} results of run_batch or the
+streaming pipeline one at a time and flush them in buffered chunks. JSON
+Lines uses orjson when it is installed and a reused compact encoder when it
+is not. The columnar writer flattens each report into one row per analyte,
+for CSV or (with pyarrow) Parquet files that load straight into analytics tools.
+"""
+
+import csv
+import json
+from typing import Iterable, Optional
+
+from analyte_registry import get_registry
+
+DEFAULT_CHUNK_SIZE = 1000
+
+COLUMNS = ["report_index", "analyte_id", "metric", "value", "unit",
+           "severity", "reference_min", "reference_max", "risk_score", "risk_level"]
+
+
+def _json_encoder():
+    """A str-returning JSON encoder: orjson if installed, else a reused stdlib encoder"""
+    try:
+        import orjson
+    except ImportError:
+        return json.JSONEncoder(separators=(",", ":"), check_circular=False).encode
+    dumps = orjson.dumps
+    return lambda obj: dumps(obj).decode()
+
+
+class ReportWriter:
+    """Base writer: buffers results and flushes every `chunk_size` of them"""
+
+    def __init__(self, out, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.counts = {"total": 0, "succeeded": 0, "failed": 0}
+        self._buffer = []
+        self._owns_file = isinstance(out, str)
+        self.out = self._open(out) if self._owns_file else out
+
+    def _open(self, path: str):
+        return open(path, "w", encoding="utf-8", newline="")
+
+    def write(self, result: dict):
+        self.counts["total"] += 1
+        self.counts["succeeded" if result["status"] == "success" else "failed"] += 1
+        self._buffer.append(result)
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def write_all(self, results: Iterable[dict]) -> dict:
+        for result in results:
+            self.write(result)
+        self.flush()
+        return self.counts
+
+    def flush(self):
+        if self._buffer:
+            self._write_chunk(self._buffer)
+            self._buffer = []
+
+    def _write_chunk(self, results: list):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+        if self._owns_file:
+            self.out.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JsonlWriter(ReportWriter):
+    """One JSON object per line, every result including errors"""
+
+    def __init__(self, out, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        super().__init__(out, chunk_size)
+        self._encode = _json_encoder()
+
+    def _write_chunk(self, results: list):
+        encode = self._encode
+        self.out.write("".join([encode(result) + "\n" for result in results]))
+
+
+def report_rows(result: dict, analyte_ids: dict = None) -> list:
+    """Rows of one successful result, one per flagged metric, in COLUMNS order
+
+    `analyte_ids` memoizes metric name -> analyte id across calls.
+    """
+    report = result["report"]
+    if analyte_ids is None:
+        analyte_ids = {}
+    registry = get_registry()
+    risk = report["risk_assessment"]
+    analysis = report["metrics_analysis"]
+
+    rows = []
+    for flag in analysis["normal"] + analysis["abnormal"]:
+        metric = flag["metric"]
+        analyte_id = analyte_ids.get(metric)
+        if analyte_id is None:
+            analyte_id = analyte_ids[metric] = registry.resolve(metric) or ""
+        reference_range = flag["reference_range"]
+        rows.append((
+            result.get("index"), analyte_id or None, metric, flag["value"],
+            reference_range.get("unit"), flag["severity"], reference_range.get("min"), reference_range.get("max"),
+            risk.get("risk_score"), risk.get("risk_level")
+        ))
+    return rows
+
+
+class ColumnarWriter(ReportWriter):
+    """One row per report and analyte, as CSV or Parquet
+
+    Failed results have no rows and are only counted. Parquet needs pyarrow;
+    each flushed chunk becomes a row group.
+    """
+
+    def __init__(self, out, format: str = "csv", chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if format not in ("csv", "parquet"):
+            raise ValueError(f"Unknown columnar format: {format}")
+        self.format = format
+        self._analyte_ids = {}
+        self._parquet = None
+        if format == "parquet":
+            try:
+                import pyarrow
+                import pyarrow.parquet
+            except ImportError as e:
+                raise ImportError("Parquet output requires pyarrow: pip install pyarrow") from e
+            self._pa = pyarrow
+            self._pq = pyarrow.parquet
+        super().__init__(out, chunk_size)
+        if format == "csv":
+            self._csv = csv.writer(self.out)
+            self._csv.writerow(COLUMNS)
+
+    def _open(self, path: str):
+        if self.format == "parquet":
+            return open(path, "wb")
+        return super()._open(path)
+
+    def _schema(self):
+        pa = self._pa
+        return pa.schema([
+            ("report_index", pa.int64()), ("analyte_id", pa.string()),
+            ("metric", pa.string()), ("value", pa.float64()), ("unit", pa.string()),
+            ("severity", pa.string()), ("reference_min", pa.float64()),
+            ("reference_max", pa.float64()), ("risk_score", pa.int64()),
+            ("risk_level", pa.string())
+        ])
+
+    def _write_chunk(self, results: list):
+        rows = []
+        for result in results:
+            if result["status"] == "success":
+                rows.extend(report_rows(result, self._analyte_ids))
+        if not rows:
+            return
+
+        if self.format == "csv":
+            self._csv.writerows(rows)
+            return
+
+        schema = self._schema()
+        columns = [list(column) for column in zip(*rows)]
+        table = self._pa.Table.from_arrays(
+            [self._pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+            schema=schema
+        )
+        if self._parquet is None:
+            self._parquet = self._pq.ParquetWriter(self.out, schema)
+        self._parquet.write_table(table)
+
+    def close(self):
+        self.flush()
+        if self.format == "parquet":
+            # An empty batch still gets a valid file with the schema
+            if self._parquet is None:
+                self._parquet = self._pq.ParquetWriter(self.out, self._schema())
+            self._parquet.close()
+        if self._owns_file:
+            self.out.close()
+
+
+def writer_for(out, format: Optional[str] = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE) -> ReportWriter:
+    """A writer for `format` ("jsonl", "csv" or "parquet"), else by file extension
+
+    Anything that is not a .csv or .parquet path is written as JSON Lines.
+    """
+    if format is None:
+        name = out if isinstance(out, str) else getattr(out, "name", "")
+        name = str(name).lower()
+        format = "csv" if name.endswith(".csv") else "parquet" if name.endswith(".parquet") else "jsonl"
+    if format == "jsonl":
+        return JsonlWriter(out, chunk_size)
+    return ColumnarWriter(out, format, chunk_size)
+
+
+def write_results(results: Iterable[dict], writers: list) -> dict:
+    """Send every result to each writer, close them and return the counts"""
+    counts = {"total": 0, "succeeded": 0, "failed": 0}
+    try:
+        for result in results:
+            counts["total"] += 1
+            counts["succeeded" if result["status"] == "success" else "failed"] += 1
+            for writer in writers:
+                writer.write(result)
+    finally:
+        for writer in writers:
+            writer.close()
+    return counts
@@ -0,0 +1,147 @@
+"""
+Result Cache - Content-Hash Cache for Health Insights Reports
+Caches finished reports under a SHA-256 of the report content, the patient's
+gender and age, and a version hashed from the reference data and the pipeline
+source. Recent reports stay in an in-memory LRU; an optional directory keeps
+them across restarts. Editing analytes.json, pattern_rules.json or any module
+that shapes a report changes the version, so stale reports are never served.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from analyte_registry import DEFAULT_REGISTRY_PATH
+from pattern_rules import DEFAULT_RULES_PATH
+from pdf_extraction import is_pdf, read_pdf_bytes
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Modules whose code decides what a report contains, from text or PDF
+# extraction through scoring and serialization
+PIPELINE_MODULES = tuple(os.path.join(HERE, name) for name in (
+    "analyte_registry.py", "health_insights_agent.py", "metric_scanner.py",
+    "pattern_rules.py", "pdf_extraction.py", "records.py", "report_columns.py",
+    "unit_conversion.py"
+))
+VERSIONED_FILES = (DEFAULT_REGISTRY_PATH, DEFAULT_RULES_PATH) + PIPELINE_MODULES
+
+# Version directories are the first 16 hex digits of reference_data_version()
+VERSION_DIR_RE = re.compile(r"[0-9a-f]{16}")
+
+
+def reference_data_version(paths=VERSIONED_FILES) -> str:
+    """Hash of the reference range and rule files and the pipeline source"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def normalize_report_text(text: str) -> str:
+    """Collapse spacing within lines and drop blank lines
+
+    Line breaks are kept because they separate metric names.
+    """
+    return "\n".join(" ".join(line.split()) for line in text.splitlines() if line.strip())
+
+
+class ResultCache:
+    """In-memory LRU of finished reports with an optional on-disk store"""
+
+    def __init__(self, max_entries: int = 1024, cache_dir: str = None):
+        self.max_entries = max_entries
+        self.version = reference_data_version()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+
+        self.directory = None
+        if cache_dir:
+            self.directory = os.path.join(cache_dir, self.version)
+            os.makedirs(self.directory, exist_ok=True)
+            # Reports built from older reference data can never be served again
+            for name in os.listdir(cache_dir):
+                stale = os.path.join(cache_dir, name)
+                if name != self.version and VERSION_DIR_RE.fullmatch(name) and os.path.isdir(stale):
+                    shutil.rmtree(stale, ignore_errors=True)
+
+    def key(self, report_input, gender: str = "general", age: float = None) -> str:
+        """Cache key for a report given as text, PDF bytes or a PDF path"""
+        if not is_pdf(report_input):
+            return self.text_key(report_input, gender, age)
+        digest = self._digest(gender, age)
+        digest.update(b"pdf\0" + read_pdf_bytes(report_input))
+        return digest.hexdigest()
+
+    def text_key(self, report_text: str, gender: str = "general", age: float = None) -> str:
+        """Cache key for report text; the text is never taken for a PDF path"""
+        digest = self._digest(gender, age)
+        digest.update(normalize_report_text(report_text).encode())
+        return digest.hexdigest()
+
+    def _digest(self, gender: str, age: Optional[float]):
+        age = "" if age is None else float(age)
+        return hashlib.sha256(f"{self.version}\0{gender}\0{age}\0".encode())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        """A fresh copy of the cached report, or None"""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return json.loads(payload)
+
+        if self.directory:
+            try:
+                with open(self._path(key), encoding="utf-8") as f:
+                    payload = f.read()
+                report = json.loads(payload)
+            except (OSError, ValueError):
+                pass
+            else:
+                with self._lock:
+                    self._remember(key, payload)
+                    self.stats["disk_hits"] += 1
+                return report
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, key: str, report: dict):
+        # Stored serialized so callers can never mutate a cached report
+        payload = json.dumps(report)
+        with self._lock:
+            self._remember(key, payload)
+
+        if self.directory:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+
+    def _remember(self, key: str, payload: str):
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            os.makedirs(self.directory, exist_ok=True)
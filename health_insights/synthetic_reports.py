@@ -0,0 +1,81 @@
+"""
+Synthetic Lab Reports - Deterministic Report Generator for Benchmarks and Demos
+Builds lab reports from the analyte registry with a configurable number of
+analytes per report and a noise level that varies the formatting the way real
+exports do: aliases and odd casing, SI units, stray whitespace, section
+headers, comments and blank lines. Roughly a third of values fall outside
+their reference range so every pipeline stage has work to do.
+"""
+
+import random
+from typing import Iterator
+
+from analyte_registry import get_registry
+
+SECTIONS = ["METABOLIC PANEL:", "LIPID PANEL", "Liver Function", "KIDNEY FUNCTION:",
+            "COMPLETE BLOOD COUNT", "Additional Tests:"]
+COMMENTS = ["Comment: specimen received ambient", "Note - fasting status not confirmed",
+            "Reviewed by: Dr. Smith", "Result verified"]
+
+
+def _value_for(analyte: dict, rng: random.Random) -> float:
+    """A value inside the general range two times out of three, otherwise outside it"""
+    reference = get_registry().reference_range(analyte["id"]) or {"min": 1, "max": 100}
+    low, high = reference["min"], min(reference["max"], reference["min"] * 4 + 100)
+    span = max(high - low, 1)
+    roll = rng.random()
+    if roll < 0.66:
+        return rng.uniform(low, high)
+    if roll < 0.83:
+        return max(low - rng.uniform(0.05, 0.4) * span, 0.01)
+    return high + rng.uniform(0.05, 0.8) * span
+
+
+def make_report(rng: random.Random, analytes_per_report: int = 10, noise: float = 0.3) -> str:
+    """One synthetic report; `noise` in [0, 1] controls formatting variation"""
+    registry = get_registry()
+    analytes = list(registry.by_id.values())
+    chosen = rng.sample(analytes, min(analytes_per_report, len(analytes)))
+    # More analytes than the registry knows are padded with repeated panels
+    while len(chosen) < analytes_per_report:
+        chosen.append(rng.choice(analytes))
+
+    lines = ["LABORATORY TEST RESULTS", f"Patient: Test Patient {rng.randint(1, 9999)}",
+             f"Date: 2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", ""]
+
+    for analyte in chosen:
+        if rng.random() < noise * 0.3:
+            lines.append(rng.choice(SECTIONS))
+
+        name = analyte["name"]
+        if rng.random() < noise:
+            name = rng.choice([name, *analyte.get("aliases", [])])
+        if rng.random() < noise * 0.5:
+            name = rng.choice([name.upper(), name.lower(), name.title()])
+
+        value = _value_for(analyte, rng)
+        unit = analyte["unit"]
+        conversions = analyte.get("conversions", {})
+        if conversions and rng.random() < noise * 0.5:
+            # Report in an SI unit: invert standard = value * scale + offset
+            unit, (scale, offset) = rng.choice(list(conversions.items()))
+            value = (value - offset) / scale
+
+        separator = rng.choice([": ", ":", " : ", ":\t"]) if rng.random() < noise else ": "
+        spacing = " " * rng.randint(0, 3) if rng.random() < noise else ""
+        lines.append(f"{spacing}{name}{separator}{round(value, 2)} {unit}")
+
+        if rng.random() < noise * 0.1:
+            lines.append(rng.choice(COMMENTS))
+        if rng.random() < noise * 0.1:
+            lines.append("")
+
+    return "\n".join(lines)
+
+
+def generate_reports(count: int, analytes_per_report: int = 10, noise: float = 0.3,
+                     seed: int = 0) -> Iterator[str]:
+    """`count` reproducible reports; the same seed always gives the same reports"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield make_report(rng, analytes_per_report, noise)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Analyte Registry Tests - Age-Banded Reference Range Lookup
+Covers the bisected band search, the precedence between age bands, all-ages
+ranges and sexed ranges, and the checks made when the registry is built.
+Run with: python -m pytest -q test_analyte_registry.py
+"""
+
+import pytest
+
+from analyte_registry import AgeBandIndex, AnalyteRegistry, get_registry
+
+
+def registry_with(ranges: list) -> AnalyteRegistry:
+    return AnalyteRegistry([{"id": "x", "name": "X", "unit": "mg/dL", "ranges": ranges}])
+
+
+def bounds(reference: dict) -> tuple:
+    return reference["min"], reference["max"]
+
+
+# ============================================================================
+# AGE BANDS
+# ============================================================================
+
+def test_band_bounds_are_half_open():
+    index = AgeBandIndex("x", [
+        {"age_min": 2, "age_max": 12, "min": 1, "max": 2},
+        {"age_min": 12, "age_max": 18, "min": 3, "max": 4},
+    ])
+
+    assert index.band(1.99) is None
+    assert bounds(index.band(2)) == (1, 2)
+    assert bounds(index.band(11.99)) == (1, 2)
+    # An age on a shared edge belongs to the later band
+    assert bounds(index.band(12)) == (3, 4)
+    assert index.band(18) is None
+    assert index.band(None) is None
+
+
+def test_bands_are_found_whatever_their_order_in_the_file():
+    index = AgeBandIndex("x", [
+        {"age_min": 60, "min": 5, "max": 6},
+        {"age_min": 1, "age_max": 18, "min": 1, "max": 2},
+        {"age_min": 18, "age_max": 40, "min": 3, "max": 4},
+    ])
+
+    assert [bounds(index.band(age)) for age in (1, 17, 18, 39, 60)] == \
+        [(1, 2), (1, 2), (3, 4), (3, 4), (5, 6)]
+    # A gap between bands is not covered by either of them
+    assert index.band(50) is None
+
+
+def test_open_ended_band_has_no_upper_age():
+    registry = get_registry()
+
+    assert bounds(registry.reference_range("bun", age=59.9)) == (7, 20)
+    assert bounds(registry.reference_range("bun", age=60)) == (8, 23)
+    assert bounds(registry.reference_range("bun", age=104)) == (8, 23)
+
+
+# ============================================================================
+# PRECEDENCE
+# ============================================================================
+
+def test_band_wins_over_all_ages_range():
+    registry = get_registry()
+
+    assert bounds(registry.reference_range("bun", age=10)) == (5, 18)
+    assert bounds(registry.reference_range("bun", age=30)) == (7, 20)
+    # Bands only apply when an age is given
+    assert bounds(registry.reference_range("bun")) == (7, 20)
+
+
+def test_sexed_range_wins_over_unsexed_range():
+    registry = get_registry()
+
+    assert bounds(registry.reference_range("hemoglobin", "male", age=15)) == (13.0, 16.0)
+    assert bounds(registry.reference_range("hemoglobin", "female", age=15)) == (12.0, 16.0)
+    assert bounds(registry.reference_range("hemoglobin", "male", age=40)) == (13.5, 17.5)
+    assert bounds(registry.reference_range("hemoglobin", "female")) == (12.0, 15.5)
+    assert bounds(registry.reference_range("hemoglobin", "general", age=40)) == (12.0, 17.5)
+
+
+def test_unsexed_band_wins_over_sexed_all_ages_range():
+    registry = get_registry()
+
+    # Creatinine has unsexed paediatric bands and sexed adult ranges
+    assert bounds(registry.reference_range("creatinine", "male", age=8)) == (0.3, 0.7)
+    assert bounds(registry.reference_range("creatinine", "male", age=30)) == (0.7, 1.3)
+
+
+def test_sex_falls_back_to_unsexed_ranges():
+    registry = registry_with([
+        {"sex": "female", "min": 1, "max": 2},
+        {"min": 3, "max": 4},
+    ])
+
+    assert bounds(registry.reference_range("x", "male")) == (3, 4)
+    assert bounds(registry.reference_range("x", "female")) == (1, 2)
+    assert registry.reference_range("unknown") is None
+
+
+def test_no_range_outside_the_bands_without_an_all_ages_range():
+    registry = registry_with([{"age_min": 1, "age_max": 18, "min": 1, "max": 2}])
+
+    assert bounds(registry.reference_range("x", age=5)) == (1, 2)
+    assert registry.reference_range("x", age=30) is None
+    assert registry.reference_range("x") is None
+
+
+# ============================================================================
+# VALIDATION
+# ============================================================================
+
+@pytest.mark.parametrize("second_start", [12, 17.5])
+def test_overlapping_bands_are_rejected(second_start):
+    with pytest.raises(ValueError, match="overlapping age bands"):
+        registry_with([
+            {"age_min": 1, "age_max": 18, "min": 1, "max": 2},
+            {"age_min": second_start, "age_max": 40, "min": 3, "max": 4},
+        ])
+
+
+def test_open_ended_band_overlapping_a_later_band_is_rejected():
+    with pytest.raises(ValueError, match="overlapping age bands"):
+        registry_with([
+            {"age_min": 60, "min": 1, "max": 2},
+            {"age_min": 70, "age_max": 80, "min": 3, "max": 4},
+        ])
+
+
+def test_duplicate_all_ages_ranges_are_rejected():
+    with pytest.raises(ValueError, match="more than one range for all ages"):
+        registry_with([{"min": 1, "max": 2}, {"min": 3, "max": 4}])
+
+
+def test_same_bands_for_each_sex_are_allowed():
+    registry = registry_with([
+        {"sex": "male", "age_min": 12, "age_max": 18, "min": 1, "max": 2},
+        {"sex": "female", "age_min": 12, "age_max": 18, "min": 3, "max": 4},
+        {"sex": "male", "min": 5, "max": 6},
+        {"min": 7, "max": 8},
+    ])
+
+    assert bounds(registry.reference_range("x", "female", age=12)) == (3, 4)
+    assert bounds(registry.reference_range("x", "male", age=18)) == (5, 6)
@@ -216,6 +216,42 @@ def test_single_metric():
     print(f"\nExplanation:")
     print(f"  {explain_result['explanation']}")
 
+def run_batch_throughput():
+    """Analyze many copies of a report with run_batch and show throughput"""
+    import os
+    
+    print_header("BATCH ANALYSIS")
+    
+    try:
+        count = int(input("Number of reports [2000]: ").strip() or 2000)
+        workers = int(input(f"Worker processes [{os.cpu_count()}]: ").strip() or os.cpu_count())
+    except ValueError:
+        print("Invalid number!")
+        return
+    
+    report_text = """
+    Glucose: 145 mg/dL
+    Triglycerides: 200 mg/dL
+    Hemoglobin: 14.2 g/dL
+    ALT: 65 U/L
+    AST: 48 U/L
+    """
+    
+    print(f"\n⏳ Analyzing {count} reports with {workers} worker(s)...")
+    agent = create_health_insights_agent()
+    risk_levels = {}
+    for result in agent.run_batch((report_text for _ in range(count)), workers=workers):
+        if result["status"] == "success":
+            level = result["report"]["summary"]["overall_risk_level"]
+            risk_levels[level] = risk_levels.get(level, 0) + 1
+    
+    stats = agent.last_batch_stats
+    print_section("BATCH RESULTS")
+    print(f"  Reports: {stats['total']} ({stats['succeeded']} ok, {stats['failed']} failed)")
+    print(f"  Elapsed: {stats['elapsed_seconds']:.2f}s")
+    print(f"  Throughput: {stats['reports_per_second']:.0f} reports/s")
+    print(f"  Risk levels: {risk_levels}")
+
 def main():
     """Main menu"""
     while True:
@@ -223,9 +259,10 @@ def main():
         print("1. Test with sample reports")
         print("2. Analyze single metric")
         print("3. Run full demo")
+        print("4. Batch analysis throughput")
         print("Q. Quit")
         
-        choice = input("\nSelect option (1-3, Q): ").strip().upper()
+        choice = input("\nSelect option (1-4, Q): ").strip().upper()
         
         if choice == "1":
             test_sample_reports()
@@ -234,6 +271,8 @@ def main():
         elif choice == "3":
             import subprocess
             subprocess.run(["python", "health_insights_demo.py"])
+        elif choice == "4":
+            run_batch_throughput()
         elif choice == "Q":
             print("\nGoodbye!")
             break
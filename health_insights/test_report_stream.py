@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Report Stream Tests - Streaming Output Matches the Other Analysis Paths
+analyze_stream and process_file must produce the same reports as
+HealthInsightsAgent.run() and run_batch, including on noisy formatting.
+Run with: python -m pytest -q test_report_stream.py
+"""
+
+import io
+import json
+
+from health_insights_agent import create_health_insights_agent
+from report_stream import analyze_stream, process_file
+from synthetic_reports import generate_reports
+
+REPORTS = list(generate_reports(300, noise=0.8, seed=7))
+
+
+def comparable(report: dict) -> dict:
+    """A report without the fields that differ from one run to the next"""
+    report = dict(report)
+    report.pop("generated_at", None)
+    return report
+
+
+def test_stream_matches_run_on_noisy_reports():
+    agent = create_health_insights_agent()
+    expected = [comparable(agent.run(text)) for text in REPORTS]
+
+    results = list(analyze_stream(REPORTS))
+
+    assert [result["index"] for result in results] == list(range(len(REPORTS)))
+    assert all(result["status"] == "success" for result in results)
+    mismatched = [result["index"] for result in results
+                  if comparable(result["report"]) != expected[result["index"]]]
+    assert mismatched == []
+
+
+def test_process_file_output_does_not_depend_on_workers():
+    export = "\n---\n".join(REPORTS[:60])
+
+    outputs = {}
+    for workers in (1, 2):
+        out = io.StringIO()
+        process_file(io.StringIO(export), out, workers=workers)
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+        outputs[workers] = {result["index"]: comparable(result["report"]) for result in results}
+
+    assert len(outputs[1]) == 60
+    assert outputs[1] == outputs[2]
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Run Batch Tests - Worker Crash Recovery
+A worker that dies mid-batch must only cost the report that killed it.
+Run with: python -m pytest -q test_run_batch.py
+"""
+
+import multiprocessing
+import os
+
+import pytest
+
+import health_insights_agent
+from health_insights_agent import create_health_insights_agent
+
+REPORT = """
+Glucose: 145 mg/dL
+Hemoglobin: 14.2 g/dL
+ALT: 65 U/L
+"""
+
+CRASH_MARKER = "CRASH WORKER"
+
+pytestmark = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="workers must inherit the patched extractor"
+)
+
+
+@pytest.fixture
+def crashing_extractor(monkeypatch):
+    """Make any report containing CRASH_MARKER kill its worker process"""
+    extract = health_insights_agent.lab_metric_extractor
+
+    def lab_metric_extractor(text):
+        if CRASH_MARKER in text:
+            os._exit(1)
+        return extract(text)
+
+    monkeypatch.setattr(health_insights_agent, "lab_metric_extractor", lab_metric_extractor)
+
+
+def test_worker_crash_fails_only_the_crashing_report(crashing_extractor):
+    reports = [REPORT] * 40
+    reports[17] = CRASH_MARKER + REPORT
+
+    agent = create_health_insights_agent()
+    results = list(agent.run_batch(reports, workers=2, shard_size=4))
+
+    failed = [result["index"] for result in results if result["status"] != "success"]
+    assert failed == [17]
+    assert sorted(result["index"] for result in results) == list(range(40))
+    assert agent.last_batch_stats["succeeded"] == 39
+    assert agent.last_batch_stats["failed"] == 1
+
+
+def test_batch_without_crashes_is_unaffected():
+    agent = create_health_insights_agent()
+    results = list(agent.run_batch([REPORT] * 20, workers=2, shard_size=4))
+
+    assert all(result["status"] == "success" for result in results)
+    assert sorted(result["index"] for result in results) == list(range(20))
@@ -0,0 +1,226 @@
+"""
+Trend Store - Longitudinal Lab Results per Patient
+An append-only SQLite store of lab observations indexed by patient and
+analyte. Every insert also updates a per-(patient, analyte) summary row with
+running regression sums, so slope, percent change and the first abnormal
+date are available in O(1) without rescanning history.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+from analyte_registry import get_registry
+
+# Observation times are stored as days since this date for the slope sums
+EPOCH = datetime(2000, 1, 1)
+
+# Percent changes smaller than this are reported as "stable"
+STABLE_PERCENT = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    patient_id TEXT NOT NULL,
+    analyte_id TEXT NOT NULL,
+    observed_at TEXT NOT NULL,
+    value REAL NOT NULL,
+    unit TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_observations_patient_analyte
+    ON observations (patient_id, analyte_id, observed_at);
+
+CREATE TABLE IF NOT EXISTS trends (
+    patient_id TEXT NOT NULL,
+    analyte_id TEXT NOT NULL,
+    unit TEXT,
+    n INTEGER NOT NULL,
+    sum_t REAL NOT NULL,
+    sum_v REAL NOT NULL,
+    sum_tt REAL NOT NULL,
+    sum_tv REAL NOT NULL,
+    first_at TEXT NOT NULL,
+    first_value REAL NOT NULL,
+    latest_at TEXT NOT NULL,
+    latest_value REAL NOT NULL,
+    previous_at TEXT,
+    previous_value REAL,
+    first_abnormal_at TEXT,
+    PRIMARY KEY (patient_id, analyte_id)
+);
+"""
+
+TREND_COLUMNS = ["patient_id", "analyte_id", "unit", "n", "sum_t", "sum_v", "sum_tt", "sum_tv",
+                 "first_at", "first_value", "latest_at", "latest_value",
+                 "previous_at", "previous_value", "first_abnormal_at"]
+
+
+def _to_datetime(observed_at) -> datetime:
+    """Observation time as naive UTC; naive inputs are taken to be UTC already
+
+    Stored times are compared as ISO strings, so they must all share one
+    offset, and the slope sums subtract the naive EPOCH.
+    """
+    if observed_at is None:
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+    if not isinstance(observed_at, datetime):
+        observed_at = datetime.fromisoformat(str(observed_at))
+    if observed_at.tzinfo is not None:
+        observed_at = observed_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return observed_at
+
+
+def _days(observed_at: str) -> float:
+    return (_to_datetime(observed_at) - EPOCH).total_seconds() / 86400
+
+
+class TrendStore:
+    """Per-patient lab time series with incrementally maintained trends"""
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def record(self, patient_id: str, analyte_id: str, value: float, unit: str = None,
+               observed_at=None, gender: str = "general", age: float = None) -> dict:
+        """Append one observation and return the updated trend"""
+        return self.record_many(patient_id, [(analyte_id, value, unit)], observed_at, gender,
+                                age)[analyte_id]
+
+    def record_many(self, patient_id: str, observations: list, observed_at=None,
+                    gender: str = "general", age: float = None) -> dict:
+        """Append (analyte_id, value, unit) observations taken at the same time
+
+        All rows are written in one transaction. Returns {analyte_id: trend}.
+        """
+        registry = get_registry()
+        when = _to_datetime(observed_at).isoformat()
+        t = _days(when)
+        trends = {}
+
+        with self._lock, self._conn:
+            for analyte_id, value, unit in observations:
+                self._conn.execute(
+                    "INSERT INTO observations VALUES (?, ?, ?, ?, ?)",
+                    (patient_id, analyte_id, when, value, unit)
+                )
+                row = self._conn.execute(
+                    "SELECT * FROM trends WHERE patient_id = ? AND analyte_id = ?",
+                    (patient_id, analyte_id)
+                ).fetchone()
+                state = dict(row) if row else {
+                    "patient_id": patient_id, "analyte_id": analyte_id, "unit": unit,
+                    "n": 0, "sum_t": 0.0, "sum_v": 0.0, "sum_tt": 0.0, "sum_tv": 0.0,
+                    "first_at": when, "first_value": value,
+                    "latest_at": when, "latest_value": value,
+                    "previous_at": None, "previous_value": None, "first_abnormal_at": None
+                }
+
+                state["n"] += 1
+                state["sum_t"] += t
+                state["sum_v"] += value
+                state["sum_tt"] += t * t
+                state["sum_tv"] += t * value
+
+                # Reports can arrive out of order, so place the new point by date
+                if when < state["first_at"]:
+                    state["first_at"], state["first_value"] = when, value
+                if row and when >= state["latest_at"]:
+                    state["previous_at"], state["previous_value"] = state["latest_at"], state["latest_value"]
+                    state["latest_at"], state["latest_value"] = when, value
+                elif row and (state["previous_at"] is None or when > state["previous_at"]):
+                    state["previous_at"], state["previous_value"] = when, value
+
+                reference = registry.reference_range(analyte_id, gender, age)
+                if reference and not reference["min"] <= value <= reference["max"]:
+                    if state["first_abnormal_at"] is None or when < state["first_abnormal_at"]:
+                        state["first_abnormal_at"] = when
+
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO trends ({', '.join(TREND_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(TREND_COLUMNS))})",
+                    [state[column] for column in TREND_COLUMNS]
+                )
+                trends[analyte_id] = self._summarize(state)
+
+        return trends
+
+    def trend(self, patient_id: str, analyte_id: str) -> Optional[dict]:
+        row = self._conn.execute(
+            "SELECT * FROM trends WHERE patient_id = ? AND analyte_id = ?",
+            (patient_id, analyte_id)
+        ).fetchone()
+        return self._summarize(dict(row)) if row else None
+
+    def trends(self, patient_id: str) -> dict:
+        rows = self._conn.execute(
+            "SELECT * FROM trends WHERE patient_id = ? ORDER BY analyte_id", (patient_id,)
+        ).fetchall()
+        return {row["analyte_id"]: self._summarize(dict(row)) for row in rows}
+
+    def history(self, patient_id: str, analyte_id: str) -> list:
+        """All observations of one analyte, oldest first"""
+        rows = self._conn.execute(
+            "SELECT observed_at, value, unit FROM observations "
+            "WHERE patient_id = ? AND analyte_id = ? ORDER BY observed_at",
+            (patient_id, analyte_id)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _summarize(state: dict) -> dict:
+        """Trend figures from a summary row"""
+        n = state["n"]
+        denominator = n * state["sum_tt"] - state["sum_t"] ** 2
+        slope = ((n * state["sum_tv"] - state["sum_t"] * state["sum_v"]) / denominator
+                 if n > 1 and abs(denominator) > 1e-9 else None)
+
+        previous = state["previous_value"]
+        latest = state["latest_value"]
+        percent_change = ((latest - previous) / previous * 100
+                          if previous not in (None, 0) else None)
+
+        if previous is None:
+            direction = "new"
+        elif percent_change is None:
+            # From zero there is no percent change, only a direction
+            direction = ("rising" if latest > previous else
+                         "falling" if latest < previous else "stable")
+        elif abs(percent_change) < STABLE_PERCENT:
+            direction = "stable"
+        else:
+            direction = "rising" if percent_change > 0 else "falling"
+
+        analyte = get_registry().get(state["analyte_id"])
+        name = analyte["name"] if analyte else state["analyte_id"]
+        if direction in ("rising", "falling"):
+            change = f"{abs(percent_change):.0f}% " if percent_change is not None else ""
+            description = (f"{name} has {'risen' if direction == 'rising' else 'fallen'} "
+                           f"{change}since {state['previous_at'][:10]}.")
+        elif direction == "stable":
+            description = f"{name} is about the same as on {state['previous_at'][:10]}."
+        else:
+            description = f"First recorded {name} result."
+
+        return {
+            "analyte_id": state["analyte_id"],
+            "unit": state["unit"],
+            "observations": n,
+            "first_value": state["first_value"],
+            "first_observed_at": state["first_at"],
+            "latest_value": latest,
+            "latest_observed_at": state["latest_at"],
+            "previous_value": previous,
+            "previous_observed_at": state["previous_at"],
+            "percent_change": round(percent_change, 1) if percent_change is not None else None,
+            "slope_per_day": slope,
+            "direction": direction,
+            "first_abnormal_at": state["first_abnormal_at"],
+            "description": description
+        }
@@ -0,0 +1,97 @@
+"""
+Unit Conversion - Table-Driven Lab Unit Normalization
+Converts lab values to the units the reference ranges are written in, using
+the analyte-specific factors from the analyte registry (mmol/L glucose and
+cholesterol differ by molar mass). Unit spellings and (analyte, unit) pairs
+are resolved into one flat lookup at import time, and a NumPy path converts
+whole batches at once.
+"""
+
+from typing import Iterable, Tuple
+
+import numpy as np
+
+from analyte_registry import get_registry
+
+# Alternative spellings, keyed lowercase, mapped onto the unit names used in
+# analytes.json (standard units and conversion source units)
+UNIT_SPELLINGS = {
+    "mg/dl": "mg/dL", "mg/l": "mg/L", "mmol/l": "mmol/L", "mmol/mol": "mmol/mol",
+    "g/dl": "g/dL", "g/l": "g/L", "u/l": "U/L", "iu/l": "U/L", "iu": "U/L",
+    "umol/l": "umol/L", "µmol/l": "umol/L", "μmol/l": "umol/L",
+    "ukat/l": "ukat/L", "µkat/l": "ukat/L", "μkat/l": "ukat/L",
+    "%": "%", "percent": "%", "ml/min/1.73m2": "mL/min/1.73m2",
+}
+
+# Values are rounded to this many decimals after conversion
+PRECISION = 3
+
+
+def _build_lookup() -> dict:
+    """(analyte, lowercase unit spelling) -> (scale, offset, standard unit)"""
+    lookup = {}
+    for analyte, entry in get_registry().by_id.items():
+        # Registry conversions map source unit -> [scale, offset]
+        standard = entry["unit"]
+        factors = {unit: tuple(factor) for unit, factor in entry.get("conversions", {}).items()}
+        factors[standard] = (1.0, 0.0)
+        for spelling, unit in UNIT_SPELLINGS.items():
+            if unit in factors:
+                lookup[(analyte, spelling)] = factors[unit] + (standard,)
+        for unit, factor in factors.items():
+            lookup[(analyte, unit.lower())] = factor + (standard,)
+    return lookup
+
+
+CONVERSION_LOOKUP = _build_lookup()
+
+
+def convert(analyte: str, value: float, unit: str) -> Tuple[float, str, bool]:
+    """Convert one value to its analyte's standard unit
+
+    Returns (value, unit, conversion_applied). Unknown analytes, unknown units
+    and values already in the standard unit come back unchanged.
+    """
+    factor = CONVERSION_LOOKUP.get((analyte, unit.lower()))
+    if factor is None:
+        return value, unit, False
+    scale, offset, standard = factor
+    if scale == 1.0 and offset == 0.0:
+        return value, standard, False
+    return round(value * scale + offset, PRECISION), standard, True
+
+
+def convert_batch(analytes: Iterable[str], values: Iterable[float], units: Iterable[str]):
+    """Vectorized convert() for many measurements at once
+
+    Each distinct (analyte, unit) pair is looked up once, then all values are
+    converted with a single NumPy multiply-add. Returns (values array, units
+    list, conversion_applied boolean array).
+    """
+    pair_codes = {}
+    factors = []
+    codes = []
+    # Keyed on the unit as written, so lower() only runs once per distinct pair
+    for key in zip(analytes, units):
+        code = pair_codes.get(key)
+        if code is None:
+            analyte, unit = key
+            code = pair_codes[key] = len(factors)
+            factors.append(CONVERSION_LOOKUP.get((analyte, unit.lower()), (1.0, 0.0, unit)))
+        codes.append(code)
+
+    # Standard units come from the Python list; indexing with NumPy ints is slow
+    standards = [f[2] for f in factors]
+    units = [standards[code] for code in codes]
+    codes = np.fromiter(codes, dtype=np.intp, count=len(codes))
+    scales = np.array([f[0] for f in factors], dtype=float)[codes]
+    offsets = np.array([f[1] for f in factors], dtype=float)[codes]
+    values = np.asarray(values if isinstance(values, np.ndarray) else list(values), dtype=float)
+
+    applied = (scales != 1.0) | (offsets != 0.0)
+    converted = np.where(applied, values * scales + offsets, values)
+    # Round with Python's round() so results match convert() bit for bit;
+    # only the converted rows need it
+    rows = np.flatnonzero(applied)
+    converted[rows] = [round(v, PRECISION) for v in converted[rows].tolist()]
+    return converted, units, applied
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+LLM Client - One Interface for the What-If Orchestrators' Model Calls
+OllamaClient talks to a long-running `ollama serve` over HTTP instead of
+spawning `ollama run` for every prompt, so each call skips process start-up
+and model loading. Calls share a small pool of keep-alive connections, which
+suits the concurrent per-domain calls in what_if_scheduler: every run reuses
+the same few sockets. FakeLLMClient answers in-process with canned
+responses, for demos and tests without a model.
+
+    llm = OllamaClient(model="llama2")
+    text = llm.generate("What if...?")
+    for chunk in llm.stream("What if...?"):
+        print(chunk, end="", flush=True)
+"""
+
+import http.client
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional, Union
+from urllib.parse import urlparse
+
+DEFAULT_HOST = os.environ.get("OLLAMA_HOST", "http://localhost:11434")
+DEFAULT_MODEL = os.environ.get("WHAT_IF_MODEL", "llama2")
+DEFAULT_TIMEOUT = 60
+# How long the server keeps the model in memory after the last call
+DEFAULT_KEEP_ALIVE = "10m"
+# Connections per client; matches what_if_scheduler.DEFAULT_WORKERS
+DEFAULT_POOL_SIZE = 4
+
+
+class LLMError(Exception):
+    """The model server could not be reached or returned an error"""
+
+
+class LLMTimeout(LLMError, TimeoutError):
+    """The model server did not answer within the timeout"""
+
+
+class LLMClient:
+    """Base client: generate() returns the whole completion, stream() yields chunks"""
+
+    def generate(self, prompt: str, timeout: float = None) -> str:
+        raise NotImplementedError
+
+    def stream(self, prompt: str, timeout: float = None) -> Iterator[str]:
+        yield self.generate(prompt, timeout=timeout)
+
+    def close(self):
+        pass
+
+
+# ============================================================================
+# OLLAMA OVER HTTP
+# ============================================================================
+
+class OllamaClient(LLMClient):
+    """Ollama's /api/generate over a bounded pool of persistent HTTP connections
+
+    Each call checks a connection out of the pool and returns it once the
+    response has been read, so connections are reused across threads and
+    across task graph runs. At most `pool_size` connections are ever open;
+    further callers wait for one to come back.
+    """
+
+    # A kept-alive connection the server has since closed fails on first use
+    RETRYABLE = (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                 BrokenPipeError, ConnectionResetError)
+
+    def __init__(self, model: str = DEFAULT_MODEL, host: str = DEFAULT_HOST,
+                 timeout: float = DEFAULT_TIMEOUT, keep_alive: str = DEFAULT_KEEP_ALIVE,
+                 options: Dict = None, pool_size: int = DEFAULT_POOL_SIZE):
+        url = urlparse(host if "://" in host else f"http://{host}")
+        self.model = model
+        self.host = url.hostname or "localhost"
+        self.port = url.port or 11434
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.options = options or {}
+        self.pool_size = pool_size
+        # One entry per slot: an idle connection, or None for a slot with no
+        # connection yet (or whose connection was dropped)
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        for _ in range(pool_size):
+            self._pool.put(None)
+
+    def _checkout(self, timeout: float) -> http.client.HTTPConnection:
+        try:
+            conn = self._pool.get(timeout=timeout)
+        except queue.Empty:
+            raise LLMTimeout(f"All {self.pool_size} Ollama connections busy for {timeout}s") from None
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn
+
+    def _checkin(self, conn: http.client.HTTPConnection):
+        self._pool.put(conn)
+
+    def _discard(self, conn: http.client.HTTPConnection):
+        """Close a connection left in an unknown state and free its slot"""
+        conn.close()
+        self._pool.put(None)
+
+    def _post(self, conn: http.client.HTTPConnection, prompt: str, stream: bool,
+              timeout: float) -> http.client.HTTPResponse:
+        body = json.dumps({
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+            "options": self.options
+        })
+        for attempt in (1, 2):
+            try:
+                conn.request("POST", "/api/generate", body=body,
+                             headers={"Content-Type": "application/json"})
+                response = conn.getresponse()
+                break
+            except self.RETRYABLE as e:
+                # Closing makes the next request open a fresh socket
+                conn.close()
+                if attempt == 2:
+                    raise LLMError(f"Connection to {self.host}:{self.port} lost: {e}") from e
+            except socket.timeout as e:
+                raise LLMTimeout(f"No answer from Ollama within {timeout}s") from e
+            except (OSError, http.client.HTTPException) as e:
+                raise LLMError(f"Cannot reach Ollama at {self.host}:{self.port}: {e}") from e
+
+        if response.status != 200:
+            detail = response.read().decode(errors="replace")[:200]
+            raise LLMError(f"Ollama returned HTTP {response.status}: {detail}")
+        return response
+
+    def generate(self, prompt: str, timeout: float = None) -> str:
+        timeout = timeout or self.timeout
+        conn = self._checkout(timeout)
+        try:
+            response = self._post(conn, prompt, stream=False, timeout=timeout)
+            data = json.loads(response.read())
+        except socket.timeout as e:
+            self._discard(conn)
+            raise LLMTimeout(f"No answer from Ollama within {timeout}s") from e
+        except LLMError:
+            self._discard(conn)
+            raise
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            self._discard(conn)
+            raise LLMError(f"Bad response from Ollama: {e}") from e
+        self._checkin(conn)
+        if "error" in data:
+            raise LLMError(data["error"])
+        return data.get("response", "")
+
+    def stream(self, prompt: str, timeout: float = None) -> Iterator[str]:
+        """Yield the completion as the server produces it (one JSON object per line)"""
+        timeout = timeout or self.timeout
+        conn = self._checkout(timeout)
+        reusable = False
+        try:
+            response = self._post(conn, prompt, stream=True, timeout=timeout)
+            done = False
+            while not done:
+                line = response.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if "error" in chunk:
+                    raise LLMError(chunk["error"])
+                done = chunk.get("done", False)
+                if chunk.get("response"):
+                    yield chunk["response"]
+            # Drain the end of the body so the connection can be reused
+            response.read()
+            reusable = done
+        except socket.timeout as e:
+            raise LLMTimeout(f"Ollama stream stalled for {timeout}s") from e
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            raise LLMError(f"Stream from Ollama broke off: {e}") from e
+        finally:
+            # An abandoned or broken stream leaves unread data on the connection
+            if reusable:
+                self._checkin(conn)
+            else:
+                self._discard(conn)
+
+    def open_connections(self) -> int:
+        """Idle connections with an open socket (checked-out ones aren't counted)"""
+        with self._pool.mutex:
+            return sum(1 for conn in self._pool.queue if conn is not None and conn.sock is not None)
+
+    def close(self):
+        """Close the idle connections; checked-out ones are returned as usual"""
+        drained = []
+        while True:
+            try:
+                drained.append(self._pool.get_nowait())
+            except queue.Empty:
+                break
+        for conn in drained:
+            if conn is not None:
+                conn.close()
+            self._pool.put(None)
+
+
+# ============================================================================
+# FAKE BACKEND
+# ============================================================================
+
+class FakeLLMClient(LLMClient):
+    """In-process stand-in: canned responses, optional latency, and a call log
+
+    `responses` is a function of the prompt, or a dict whose first key found
+    in the prompt picks the response; anything else gets `default`.
+    """
+
+    def __init__(self, responses: Union[Callable[[str], str], Dict[str, str]] = None,
+                 default: str = "", latency: float = 0.0):
+        self.responses = responses or {}
+        self.default = default
+        self.latency = latency
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str, timeout: float = None) -> str:
+        with self._lock:
+            self.calls.append(prompt)
+        if self.latency:
+            time.sleep(self.latency)
+        if callable(self.responses):
+            return self.responses(prompt)
+        for key, response in self.responses.items():
+            if key in prompt:
+                return response
+        return self.default
+
+    def stream(self, prompt: str, timeout: float = None) -> Iterator[str]:
+        text = self.generate(prompt, timeout=timeout)
+        for i in range(0, len(text), 16):
+            yield text[i:i + 16]
+
+
+_default_client: Optional[LLMClient] = None
+_default_lock = threading.Lock()
+
+
+def get_default_client() -> LLMClient:
+    """The shared OllamaClient, created on first use (OLLAMA_HOST / WHAT_IF_MODEL)"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = OllamaClient()
+        return _default_client
+
+
+def set_default_client(client: Optional[LLMClient]):
+    """Swap the shared client, e.g. for a FakeLLMClient in tests; None resets it"""
+    global _default_client
+    with _default_lock:
+        _default_client = client
+
+
+if __name__ == "__main__":
+    llm = get_default_client()
+    try:
+        start = time.perf_counter()
+        for chunk in llm.stream("In one sentence, what if the internet went down for a day?"):
+            print(chunk, end="", flush=True)
+        print(f"\n[{time.perf_counter() - start:.1f}s]")
+    except LLMError as e:
+        print(f"Ollama is not available ({e}). Start it with: ollama serve")
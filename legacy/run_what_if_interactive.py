@@ -5,27 +5,23 @@ Uses Ollama + Llama 2 directly for intelligent analysis
 """
 
 import json
-import requests
+from llm_client import LLMError, OllamaClient
 from what_if_scenario_agent import WhatIfScenarioOrchestrator
 
+# One client for the whole session, so every call reuses the same connection
+llm = OllamaClient(model="llama2:latest", timeout=60, options={"temperature": 0.7})
+
 def call_llama(prompt: str) -> str:
-    """Call Llama 2 via Ollama for intelligent analysis."""
+    """Call Llama 2 via Ollama, printing the analysis as it streams in."""
+    chunks = []
     try:
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={
-                "model": "llama2:latest",
-                "prompt": prompt,
-                "stream": False,
-                "temperature": 0.7
-            },
-            timeout=60
-        )
-        if response.status_code == 200:
-            return response.json()["response"]
-        else:
-            return f"Error: {response.status_code}"
-    except Exception as e:
+        for chunk in llm.stream(prompt):
+            print(chunk, end="", flush=True)
+            chunks.append(chunk)
+        print()
+        return "".join(chunks)
+    except LLMError as e:
+        print(f"Connection error: {e}")
         return f"Connection error: {e}"
 
 def enhance_scenario_analysis(scenario: str, orchestrator_output: dict) -> str:
@@ -54,7 +50,7 @@ def main():
     print("="*70)
     print("\nInitializing agent...\n")
     
-    orchestrator = WhatIfScenarioOrchestrator()
+    orchestrator = WhatIfScenarioOrchestrator(llm=llm)
     
     scenarios = [
         "What if fossil fuels were banned tomorrow?",
@@ -72,13 +68,11 @@ def main():
             print("\n[Running 6-stage workflow...]")
             structured_output = orchestrator.run_workflow(scenario)
             
-            # Enhance with LLM reasoning
-            llm_analysis = enhance_scenario_analysis(scenario, structured_output)
-            
+            # Enhance with LLM reasoning (streamed to the terminal as it arrives)
             print("\n" + "-"*70)
             print("ENHANCED LLM ANALYSIS:")
             print("-"*70)
-            print(llm_analysis)
+            enhance_scenario_analysis(scenario, structured_output)
             
             print("\n" + "-"*70)
             print("STRUCTURED WORKFLOW OUTPUT:")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+LLM Client Tests - Connection Reuse Against a Local Ollama-Protocol Server
+OllamaClient must keep a bounded set of connections and reuse them across
+task graph runs instead of opening new ones per thread.
+Run with: python -m pytest -q test_llm_client.py
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from llm_client import OllamaClient
+from what_if_scenario_agent import WhatIfScenarioOrchestrator
+from what_if_scheduler import fan_out
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Echoes the prompt back over keep-alive HTTP/1.1, like /api/generate"""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.server.connections.add(self.client_address)
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        text = "echo: " + body["prompt"][:40]
+        if body["stream"]:
+            lines = [{"response": word + " ", "done": False} for word in text.split()]
+            lines.append({"response": "", "done": True})
+            payload = b"".join(json.dumps(line).encode() + b"\n" for line in lines)
+        else:
+            payload = json.dumps({"response": text, "done": True}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllamaHandler)
+    httpd.daemon_threads = True
+    httpd.connections = set()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def client_for(server, **kwargs) -> OllamaClient:
+    host, port = server.server_address[:2]
+    return OllamaClient(host=f"http://{host}:{port}", timeout=5, **kwargs)
+
+
+def test_workflow_runs_reuse_the_pooled_connections(server):
+    llm = client_for(server)
+    orchestrator = WhatIfScenarioOrchestrator(llm=llm, max_workers=4)
+
+    orchestrator.run_workflow("What if the power grid failed for a week?")
+    first_run = len(server.connections)
+    orchestrator.run_workflow("What if remote work became mandatory?")
+
+    assert 0 < first_run <= llm.pool_size
+    # The second run opened no new connections
+    assert len(server.connections) == first_run
+    assert llm.open_connections() <= llm.pool_size
+    llm.close()
+    assert llm.open_connections() == 0
+
+
+def test_more_threads_than_connections_wait_for_one(server):
+    llm = client_for(server, pool_size=2)
+    calls = {f"call_{i}": (lambda i=i: llm.generate(f"prompt {i}")) for i in range(12)}
+
+    results = fan_out(calls, max_workers=8)
+
+    assert results == {key: f"echo: prompt {key[5:]}" for key in calls}
+    assert len(server.connections) <= 2
+
+
+def test_finished_stream_returns_its_connection(server):
+    llm = client_for(server, pool_size=1)
+
+    assert "".join(llm.stream("one two three")).split() == ["echo:", "one", "two", "three"]
+    assert llm.generate("again") == "echo: again"
+    assert len(server.connections) == 1
+
+
+def test_abandoned_stream_frees_its_slot(server):
+    llm = client_for(server, pool_size=1)
+
+    stream = llm.stream("one two three")
+    next(stream)
+    stream.close()
+
+    # The half-read connection was dropped, and the slot is usable again
+    assert llm.generate("after") == "echo: after"
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+What-If Orchestrator Tests - Workflows Driven by FakeLLMClient
+Checks how many LLM calls each orchestrator makes, that failed, timed-out
+and hung calls fall back per domain without touching the others, and that
+concurrent runs give the same output as running one call at a time.
+Run with: python -m pytest -q test_what_if_orchestrators.py
+"""
+
+import json
+import re
+import threading
+
+import pytest
+
+from llm_client import FakeLLMClient, LLMError, LLMTimeout
+from what_if_scenario_agent import RIPPLE_DOMAINS, WhatIfScenarioOrchestrator
+from what_if_scenario_agent_enhanced import LLM_DOMAINS, EnhancedWhatIfOrchestrator
+from what_if_scenario_agent_v2 import FastWhatIfOrchestrator
+
+SCENARIO = "What if the power grid failed for a week?"
+DOMAINS = 7
+
+
+def domain_of(prompt: str) -> str:
+    """The domain a per-domain prompt is about"""
+    return re.search(r"(?:the|for) (\w+) (?:domain|impact)", prompt).group(1)
+
+
+def model(failures: dict = None):
+    """Canned JSON answers for both orchestrators' prompts
+
+    `failures` maps a (stage, domain) pair to a callable that stands in for
+    the model on that call, e.g. one that raises or hangs.
+    """
+    failures = failures or {}
+
+    def respond(prompt: str) -> str:
+        if "extract structured fields" in prompt or "Extract key details" in prompt:
+            return json.dumps({"event": "Grid failure", "scope": "Regional",
+                               "duration": "Short-term", "scale": "Millions",
+                               "entities": ["Utilities", "Hospitals"]})
+        if "ripple" in prompt:
+            impact = re.search(r"impact(?: in \w+)?: \"?([^\"\n]+)", prompt).group(1)
+            return json.dumps({"chains": [
+                {"order": 2, "cause": impact, "effect": f"After {impact}"},
+                {"order": 3, "cause": f"After {impact}", "effect": f"Later {impact}"}
+            ]})
+        domain = domain_of(prompt)
+        if "everity" in prompt:
+            stage = "severity"
+            answer = {"severity_score": len(domain) % 5 + 1, "severity_level": f"{domain} level",
+                      "justification": f"Scored {domain}", "recovery_timeline": "Weeks"}
+        else:
+            stage = "impacts"
+            answer = {"impacts": [{"description": f"LLM impact in {domain}",
+                                   "explanation": "why", "affected_entities": ["who"],
+                                   "onset": "Hours"}]}
+        if (stage, domain) in failures:
+            return failures[(stage, domain)]()
+        return json.dumps(answer)
+
+    return respond
+
+
+def failing(error: Exception):
+    """A stand-in model call that raises `error`, with or without a prompt"""
+    def call(prompt: str = None):
+        raise error
+    return call
+
+
+@pytest.fixture
+def release():
+    """An event hung calls wait on; set at teardown so their threads exit"""
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+# ============================================================================
+# WHAT-IF SCENARIO ORCHESTRATOR
+# ============================================================================
+
+def test_workflow_makes_one_call_per_stage_and_domain():
+    llm = FakeLLMClient(model())
+
+    stages = WhatIfScenarioOrchestrator(llm=llm).run_workflow(SCENARIO)["stages"]
+
+    # Parse, then impacts and severity per domain, then ripples for a few domains
+    assert len(llm.calls) == 1 + DOMAINS * 2 + RIPPLE_DOMAINS
+    assert stages["stage_1"]["event"] == "Grid failure"
+    impacts = stages["stage_3"]["first_order_impacts"]
+    assert [items[0]["description"] for items in impacts.values()] == \
+        [f"LLM impact in {domain}" for domain in impacts]
+    assert len(stages["stage_4"]["second_order"]) == RIPPLE_DOMAINS
+    assert {domain: ranking["justification"] for domain, ranking in
+            stages["stage_5"]["rankings"].items()} == {domain: f"Scored {domain}" for domain in impacts}
+
+
+def test_failed_calls_fall_back_for_their_domain_only():
+    llm = FakeLLMClient(model({
+        ("impacts", "healthcare"): failing(LLMError("connection refused")),
+        ("severity", "economy"): failing(LLMTimeout("no answer within 30s")),
+        ("severity", "education"): lambda: "not json at all",
+    }))
+    orchestrator = WhatIfScenarioOrchestrator(llm=llm)
+
+    stages = orchestrator.run_workflow(SCENARIO)["stages"]
+
+    impacts = stages["stage_3"]["first_order_impacts"]
+    rankings = stages["stage_5"]["rankings"]
+    assert impacts["healthcare"] == orchestrator._fallback_impacts("healthcare")
+    assert impacts["technology"][0]["description"] == "LLM impact in technology"
+    assert rankings["economy"] == orchestrator._fallback_ranking()
+    assert rankings["education"] == orchestrator._fallback_ranking()
+    assert rankings["infrastructure"]["justification"] == "Scored infrastructure"
+    # Healthcare is still scored, from its fallback impacts
+    assert rankings["healthcare"]["justification"] == "Scored healthcare"
+
+
+def test_hung_call_misses_its_deadline_and_falls_back(release):
+    def hang():
+        release.wait(10)
+        return "{}"
+
+    orchestrator = WhatIfScenarioOrchestrator(
+        llm=FakeLLMClient(model({("impacts", "economy"): hang})))
+    orchestrator.llm_deadline = 0.3
+
+    stages = orchestrator.run_workflow(SCENARIO)["stages"]
+
+    impacts = stages["stage_3"]["first_order_impacts"]
+    assert impacts["economy"] == orchestrator._fallback_impacts("economy")
+    assert impacts["healthcare"][0]["description"] == "LLM impact in healthcare"
+    # The ripple chain waiting on economy's impacts is built from the fallback
+    assert stages["stage_4"]["second_order"][0]["cause"] == "Direct consequence in economy"
+
+
+def test_concurrent_run_matches_one_call_at_a_time():
+    outputs = [
+        WhatIfScenarioOrchestrator(llm=FakeLLMClient(model(), latency=0.01),
+                                   max_workers=workers).run_workflow(SCENARIO)
+        for workers in (1, 4)
+    ]
+
+    assert outputs[0] == outputs[1]
+
+
+# ============================================================================
+# ENHANCED ORCHESTRATOR
+# ============================================================================
+
+def test_enhanced_workflow_asks_only_about_the_first_domains():
+    llm = FakeLLMClient(model())
+
+    stages = EnhancedWhatIfOrchestrator(llm=llm).run_workflow(SCENARIO)["stages"]
+
+    # Parse, impacts for LLM_DOMAINS, a score per domain and one ripple call
+    assert len(llm.calls) == 1 + LLM_DOMAINS + DOMAINS + 1
+    impacts = stages["stage_3"]["first_order_impacts"]
+    descriptions = [items[0]["description"] for items in impacts.values()]
+    domains = list(impacts)
+    assert descriptions == ([f"LLM impact in {domain}" for domain in domains[:LLM_DOMAINS]]
+                            + [f"Direct consequence in {domain}" for domain in domains[LLM_DOMAINS:]])
+    assert stages["stage_4"]["second_order"][0]["cause"] == f"LLM impact in {domains[0]}"
+
+
+def test_enhanced_failed_calls_fall_back_for_their_domain_only():
+    llm = FakeLLMClient(model({
+        ("impacts", "economy"): failing(LLMTimeout("no answer within 15s")),
+        ("severity", "healthcare"): failing(LLMError("connection reset")),
+    }))
+    orchestrator = EnhancedWhatIfOrchestrator(llm=llm)
+
+    stages = orchestrator.run_workflow(SCENARIO)["stages"]
+
+    impacts = stages["stage_3"]["first_order_impacts"]
+    rankings = stages["stage_5"]["rankings"]
+    assert impacts["economy"] == orchestrator._fallback_impacts("economy")
+    assert impacts["healthcare"][0]["description"] == "LLM impact in healthcare"
+    assert rankings["healthcare"] == orchestrator._fallback_ranking()
+    assert rankings["economy"]["justification"] == "Scored economy"
+    assert stages["stage_4"]["second_order"][0]["cause"] == "Direct consequence in economy"
+
+
+def test_enhanced_concurrent_run_matches_one_call_at_a_time():
+    outputs = [
+        EnhancedWhatIfOrchestrator(llm=FakeLLMClient(model(), latency=0.01),
+                                   max_workers=workers).run_workflow(SCENARIO)
+        for workers in (1, 4)
+    ]
+
+    assert outputs[0] == outputs[1]
+
+
+# ============================================================================
+# FAST ORCHESTRATOR
+# ============================================================================
+
+def test_fast_workflow_names_the_event_with_one_call():
+    llm = FakeLLMClient(default="Regional blackout\nfor a whole week")
+
+    stages = FastWhatIfOrchestrator(llm=llm).run_workflow(SCENARIO)["stages"]
+
+    assert len(llm.calls) == 1
+    assert stages["stage_1"]["event"] == "Regional blackout"
+
+
+def test_fast_workflow_keeps_the_template_event_when_the_call_fails():
+    llm = FakeLLMClient(failing(LLMTimeout("no answer within 15s")))
+
+    stages = FastWhatIfOrchestrator(llm=llm).run_workflow(SCENARIO)["stages"]
+
+    assert len(llm.calls) == 1
+    assert stages["stage_1"]["event"] == SCENARIO[:80]
+    assert stages == FastWhatIfOrchestrator().run_workflow(SCENARIO)["stages"]
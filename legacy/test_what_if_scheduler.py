@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+What-If Scheduler Tests - Deadlines and Hung Calls
+Hung LLM calls must not busy-wait or keep the calls queued behind them
+waiting past their own deadlines.
+Run with: python -m pytest -q test_what_if_scheduler.py
+"""
+
+import threading
+import time
+
+import pytest
+
+from what_if_scheduler import TaskGraph, fan_out
+
+
+@pytest.fixture
+def release():
+    """An event hung calls wait on; set at teardown so their threads exit"""
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def test_hung_calls_give_up_their_slots(release):
+    calls = {f"domain_{i}": (lambda: release.wait(10)) for i in range(6)}
+
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    results = fan_out(calls, max_workers=2, deadline=0.3,
+                      fallback=lambda key, error: f"fallback for {key}")
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+    assert results == {key: f"fallback for {key}" for key in calls}
+    # Three waves of two, each cut off at its 0.3s deadline
+    assert wall < 1.5
+    assert cpu < 0.3
+
+
+def test_queued_task_gets_its_full_deadline_after_a_hung_one(release):
+    results = fan_out({"hung": lambda: release.wait(10),
+                       "slow": lambda: time.sleep(0.2) or "done"},
+                      max_workers=1, deadline=0.3, fallback=lambda key, error: "fallback")
+
+    assert results == {"hung": "fallback", "slow": "done"}
+
+
+def test_dependencies_receive_results_and_fallbacks(release):
+    graph = TaskGraph(max_workers=2, deadline=0.2)
+    graph.add("event", lambda _: "flood")
+    graph.add("stuck", lambda _: release.wait(10), fallback=lambda error: "unknown")
+    graph.add("summary", lambda inputs: f"{inputs['event']}/{inputs['stuck']}",
+              deps=["event", "stuck"])
+
+    assert graph.run() == {"event": "flood", "stuck": "unknown", "summary": "flood/unknown"}
+
+
+def test_error_without_fallback_propagates():
+    graph = TaskGraph()
+    graph.add("broken", lambda _: 1 / 0)
+
+    with pytest.raises(ZeroDivisionError):
+        graph.run()
@@ -26,12 +26,19 @@ IMPORTS EXPLAINED:
 - dataclasses: For clean data structures (ScenarioState)
 - typing: For type hints (Dict, List, Any)
 - strands: The agent framework we're using
+- what_if_scheduler: Runs independent LLM calls (one per domain) at the same time
+- llm_client: Talks to the local Ollama server (or a fake one for testing)
 """
 
 import json
 from typing import Dict, List, Any
 from dataclasses import dataclass, asdict
 from strands import Agent, tool
+from what_if_scheduler import DEFAULT_WORKERS, TaskGraph, fan_out
+from llm_client import LLMClient, get_default_client
+
+# Stage 4 builds ripple chains from the first impact of this many domains
+RIPPLE_DOMAINS = 3
 
 
 print("""
@@ -562,10 +569,23 @@ class WhatIfScenarioOrchestrator:
     5. Compiles final output
     """
     
-    def __init__(self):
-        """Initialize the orchestrator."""
+    def __init__(self, llm: LLMClient = None, max_workers: int = DEFAULT_WORKERS,
+                 llm_timeout: int = 30):
+        """
+        Initialize the orchestrator.
+        
+        llm: the model client (default: the shared Ollama client; pass a
+             FakeLLMClient to run without a model)
+        max_workers: how many LLM calls may run at the same time
+        llm_timeout: seconds one LLM call may take before its fallback is used
+        """
         self.state = None
         self.stage_outputs = {}
+        self.llm = llm or get_default_client()
+        self.max_workers = max_workers
+        self.llm_timeout = llm_timeout
+        # The scheduler's deadline backs up the client's own timeout
+        self.llm_deadline = llm_timeout + 5
     
     def run_workflow(self, user_prompt: str) -> Dict[str, Any]:
         """
@@ -577,9 +597,9 @@ class WhatIfScenarioOrchestrator:
         1. Create initial state
         2. Run Stage 1 (parse scenario)
         3. Run Stage 2 (decompose domains)
-        4. Run Stage 3 (simulate impacts)
-        5. Run Stage 4 (build ripples)
-        6. Run Stage 5 (score severity)
+        4. Run Stage 3 (simulate impacts)    ┐
+        5. Run Stage 4 (build ripples)       ├ one concurrent task graph
+        6. Run Stage 5 (score severity)      ┘
         7. Run Stage 6 (format report)
         8. Return final output
         """
@@ -623,13 +643,20 @@ class WhatIfScenarioOrchestrator:
             print(f"  {i}. {domain}")
         print(f"\n→ Stage 2 complete. Passing to Stage 3...")
         
+        # ====== STAGES 3-5 RUN TOGETHER ======
+        # Per-domain LLM calls don't depend on each other, so they run
+        # concurrently; the results are shown stage by stage below.
+        print(f"\n[STAGES 3-5] Running per-domain LLM calls ({self.max_workers} at a time)...")
+        stage3_output, stage4_output, stage5_output = self._run_impact_graph(
+            stage1_output, stage2_output
+        )
+        
         # ====== STAGE 3: IMPACT SIMULATION ======
         print("\n[STAGE 3] Impact Simulation Strand")
         print("-" * 70)
         print("INPUT: Scenario + Domains from Stages 1&2")
         print("TASK: Generate first-order direct consequences per domain")
         
-        stage3_output = self._stage_3_impact_simulation(stage1_output, stage2_output)
         self.stage_outputs["stage_3"] = stage3_output
         
         print(f"\nOUTPUT:")
@@ -646,7 +673,6 @@ class WhatIfScenarioOrchestrator:
         print("INPUT: First-order impacts from Stage 3")
         print("TASK: Generate second and third-order chain reactions")
         
-        stage4_output = self._stage_4_ripple_effects(stage3_output)
         self.stage_outputs["stage_4"] = stage4_output
         
         print(f"\nOUTPUT:")
@@ -661,7 +687,6 @@ class WhatIfScenarioOrchestrator:
         print("INPUT: All impacts from Stages 3&4")
         print("TASK: Score severity 1-5 for each domain")
         
-        stage5_output = self._stage_5_severity_ranking(stage3_output, stage4_output)
         self.stage_outputs["stage_5"] = stage5_output
         
         print(f"\nOUTPUT:")
@@ -698,7 +723,6 @@ class WhatIfScenarioOrchestrator:
         
         Extracts structured fields from user prompt using LLM reasoning.
         """
-        import subprocess
         import re
         
         prompt = f"""Analyze this hypothetical scenario and extract structured fields:
@@ -715,21 +739,12 @@ Extract and return ONLY valid JSON (no markdown, no code blocks):
 }}"""
         
         try:
-            # Use ollama CLI directly
-            result = subprocess.run(
-                ["ollama", "run", "llama2", prompt],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode == 0:
-                response = result.stdout
-                json_match = re.search(r'\{.*\}', response, re.DOTALL)
-                if json_match:
-                    parsed = json.loads(json_match.group())
-                    parsed["raw_prompt"] = self.state.user_prompt
-                    return parsed
+            response = self.llm.generate(prompt, timeout=self.llm_timeout)
+            json_match = re.search(r'\{.*\}', response, re.DOTALL)
+            if json_match:
+                parsed = json.loads(json_match.group())
+                parsed["raw_prompt"] = self.state.user_prompt
+                return parsed
         except Exception as e:
             print(f"  [LLM Error in Stage 1: {str(e)[:50]}... using fallback]")
         
@@ -769,14 +784,24 @@ Extract and return ONLY valid JSON (no markdown, no code blocks):
         
         Generates first-order impacts per domain using LLM reasoning.
         Uses Stage 1 & 2 outputs as input.
+        
+        The domains don't depend on each other, so their LLM calls run
+        concurrently (see what_if_scheduler.py).
         """
-        import subprocess
+        impacts = fan_out(
+            {domain: (lambda domain=domain: self._impacts_for_domain(stage1, domain))
+             for domain in stage2['impacted_domains']},
+            max_workers=self.max_workers,
+            deadline=self.llm_deadline,
+            fallback=lambda domain, error: self._fallback_impacts(domain)
+        )
+        return {"first_order_impacts": impacts}
+    
+    def _impacts_for_domain(self, stage1: Dict, domain: str) -> List[Dict]:
+        """One Stage 3 LLM call: the first-order impacts for one domain."""
         import re
         
-        impacts = {}
-        
-        for domain in stage2['impacted_domains']:
-            prompt = f"""Given this scenario, generate 2-3 realistic first-order impacts for the {domain} domain.
+        prompt = f"""Given this scenario, generate 2-3 realistic first-order impacts for the {domain} domain.
 
 Scenario: {stage1['raw_prompt']}
 Event: {stage1['event']}
@@ -794,36 +819,27 @@ For the {domain} domain, return ONLY valid JSON (no markdown):
     }}
   ]
 }}"""
-            
-            try:
-                result = subprocess.run(
-                    ["ollama", "run", "llama2", prompt],
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-                
-                if result.returncode == 0:
-                    response = result.stdout
-                    json_match = re.search(r'\{.*\}', response, re.DOTALL)
-                    if json_match:
-                        data = json.loads(json_match.group())
-                        impacts[domain] = data.get("impacts", [])
-                        continue
-            except Exception as e:
-                print(f"  [LLM Error in Stage 3 ({domain}): {str(e)[:40]}... using fallback]")
-            
-            # Fallback
-            impacts[domain] = [
-                {
-                    "description": f"Direct consequence in {domain}",
-                    "explanation": "Immediate effect from scenario",
-                    "affected_entities": ["Key stakeholders"],
-                    "onset": "Immediate"
-                }
-            ]
         
-        return {"first_order_impacts": impacts}
+        try:
+            response = self.llm.generate(prompt, timeout=self.llm_timeout)
+            json_match = re.search(r'\{.*\}', response, re.DOTALL)
+            if json_match:
+                data = json.loads(json_match.group())
+                return data.get("impacts", [])
+        except Exception as e:
+            print(f"  [LLM Error in Stage 3 ({domain}): {str(e)[:40]}... using fallback]")
+        
+        return self._fallback_impacts(domain)
+    
+    def _fallback_impacts(self, domain: str) -> List[Dict]:
+        return [
+            {
+                "description": f"Direct consequence in {domain}",
+                "explanation": "Immediate effect from scenario",
+                "affected_entities": ["Key stakeholders"],
+                "onset": "Immediate"
+            }
+        ]
     
     def _stage_4_ripple_effects(self, stage3: Dict) -> Dict:
         """
@@ -832,22 +848,34 @@ For the {domain} domain, return ONLY valid JSON (no markdown):
         Generates ripple effect chains using LLM reasoning.
         Uses Stage 3 output as input.
         """
-        import subprocess
+        # One chain per domain for the first few domains, built concurrently
+        domains = list(stage3['first_order_impacts'])[:RIPPLE_DOMAINS]
+        chains = fan_out(
+            {domain: (lambda domain=domain: self._ripples_for_domain(
+                domain, stage3['first_order_impacts'][domain]))
+             for domain in domains},
+            max_workers=self.max_workers,
+            deadline=self.llm_deadline,
+            fallback=lambda domain, error: self._fallback_ripples(f"Direct consequence in {domain}")
+        )
+        return self._collect_ripples(chains.values())
+    
+    def _collect_ripples(self, chain_lists) -> Dict:
+        ripple_chains = [chain for chains in chain_lists for chain in chains]
+        return {
+            "second_order": [c for c in ripple_chains if c.get("order") == 2],
+            "third_order": [c for c in ripple_chains if c.get("order") == 3]
+        }
+    
+    def _ripples_for_domain(self, domain: str, impacts: List[Dict]) -> List[Dict]:
+        """One Stage 4 LLM call: ripple chains from a domain's first impact."""
         import re
         
-        ripple_chains = []
-        
-        # Get first few impacts to build ripples from
-        first_impacts = []
-        for domain, impacts in stage3['first_order_impacts'].items():
-            for impact in impacts[:1]:  # Take first impact per domain
-                first_impacts.append({
-                    "domain": domain,
-                    "impact": impact['description']
-                })
-        
-        for item in first_impacts[:3]:  # Limit to 3 to avoid too many LLM calls
-            prompt = f"""Given this first-order impact, generate 2 ripple effect chains (second and third-order consequences).
+        # A domain the LLM gave no impacts for still gets its chain slot
+        if not impacts:
+            return self._fallback_ripples(f"Direct consequence in {domain}")
+        item = {"domain": domain, "impact": impacts[0]['description']}
+        prompt = f"""Given this first-order impact, generate 2 ripple effect chains (second and third-order consequences).
 
 First-order impact in {item['domain']}: {item['impact']}
 
@@ -872,49 +900,37 @@ Return ONLY valid JSON (no markdown):
     }}
   ]
 }}"""
-            
-            try:
-                result = subprocess.run(
-                    ["ollama", "run", "llama2", prompt],
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-                
-                if result.returncode == 0:
-                    response = result.stdout
-                    json_match = re.search(r'\{.*\}', response, re.DOTALL)
-                    if json_match:
-                        data = json.loads(json_match.group())
-                        ripple_chains.extend(data.get("chains", []))
-                        continue
-            except Exception as e:
-                print(f"  [LLM Error in Stage 4: {str(e)[:40]}... using fallback]")
-            
-            # Fallback
-            ripple_chains.extend([
-                {
-                    "order": 2,
-                    "cause": item['impact'],
-                    "effect": "Secondary consequence",
-                    "explanation": "Cascading effect",
-                    "affected_domains": ["multiple"],
-                    "time_to_manifest": "Days to weeks"
-                },
-                {
-                    "order": 3,
-                    "cause": "Secondary consequence",
-                    "effect": "Tertiary consequence",
-                    "explanation": "Further cascading",
-                    "affected_domains": ["multiple"],
-                    "time_to_manifest": "Weeks to months"
-                }
-            ])
         
-        return {
-            "second_order": [c for c in ripple_chains if c.get("order") == 2],
-            "third_order": [c for c in ripple_chains if c.get("order") == 3]
-        }
+        try:
+            response = self.llm.generate(prompt, timeout=self.llm_timeout)
+            json_match = re.search(r'\{.*\}', response, re.DOTALL)
+            if json_match:
+                data = json.loads(json_match.group())
+                return data.get("chains", [])
+        except Exception as e:
+            print(f"  [LLM Error in Stage 4: {str(e)[:40]}... using fallback]")
+        
+        return self._fallback_ripples(item['impact'])
+    
+    def _fallback_ripples(self, impact: str) -> List[Dict]:
+        return [
+            {
+                "order": 2,
+                "cause": impact,
+                "effect": "Secondary consequence",
+                "explanation": "Cascading effect",
+                "affected_domains": ["multiple"],
+                "time_to_manifest": "Days to weeks"
+            },
+            {
+                "order": 3,
+                "cause": "Secondary consequence",
+                "effect": "Tertiary consequence",
+                "explanation": "Further cascading",
+                "affected_domains": ["multiple"],
+                "time_to_manifest": "Weeks to months"
+            }
+        ]
     
     def _stage_5_severity_ranking(self, stage3: Dict, stage4: Dict) -> Dict:
         """
@@ -922,16 +938,25 @@ Return ONLY valid JSON (no markdown):
         
         Scores and ranks impacts using LLM reasoning.
         Uses Stage 3 & 4 outputs as input.
+        
+        Each domain is scored on its own, so the calls run concurrently.
         """
-        import subprocess
+        rankings = fan_out(
+            {domain: (lambda domain=domain, impacts=impacts: self._severity_for_domain(domain, impacts))
+             for domain, impacts in stage3['first_order_impacts'].items()},
+            max_workers=self.max_workers,
+            deadline=self.llm_deadline,
+            fallback=lambda domain, error: self._fallback_ranking()
+        )
+        return {"rankings": rankings}
+    
+    def _severity_for_domain(self, domain: str, impacts: List[Dict]) -> Dict:
+        """One Stage 5 LLM call: the severity score of one domain's impacts."""
         import re
         
-        rankings = {}
+        impact_summary = "; ".join([i['description'] for i in impacts])
         
-        for domain, impacts in stage3['first_order_impacts'].items():
-            impact_summary = "; ".join([i['description'] for i in impacts])
-            
-            prompt = f"""Score the severity of these impacts in the {domain} domain on a 1-5 scale.
+        prompt = f"""Score the severity of these impacts in the {domain} domain on a 1-5 scale.
 
 Impacts: {impact_summary}
 
@@ -955,46 +980,78 @@ Return ONLY valid JSON (no markdown):
   "recovery_timeline": "Estimated recovery time",
   "confidence": 0.8
 }}"""
-            
-            try:
-                result = subprocess.run(
-                    ["ollama", "run", "llama2", prompt],
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-                
-                if result.returncode == 0:
-                    response = result.stdout
-                    json_match = re.search(r'\{.*\}', response, re.DOTALL)
-                    if json_match:
-                        data = json.loads(json_match.group())
-                        rankings[domain] = {
-                            "score": min(5, max(1, data.get("severity_score", 3))),
-                            "level": data.get("severity_level", "Moderate"),
-                            "factors": data.get("scoring_factors", {}),
-                            "justification": data.get("justification", ""),
-                            "recovery_timeline": data.get("recovery_timeline", "Unknown")
-                        }
-                        continue
-            except Exception as e:
-                print(f"  [LLM Error in Stage 5 ({domain}): {str(e)[:40]}... using fallback]")
-            
-            # Fallback
-            rankings[domain] = {
-                "score": 3,
-                "level": "Moderate",
-                "factors": {
-                    "disruption_scale": 3,
-                    "recovery_difficulty": 3,
-                    "cascading_effects": 3,
-                    "vulnerable_populations": 2
-                },
-                "justification": "Moderate impact based on scenario",
-                "recovery_timeline": "Weeks to months"
-            }
         
-        return {"rankings": rankings}
+        try:
+            response = self.llm.generate(prompt, timeout=self.llm_timeout)
+            json_match = re.search(r'\{.*\}', response, re.DOTALL)
+            if json_match:
+                data = json.loads(json_match.group())
+                return {
+                    "score": min(5, max(1, data.get("severity_score", 3))),
+                    "level": data.get("severity_level", "Moderate"),
+                    "factors": data.get("scoring_factors", {}),
+                    "justification": data.get("justification", ""),
+                    "recovery_timeline": data.get("recovery_timeline", "Unknown")
+                }
+        except Exception as e:
+            print(f"  [LLM Error in Stage 5 ({domain}): {str(e)[:40]}... using fallback]")
+        
+        return self._fallback_ranking()
+    
+    def _fallback_ranking(self) -> Dict:
+        return {
+            "score": 3,
+            "level": "Moderate",
+            "factors": {
+                "disruption_scale": 3,
+                "recovery_difficulty": 3,
+                "cascading_effects": 3,
+                "vulnerable_populations": 2
+            },
+            "justification": "Moderate impact based on scenario",
+            "recovery_timeline": "Weeks to months"
+        }
+    
+    def _run_impact_graph(self, stage1: Dict, stage2: Dict) -> tuple:
+        """
+        Stages 3-5 as one task graph instead of three sequential loops.
+        
+        Each domain's severity score only needs that domain's impacts, and
+        each ripple chain only needs its domain's first impact, so scoring
+        and ripple building start as soon as the impacts they need are in,
+        while other domains are still being simulated:
+        
+          impact:economy ──┬── ripple:economy
+                           └── severity:economy
+          impact:healthcare ─┬ ripple:healthcare
+                             └ severity:healthcare
+          ...
+        """
+        domains = stage2['impacted_domains']
+        graph = TaskGraph(max_workers=self.max_workers, deadline=self.llm_deadline)
+        
+        for domain in domains:
+            graph.add(f"impact:{domain}",
+                      lambda _, domain=domain: self._impacts_for_domain(stage1, domain),
+                      fallback=lambda error, domain=domain: self._fallback_impacts(domain))
+            graph.add(f"severity:{domain}",
+                      lambda inputs, domain=domain: self._severity_for_domain(
+                          domain, inputs[f"impact:{domain}"]),
+                      deps=[f"impact:{domain}"],
+                      fallback=lambda error: self._fallback_ranking())
+        for domain in domains[:RIPPLE_DOMAINS]:
+            graph.add(f"ripple:{domain}",
+                      lambda inputs, domain=domain: self._ripples_for_domain(
+                          domain, inputs[f"impact:{domain}"]),
+                      deps=[f"impact:{domain}"],
+                      fallback=lambda error, domain=domain: self._fallback_ripples(
+                          f"Direct consequence in {domain}"))
+        
+        results = graph.run()
+        stage3 = {"first_order_impacts": {domain: results[f"impact:{domain}"] for domain in domains}}
+        stage4 = self._collect_ripples(results[f"ripple:{domain}"] for domain in domains[:RIPPLE_DOMAINS])
+        stage5 = {"rankings": {domain: results[f"severity:{domain}"] for domain in domains}}
+        return stage3, stage4, stage5
     
     def _stage_6_format_report(self) -> Dict:
         """
@@ -1,15 +1,23 @@
 #!/usr/bin/env python3
 """
 ENHANCED What-If Scenario Agent - Faster LLM Integration
-Uses direct ollama CLI calls with optimized prompts
+Calls the local Ollama server through llm_client with optimized prompts.
+Independent per-domain calls in stages 3-5 run concurrently through
+what_if_scheduler.
 """
 
 import json
-import subprocess
 import re
 from typing import Dict, List, Any
 from dataclasses import dataclass
 
+from llm_client import LLMClient, get_default_client
+from what_if_scheduler import DEFAULT_WORKERS, TaskGraph, fan_out
+
+# Stage 3 asks the LLM about this many domains; the rest get template impacts
+LLM_DOMAINS = 3
+LLM_TIMEOUT = 15
+
 print("""
 ╔════════════════════════════════════════════════════════════════════╗
 ║    WHAT-IF SCENARIO AGENT - ENHANCED WITH LLM REASONING           ║
@@ -45,18 +53,11 @@ class ScenarioState:
             self.severity_rankings = {}
 
 
-def call_llama(prompt: str, timeout: int = 20) -> str:
-    """Call Llama 2 via ollama CLI with timeout."""
+def call_llama(prompt: str, timeout: int = 20, llm: LLMClient = None) -> str:
+    """Call Llama 2 via the Ollama server (or `llm`) with timeout."""
     try:
-        result = subprocess.run(
-            ["ollama", "run", "llama2", prompt],
-            capture_output=True,
-            text=True,
-            timeout=timeout
-        )
-        if result.returncode == 0:
-            return result.stdout.strip()
-    except subprocess.TimeoutExpired:
+        return (llm or get_default_client()).generate(prompt, timeout=timeout).strip()
+    except TimeoutError:
         print(f"    [LLM timeout - using fallback]")
     except Exception as e:
         print(f"    [LLM error: {str(e)[:30]}... - using fallback]")
@@ -77,9 +78,15 @@ def extract_json(text: str) -> Dict:
 class EnhancedWhatIfOrchestrator:
     """Enhanced orchestrator with LLM-powered stages."""
     
-    def __init__(self):
+    def __init__(self, llm: LLMClient = None, max_workers: int = DEFAULT_WORKERS,
+                 llm_timeout: int = LLM_TIMEOUT):
         self.state = None
         self.stage_outputs = {}
+        self.llm = llm or get_default_client()
+        self.max_workers = max_workers
+        self.llm_timeout = llm_timeout
+        # The scheduler's deadline backs up the client's own timeout
+        self.llm_deadline = llm_timeout + 5
     
     def run_workflow(self, user_prompt: str) -> Dict[str, Any]:
         """Execute the complete 6-stage workflow."""
@@ -122,13 +129,18 @@ class EnhancedWhatIfOrchestrator:
             print(f"  {i}. {domain}")
         print(f"\n→ Stage 2 complete. Passing to Stage 3...")
         
+        # ====== STAGES 3-5 RUN TOGETHER ======
+        print(f"\n[STAGES 3-5] Running per-domain LLM calls ({self.max_workers} at a time)...")
+        stage3_output, stage4_output, stage5_output = self._run_impact_graph(
+            stage1_output, stage2_output
+        )
+        
         # ====== STAGE 3: IMPACT SIMULATION ======
         print("\n[STAGE 3] Impact Simulation Strand")
         print("-" * 70)
         print("INPUT: Scenario + Domains from Stages 1&2")
         print("TASK: Generate first-order direct consequences per domain")
         
-        stage3_output = self._stage_3_impact_simulation(stage1_output, stage2_output)
         self.stage_outputs["stage_3"] = stage3_output
         
         print(f"\nOUTPUT:")
@@ -145,7 +157,6 @@ class EnhancedWhatIfOrchestrator:
         print("INPUT: First-order impacts from Stage 3")
         print("TASK: Generate second and third-order chain reactions")
         
-        stage4_output = self._stage_4_ripple_effects(stage3_output)
         self.stage_outputs["stage_4"] = stage4_output
         
         print(f"\nOUTPUT:")
@@ -160,7 +171,6 @@ class EnhancedWhatIfOrchestrator:
         print("INPUT: All impacts from Stages 3&4")
         print("TASK: Score severity 1-5 for each domain")
         
-        stage5_output = self._stage_5_severity_ranking(stage3_output, stage4_output)
         self.stage_outputs["stage_5"] = stage5_output
         
         print(f"\nOUTPUT:")
@@ -198,7 +208,7 @@ Scenario: {self.state.user_prompt}
 Return ONLY this JSON (no markdown):
 {{"event": "what happens", "scope": "Global/Regional/Local", "duration": "timeframe", "scale": "affected", "entities": ["actor1", "actor2"]}}"""
         
-        response = call_llama(prompt, timeout=15)
+        response = call_llama(prompt, timeout=self.llm_timeout, llm=self.llm)
         data = extract_json(response)
         
         if data:
@@ -236,38 +246,43 @@ Return ONLY this JSON (no markdown):
         }
     
     def _stage_3_impact_simulation(self, stage1: Dict, stage2: Dict) -> Dict:
-        """Stage 3: Generate first-order impacts using LLM."""
-        impacts = {}
+        """Stage 3: Generate first-order impacts using LLM, one domain per call, concurrently."""
+        domains = stage2['impacted_domains']
+        impacts = fan_out(
+            {domain: (lambda domain=domain: self._impacts_for_domain(stage1, domain))
+             for domain in domains[:LLM_DOMAINS]},  # Limit to 3 for speed
+            max_workers=self.max_workers,
+            deadline=self.llm_deadline,
+            fallback=lambda domain, error: self._fallback_impacts(domain)
+        )
         
-        for domain in stage2['impacted_domains'][:3]:  # Limit to 3 for speed
-            prompt = f"""For the {domain} domain, list 2 direct impacts from: {stage1['event']}
+        # Add remaining domains with fallback
+        for domain in domains[LLM_DOMAINS:]:
+            impacts[domain] = self._fallback_impacts(domain)
+        
+        return {"first_order_impacts": impacts}
+    
+    def _impacts_for_domain(self, stage1: Dict, domain: str) -> List[Dict]:
+        """One Stage 3 LLM call."""
+        prompt = f"""For the {domain} domain, list 2 direct impacts from: {stage1['event']}
 
 Return ONLY JSON:
 {{"impacts": [{{"description": "impact", "explanation": "why", "affected_entities": ["who"], "onset": "when"}}]}}"""
-            
-            response = call_llama(prompt, timeout=15)
-            data = extract_json(response)
-            
-            if data and "impacts" in data:
-                impacts[domain] = data["impacts"]
-            else:
-                impacts[domain] = [{
-                    "description": f"Direct consequence in {domain}",
-                    "explanation": "Immediate effect from scenario",
-                    "affected_entities": ["Key stakeholders"],
-                    "onset": "Immediate"
-                }]
         
-        # Add remaining domains with fallback
-        for domain in stage2['impacted_domains'][3:]:
-            impacts[domain] = [{
-                "description": f"Direct consequence in {domain}",
-                "explanation": "Immediate effect from scenario",
-                "affected_entities": ["Key stakeholders"],
-                "onset": "Immediate"
-            }]
+        response = call_llama(prompt, timeout=self.llm_timeout, llm=self.llm)
+        data = extract_json(response)
         
-        return {"first_order_impacts": impacts}
+        if data and "impacts" in data:
+            return data["impacts"]
+        return self._fallback_impacts(domain)
+    
+    def _fallback_impacts(self, domain: str) -> List[Dict]:
+        return [{
+            "description": f"Direct consequence in {domain}",
+            "explanation": "Immediate effect from scenario",
+            "affected_entities": ["Key stakeholders"],
+            "onset": "Immediate"
+        }]
     
     def _stage_4_ripple_effects(self, stage3: Dict) -> Dict:
         """Stage 4: Generate ripple effects using LLM."""
@@ -276,59 +291,112 @@ Return ONLY JSON:
         # Get first impact from first domain
         for domain, impacts in stage3['first_order_impacts'].items():
             if impacts:
-                impact = impacts[0]['description']
-                prompt = f"""From this impact: "{impact}", generate 2 ripple effects (2nd and 3rd order).
-
-Return ONLY JSON:
-{{"chains": [{{"order": 2, "cause": "impact", "effect": "result", "explanation": "how", "affected_domains": ["d1"], "time_to_manifest": "when"}}]}}"""
-                
-                response = call_llama(prompt, timeout=15)
-                data = extract_json(response)
-                
-                if data and "chains" in data:
-                    ripple_chains.extend(data["chains"])
-                else:
-                    ripple_chains.extend([
-                        {"order": 2, "cause": impact, "effect": "Secondary consequence", "explanation": "Cascading", "affected_domains": ["multiple"], "time_to_manifest": "Days"},
-                        {"order": 3, "cause": "Secondary", "effect": "Tertiary consequence", "explanation": "Further cascading", "affected_domains": ["multiple"], "time_to_manifest": "Weeks"}
-                    ])
+                ripple_chains = self._ripples_for_impact(impacts[0]['description'])
                 break
         
+        return self._collect_ripples(ripple_chains)
+    
+    def _collect_ripples(self, ripple_chains: List[Dict]) -> Dict:
         return {
             "second_order": [c for c in ripple_chains if c.get("order") == 2],
             "third_order": [c for c in ripple_chains if c.get("order") == 3]
         }
     
-    def _stage_5_severity_ranking(self, stage3: Dict, stage4: Dict) -> Dict:
-        """Stage 5: Score severity using LLM."""
-        rankings = {}
+    def _ripples_for_impact(self, impact: str) -> List[Dict]:
+        """One Stage 4 LLM call."""
+        prompt = f"""From this impact: "{impact}", generate 2 ripple effects (2nd and 3rd order).
+
+Return ONLY JSON:
+{{"chains": [{{"order": 2, "cause": "impact", "effect": "result", "explanation": "how", "affected_domains": ["d1"], "time_to_manifest": "when"}}]}}"""
         
-        for domain, impacts in stage3['first_order_impacts'].items():
-            impact_desc = impacts[0]['description'] if impacts else "Unknown"
-            prompt = f"""Score severity (1-5) for {domain} impact: "{impact_desc}"
+        response = call_llama(prompt, timeout=self.llm_timeout, llm=self.llm)
+        data = extract_json(response)
+        
+        if data and "chains" in data:
+            return data["chains"]
+        return self._fallback_ripples(impact)
+    
+    def _fallback_ripples(self, impact: str) -> List[Dict]:
+        return [
+            {"order": 2, "cause": impact, "effect": "Secondary consequence", "explanation": "Cascading", "affected_domains": ["multiple"], "time_to_manifest": "Days"},
+            {"order": 3, "cause": "Secondary", "effect": "Tertiary consequence", "explanation": "Further cascading", "affected_domains": ["multiple"], "time_to_manifest": "Weeks"}
+        ]
+    
+    def _stage_5_severity_ranking(self, stage3: Dict, stage4: Dict) -> Dict:
+        """Stage 5: Score severity using LLM, one domain per call, concurrently."""
+        rankings = fan_out(
+            {domain: (lambda domain=domain, impacts=impacts: self._severity_for_domain(domain, impacts))
+             for domain, impacts in stage3['first_order_impacts'].items()},
+            max_workers=self.max_workers,
+            deadline=self.llm_deadline,
+            fallback=lambda domain, error: self._fallback_ranking()
+        )
+        return {"rankings": rankings}
+    
+    def _severity_for_domain(self, domain: str, impacts: List[Dict]) -> Dict:
+        """One Stage 5 LLM call."""
+        impact_desc = impacts[0]['description'] if impacts else "Unknown"
+        prompt = f"""Score severity (1-5) for {domain} impact: "{impact_desc}"
 
 Return ONLY JSON:
 {{"severity_score": 3, "severity_level": "Moderate", "justification": "reason", "recovery_timeline": "time"}}"""
-            
-            response = call_llama(prompt, timeout=15)
-            data = extract_json(response)
-            
-            if data:
-                rankings[domain] = {
-                    "score": min(5, max(1, data.get("severity_score", 3))),
-                    "level": data.get("severity_level", "Moderate"),
-                    "justification": data.get("justification", ""),
-                    "recovery_timeline": data.get("recovery_timeline", "Unknown")
-                }
-            else:
-                rankings[domain] = {
-                    "score": 3,
-                    "level": "Moderate",
-                    "justification": "Moderate impact",
-                    "recovery_timeline": "Weeks to months"
-                }
         
-        return {"rankings": rankings}
+        response = call_llama(prompt, timeout=self.llm_timeout, llm=self.llm)
+        data = extract_json(response)
+        
+        if data:
+            return {
+                "score": min(5, max(1, data.get("severity_score", 3))),
+                "level": data.get("severity_level", "Moderate"),
+                "justification": data.get("justification", ""),
+                "recovery_timeline": data.get("recovery_timeline", "Unknown")
+            }
+        return self._fallback_ranking()
+    
+    def _fallback_ranking(self) -> Dict:
+        return {
+            "score": 3,
+            "level": "Moderate",
+            "justification": "Moderate impact",
+            "recovery_timeline": "Weeks to months"
+        }
+    
+    def _run_impact_graph(self, stage1: Dict, stage2: Dict) -> tuple:
+        """Stages 3-5 as one task graph.
+        
+        Severity for a domain waits only on that domain's impacts, and the
+        single ripple call waits only on the first domain's impacts. Domains
+        past LLM_DOMAINS have template impacts, so they are scored right away.
+        """
+        domains = stage2['impacted_domains']
+        graph = TaskGraph(max_workers=self.max_workers, deadline=self.llm_deadline)
+        
+        for i, domain in enumerate(domains):
+            if i < LLM_DOMAINS:
+                impact_task = lambda _, domain=domain: self._impacts_for_domain(stage1, domain)
+            else:
+                impact_task = lambda _, domain=domain: self._fallback_impacts(domain)
+            graph.add(f"impact:{domain}", impact_task,
+                      fallback=lambda error, domain=domain: self._fallback_impacts(domain))
+            graph.add(f"severity:{domain}",
+                      lambda inputs, domain=domain: self._severity_for_domain(
+                          domain, inputs[f"impact:{domain}"]),
+                      deps=[f"impact:{domain}"],
+                      fallback=lambda error: self._fallback_ranking())
+        if domains:
+            first = domains[0]
+            graph.add("ripple",
+                      lambda inputs: (self._ripples_for_impact(inputs[f"impact:{first}"][0]['description'])
+                                      if inputs[f"impact:{first}"]
+                                      else self._fallback_ripples(f"Direct consequence in {first}")),
+                      deps=[f"impact:{first}"],
+                      fallback=lambda error: self._fallback_ripples(f"Direct consequence in {first}"))
+        
+        results = graph.run()
+        stage3 = {"first_order_impacts": {domain: results[f"impact:{domain}"] for domain in domains}}
+        stage4 = self._collect_ripples(results.get("ripple", []))
+        stage5 = {"rankings": {domain: results[f"severity:{domain}"] for domain in domains}}
+        return stage3, stage4, stage5
     
     def _stage_6_format_report(self) -> Dict:
         """Stage 6: Format final report."""
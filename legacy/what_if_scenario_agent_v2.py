@@ -8,6 +8,8 @@ import json
 from typing import Dict, List, Any
 from dataclasses import dataclass
 
+from llm_client import LLMClient
+
 print("""
 ╔════════════════════════════════════════════════════════════════════╗
 ║    WHAT-IF SCENARIO AGENT v2 - FAST & REALISTIC ANALYSIS          ║
@@ -265,9 +267,12 @@ class ScenarioState:
 class FastWhatIfOrchestrator:
     """Fast orchestrator with realistic pre-computed impacts."""
     
-    def __init__(self):
+    def __init__(self, llm: LLMClient = None, llm_timeout: int = 15):
         self.state = None
         self.stage_outputs = {}
+        # Templates only by default; with an LLM client, stage 1 asks it to name the event
+        self.llm = llm
+        self.llm_timeout = llm_timeout
     
     def run_workflow(self, user_prompt: str) -> Dict[str, Any]:
         """Execute the complete 6-stage workflow."""
@@ -400,8 +405,21 @@ class FastWhatIfOrchestrator:
         else:
             duration = "Long-term (months+)"
         
+        event = self.state.user_prompt[:80]
+        if self.llm is not None:
+            try:
+                summary = self.llm.generate(
+                    f"Summarize this hypothetical event in under 12 words, no preamble: "
+                    f"{self.state.user_prompt}",
+                    timeout=self.llm_timeout
+                ).strip()
+                if summary:
+                    event = summary.splitlines()[0][:80]
+            except Exception as e:
+                print(f"  [LLM error: {str(e)[:30]}... - using template]")
+        
         return {
-            "event": self.state.user_prompt[:80],
+            "event": event,
             "scope": scope,
             "duration": duration,
             "scale": "Millions to billions affected",
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+What-If Stage Scheduler - Concurrent Fan-Out for Independent LLM Calls
+Runs a small graph of tasks on a bounded number of threads. A task starts as
+soon as the tasks it depends on have finished and a slot is free, so
+independent per-domain LLM calls (impacts in stage 3, severity scores in
+stage 5) overlap instead of waiting on each other. Every task has a deadline,
+counted from when it starts; a task that misses it or raises gets its
+fallback value and the tasks after it carry on. A task past its deadline
+gives up its slot, so a hung call can't hold up the tasks queued behind it.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable
+
+DEFAULT_WORKERS = 4
+DEFAULT_DEADLINE = 30  # seconds per task, counted from when it starts
+
+
+class TaskGraph:
+    """Named tasks with dependencies, run concurrently in dependency order
+
+    Each task is called with a dict of its dependencies' results. Threads
+    suit this work because every task spends its time waiting on an LLM.
+    At most `max_workers` tasks run at once, not counting abandoned ones:
+    their daemon threads run on until the call returns, and the result is
+    dropped.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, deadline: float = DEFAULT_DEADLINE):
+        self.max_workers = max_workers
+        self.deadline = deadline
+        self.tasks = {}
+        self.timings = {}
+
+    def add(self, name: str, fn: Callable[[Dict[str, Any]], Any], deps: Iterable[str] = (),
+            fallback: Callable[[Exception], Any] = None, deadline: float = None) -> "TaskGraph":
+        """Add a task; `fallback(error)` supplies its result if it fails or runs late"""
+        if name in self.tasks:
+            raise ValueError(f"Duplicate task: {name}")
+        self.tasks[name] = {
+            "fn": fn,
+            "deps": list(deps),
+            "fallback": fallback,
+            "deadline": deadline if deadline is not None else self.deadline
+        }
+        return self
+
+    def _check(self):
+        for name, task in self.tasks.items():
+            for dep in task["deps"]:
+                if dep not in self.tasks:
+                    raise ValueError(f"Task {name} depends on unknown task {dep}")
+        # Every task must be reachable in dependency order, i.e. no cycles
+        done = set()
+        remaining = dict(self.tasks)
+        while remaining:
+            ready = [name for name, task in remaining.items() if set(task["deps"]) <= done]
+            if not ready:
+                raise ValueError(f"Dependency cycle among: {', '.join(sorted(remaining))}")
+            for name in ready:
+                done.add(name)
+                del remaining[name]
+
+    def _settle(self, name: str, error: Exception) -> Any:
+        fallback = self.tasks[name]["fallback"]
+        if fallback is None:
+            raise error
+        return fallback(error)
+
+    def run(self) -> Dict[str, Any]:
+        """Run every task and return {name: result} in the order tasks were added"""
+        self._check()
+        results = {}
+        waiting = dict(self.tasks)
+        running = {}  # name -> start time
+        finished = queue.Queue()
+        self.timings = {}
+
+        def call(name, fn, inputs):
+            try:
+                finished.put((name, True, fn(inputs)))
+            except Exception as e:
+                finished.put((name, False, e))
+
+        def finish(name, result):
+            results[name] = result
+            self.timings[name] = time.perf_counter() - running.pop(name)
+
+        while waiting or running:
+            # Start tasks whose inputs are ready while there is a free slot
+            for name in [name for name, task in waiting.items()
+                         if all(dep in results for dep in task["deps"])]:
+                if len(running) >= self.max_workers:
+                    break
+                task = waiting.pop(name)
+                inputs = {dep: results[dep] for dep in task["deps"]}
+                running[name] = time.perf_counter()
+                threading.Thread(target=call, args=(name, task["fn"], inputs),
+                                 name=f"task-{name}", daemon=True).start()
+
+            # Every running task has started, so this is a real deadline
+            next_deadline = min(started + self.tasks[name]["deadline"]
+                                for name, started in running.items())
+            try:
+                outcomes = [finished.get(timeout=max(0, next_deadline - time.perf_counter()))]
+            except queue.Empty:
+                outcomes = []
+            while not finished.empty():
+                outcomes.append(finished.get_nowait())
+
+            for name, ok, value in outcomes:
+                # A task already given up on may still finish; its result is dropped
+                if name in running:
+                    finish(name, value if ok else self._settle(name, value))
+
+            # A late task's thread can't be stopped, but it stops holding a
+            # slot: it is left to finish on its own and the next task starts
+            now = time.perf_counter()
+            for name, started in list(running.items()):
+                limit = self.tasks[name]["deadline"]
+                if now - started >= limit:
+                    finish(name, self._settle(
+                        name, TimeoutError(f"{name} missed its {limit}s deadline")))
+
+        return {name: results[name] for name in self.tasks}
+
+
+def fan_out(calls: Dict[str, Callable[[], Any]], max_workers: int = DEFAULT_WORKERS,
+            deadline: float = DEFAULT_DEADLINE,
+            fallback: Callable[[str, Exception], Any] = None) -> Dict[str, Any]:
+    """Run independent calls concurrently and return {key: result} in input order
+
+    `fallback(key, error)` supplies the result of a call that fails or misses
+    its deadline.
+    """
+    graph = TaskGraph(max_workers=max_workers, deadline=deadline)
+    for key, call in calls.items():
+        graph.add(key, lambda _, call=call: call(),
+                  fallback=(lambda error, key=key: fallback(key, error)) if fallback else None)
+    return graph.run()
+
+
+# ============================================================================
+# DEMO
+# ============================================================================
+
+if __name__ == "__main__":
+    # Seven "LLM calls" of 0.5s each, as in stage 3 of the What-If workflow
+    domains = ["economy", "healthcare", "infrastructure", "education",
+               "technology", "social_systems", "individual_behavior"]
+
+    def slow_call(domain):
+        time.sleep(0.5)
+        return f"impacts for {domain}"
+
+    start = time.perf_counter()
+    sequential = {domain: slow_call(domain) for domain in domains}
+    print(f"Sequential:          {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    concurrent = fan_out({domain: (lambda domain=domain: slow_call(domain)) for domain in domains})
+    print(f"Fan-out (4 workers): {time.perf_counter() - start:.2f}s")
+    assert concurrent == sequential
+
+    # A call that misses its deadline gets its fallback; the rest are unaffected
+    start = time.perf_counter()
+    results = fan_out({"fast": lambda: "ok", "stuck": lambda: time.sleep(5)}, deadline=0.3,
+                      fallback=lambda key, error: f"fallback ({error})")
+    print(f"Deadline demo:       {time.perf_counter() - start:.2f}s {results}")
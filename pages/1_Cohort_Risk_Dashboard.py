@@ -0,0 +1,141 @@
+"""
+Cohort Risk Dashboard - Population Statistics over Lab Reports
+Analyzes uploaded multi-report lab exports (or JSON Lines results from
+report_stream.py) and shows abnormal rates per analyte, pattern prevalence
+and the risk-level distribution for a chosen time window. Each upload is
+aggregated once and cached; the partial aggregates are merged for display.
+"""
+
+import codecs
+import io
+import json
+import os
+import sys
+
+import pandas as pd
+import streamlit as st
+
+HEALTH_INSIGHTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                   "health_insights")
+if HEALTH_INSIGHTS_DIR not in sys.path:
+    sys.path.insert(0, HEALTH_INSIGHTS_DIR)
+
+from cohort_aggregator import CohortAggregator, report_date  # noqa: E402
+from health_insights_agent import create_health_insights_agent  # noqa: E402
+from report_stream import DEFAULT_DELIMITER, iter_reports  # noqa: E402
+
+st.set_page_config(page_title="Cohort Risk Dashboard", page_icon="📊", layout="wide")
+
+
+# ============================================================================
+# AGGREGATION (cached per upload)
+# ============================================================================
+
+@st.cache_data(show_spinner=False)
+def aggregate_upload(name: str, content: bytes, delimiter: str, gender: str, bucket: str) -> dict:
+    """Aggregate one uploaded file; returns CohortAggregator.to_dict()"""
+    aggregator = CohortAggregator(bucket)
+    text = content.decode("utf-8", errors="replace")
+
+    if name.lower().endswith((".jsonl", ".ndjson")):
+        for line in text.splitlines():
+            if line.strip():
+                aggregator.add_result(json.loads(line))
+        return aggregator.to_dict()
+
+    dates = {}
+
+    def reports():
+        for index, report_text in enumerate(iter_reports(io.StringIO(text), delimiter)):
+            dates[index] = report_date(report_text)
+            yield report_text
+
+    agent = create_health_insights_agent()
+    aggregator.add_results(agent.run_batch(reports(), workers=1, gender=gender), dates)
+    return aggregator.to_dict()
+
+
+@st.cache_data(show_spinner=False)
+def aggregate_demo(count: int, gender: str, bucket: str) -> dict:
+    """A synthetic cohort, for trying the dashboard without real data"""
+    from synthetic_reports import generate_reports
+
+    texts = list(generate_reports(count, analytes_per_report=10, noise=0.3))
+    dates = {index: report_date(report_text) for index, report_text in enumerate(texts)}
+    agent = create_health_insights_agent()
+    aggregator = CohortAggregator(bucket)
+    aggregator.add_results(agent.run_batch(texts, workers=1, gender=gender), dates)
+    return aggregator.to_dict()
+
+
+# ============================================================================
+# PAGE
+# ============================================================================
+
+st.title("📊 Cohort Risk Dashboard")
+st.warning("⚠️ Educational population statistics only - not a medical diagnosis.")
+
+with st.sidebar:
+    st.markdown("### Data")
+    uploads = st.file_uploader("Lab exports (.txt) or results (.jsonl)",
+                               type=["txt", "jsonl", "ndjson"], accept_multiple_files=True)
+    delimiter = st.text_input("Report delimiter", value=DEFAULT_DELIMITER.encode("unicode_escape").decode())
+    gender = st.selectbox("Reference ranges", ["general", "male", "female"])
+    bucket = st.selectbox("Time bucket", ["day", "month", "hour"])
+    demo_size = st.number_input("Synthetic demo reports (0 = off)", min_value=0, max_value=50000,
+                                value=0 if uploads else 2000, step=500)
+
+delimiter = codecs.decode(delimiter, "unicode_escape")
+aggregator = CohortAggregator(bucket)
+with st.spinner("Analyzing reports..."):
+    for upload in uploads or []:
+        aggregator.merge(CohortAggregator.from_dict(
+            aggregate_upload(upload.name, upload.getvalue(), delimiter, gender, bucket)
+        ))
+    if demo_size:
+        aggregator.merge(CohortAggregator.from_dict(aggregate_demo(int(demo_size), gender, bucket)))
+
+if not aggregator.buckets:
+    st.info("Upload a lab export or enable the synthetic demo cohort in the sidebar.")
+    st.stop()
+
+keys = sorted(aggregator.buckets)
+if len(keys) > 1:
+    start, end = st.select_slider("Time window", options=keys, value=(keys[0], keys[-1]))
+else:
+    start = end = keys[0]
+summary = aggregator.query(start, end).summary()
+
+reports = summary["reports"]
+high_share = summary["risk_distribution"]["high"]["share"]
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Reports", f"{reports:,}")
+col2.metric("High risk", f"{high_share:.1%}")
+col3.metric("Mean risk score", f"{summary['mean_risk_score']:.2f}")
+col4.metric("Failed reports", f"{summary['failed']:,}")
+
+left, right = st.columns(2)
+with left:
+    st.markdown("### Risk level distribution")
+    st.bar_chart(pd.DataFrame(
+        {"reports": {level: data["count"] for level, data in summary["risk_distribution"].items()}}
+    ))
+with right:
+    st.markdown("### Pattern prevalence")
+    if summary["pattern_prevalence"]:
+        patterns = pd.DataFrame(summary["pattern_prevalence"]).set_index("pattern")
+        st.bar_chart(patterns["prevalence"])
+    else:
+        st.write("No patterns detected in this window.")
+
+st.markdown("### Abnormal rate by analyte")
+analytes = pd.DataFrame(summary["analytes"])
+if not analytes.empty:
+    st.bar_chart(analytes.set_index("name")["abnormal_rate"])
+    st.dataframe(analytes[["name", "results", "low", "high", "abnormal_rate", "mean", "min", "max",
+                           "unit"]], use_container_width=True, hide_index=True)
+
+timeline = pd.DataFrame(aggregator.timeline())
+if len(timeline) > 1:
+    st.markdown("### Over time")
+    st.line_chart(timeline.set_index("bucket")[["reports", "high_risk_share"]])
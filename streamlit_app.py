@@ -4,12 +4,15 @@ Main entry point for Streamlit Cloud deployment
 """
 
 import streamlit as st
-from strands import Agent, tool
-from datetime import datetime
-import threading
-from queue import Queue
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sys
 import time
 
+# strands and the agent tools are imported lazily by build_agent() so the
+# page can render while the agent is still being built
+AGENTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "agents")
+
 # ============================================================================
 # PAGE CONFIG
 # ============================================================================
@@ -21,217 +24,6 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# ============================================================================
-# TOOLS (Same as CLI version)
-# ============================================================================
-
-@tool
-def assess_vitals(systolic: int, diastolic: int, heart_rate: int) -> dict:
-    """Evaluates blood pressure and heart rate, flags if abnormal."""
-    assessment = {
-        "timestamp": datetime.now().isoformat(),
-        "systolic": systolic,
-        "diastolic": diastolic,
-        "heart_rate": heart_rate,
-        "bp_status": "",
-        "hr_status": "",
-        "flags": []
-    }
-    
-    if systolic < 90 or diastolic < 60:
-        assessment["bp_status"] = "low"
-        assessment["flags"].append("Low blood pressure - may cause dizziness")
-    elif systolic < 120 and diastolic < 80:
-        assessment["bp_status"] = "normal"
-    elif systolic < 130 and diastolic < 80:
-        assessment["bp_status"] = "elevated"
-        assessment["flags"].append("Slightly elevated - monitor and manage stress")
-    elif systolic < 140 or diastolic < 90:
-        assessment["bp_status"] = "stage1_hypertension"
-        assessment["flags"].append("Stage 1 hypertension - lifestyle changes recommended")
-    else:
-        assessment["bp_status"] = "stage2_hypertension"
-        assessment["flags"].append("Stage 2 hypertension - medical attention recommended")
-    
-    if heart_rate < 60:
-        assessment["hr_status"] = "low"
-        assessment["flags"].append("Resting heart rate is low - may be normal for athletes")
-    elif heart_rate <= 100:
-        assessment["hr_status"] = "normal"
-    else:
-        assessment["hr_status"] = "elevated"
-        assessment["flags"].append("Elevated heart rate - check if stressed or unwell")
-    
-    return assessment
-
-
-@tool
-def check_symptoms(symptoms: list[str]) -> dict:
-    """Cross-references symptoms and returns possible conditions ranked by likelihood."""
-    symptom_conditions = {
-        "headache": ["tension headache", "migraine", "dehydration", "high blood pressure"],
-        "chest pain": ["anxiety", "muscle strain", "heartburn", "heart condition"],
-        "shortness of breath": ["anxiety", "asthma", "heart condition", "infection"],
-        "dizziness": ["low blood pressure", "dehydration", "inner ear issue", "anxiety"],
-        "fatigue": ["anemia", "thyroid issue", "depression", "sleep deprivation"],
-        "nausea": ["food poisoning", "medication side effect", "anxiety", "infection"],
-        "fever": ["infection", "flu", "cold", "inflammation"],
-        "cough": ["cold", "flu", "asthma", "allergies"],
-        "sore throat": ["strep throat", "cold", "flu", "allergies"],
-        "joint pain": ["arthritis", "injury", "inflammation", "overuse"],
-    }
-    
-    conditions_found = {}
-    for symptom in symptoms:
-        symptom_lower = symptom.lower()
-        if symptom_lower in symptom_conditions:
-            for condition in symptom_conditions[symptom_lower]:
-                conditions_found[condition] = conditions_found.get(condition, 0) + 1
-    
-    ranked = sorted(conditions_found.items(), key=lambda x: x[1], reverse=True)
-    
-    return {
-        "symptoms_checked": symptoms,
-        "possible_conditions": [{"condition": c, "relevance": r} for c, r in ranked[:5]],
-        "disclaimer": "These are possibilities only - a real doctor needs to examine you for diagnosis"
-    }
-
-
-@tool
-def check_drug_interaction(drugs: list[str]) -> dict:
-    """Checks for known dangerous interactions between medications."""
-    interactions = {
-        ("metformin", "lisinopril"): {"severity": "low", "note": "No major interaction"},
-        ("aspirin", "warfarin"): {"severity": "high", "note": "Increased bleeding risk"},
-        ("metformin", "alcohol"): {"severity": "moderate", "note": "May increase lactic acidosis risk"},
-        ("lisinopril", "potassium"): {"severity": "moderate", "note": "May raise potassium levels"},
-    }
-    
-    result = {
-        "drugs_checked": drugs,
-        "interactions": [],
-        "safe": True
-    }
-    
-    for i, drug1 in enumerate(drugs):
-        for drug2 in drugs[i+1:]:
-            key1 = (drug1.lower(), drug2.lower())
-            key2 = (drug2.lower(), drug1.lower())
-            
-            if key1 in interactions:
-                result["interactions"].append({
-                    "drugs": [drug1, drug2],
-                    **interactions[key1]
-                })
-                if interactions[key1]["severity"] in ["high", "moderate"]:
-                    result["safe"] = False
-            elif key2 in interactions:
-                result["interactions"].append({
-                    "drugs": [drug2, drug1],
-                    **interactions[key2]
-                })
-                if interactions[key2]["severity"] in ["high", "moderate"]:
-                    result["safe"] = False
-    
-    return result
-
-
-@tool
-def get_treatment_guidelines(condition: str) -> dict:
-    """Pulls plain English treatment guidelines for a given condition."""
-    guidelines = {
-        "high blood pressure": {
-            "condition": "High Blood Pressure (Hypertension)",
-            "simple_explanation": "Your heart is working harder than it needs to, which can strain your blood vessels over time.",
-            "lifestyle_changes": [
-                "Cut back on salt - aim for less than 2,300mg per day",
-                "Drink more water - helps your kidneys regulate pressure",
-                "Move your body - even 20-30 min walks most days help",
-                "Manage stress - try deep breathing or meditation",
-                "Limit alcohol - no more than 1-2 drinks per day"
-            ],
-            "when_to_see_doctor": "If readings stay above 140/90 or you feel chest pain, shortness of breath, or severe headaches"
-        },
-        "anxiety": {
-            "condition": "Anxiety",
-            "simple_explanation": "Your body is in 'alert mode' even when there's no real danger. This is treatable.",
-            "lifestyle_changes": [
-                "Deep breathing - try 4 counts in, 4 counts out",
-                "Regular exercise - helps burn off nervous energy",
-                "Limit caffeine - can make anxiety worse",
-                "Get good sleep - aim for 7-9 hours",
-                "Talk to someone - friends, family, or a therapist"
-            ],
-            "when_to_see_doctor": "If anxiety interferes with daily life or doesn't improve with lifestyle changes"
-        },
-        "tension headache": {
-            "condition": "Tension Headache",
-            "simple_explanation": "Muscles in your neck and scalp are tight, usually from stress or poor posture.",
-            "lifestyle_changes": [
-                "Relax your shoulders - they're probably tense",
-                "Take breaks from screens - every 30 minutes",
-                "Stretch your neck gently - slow, no bouncing",
-                "Stay hydrated - dehydration triggers headaches",
-                "Apply heat or cold - whatever feels better"
-            ],
-            "when_to_see_doctor": "If headaches are severe, frequent, or different from your usual pattern"
-        }
-    }
-    
-    condition_lower = condition.lower()
-    if condition_lower in guidelines:
-        return guidelines[condition_lower]
-    else:
-        return {
-            "condition": condition,
-            "note": "I don't have specific guidelines for this condition. Please consult a healthcare provider.",
-            "disclaimer": "Always see a real doctor for proper diagnosis and treatment"
-        }
-
-
-@tool
-def summarize_patient_session(notes: str) -> dict:
-    """Summarizes everything discussed in the conversation into a clean health report."""
-    return {
-        "session_date": datetime.now().isoformat(),
-        "session_summary": notes,
-        "next_steps": [
-            "Follow up with your primary care doctor",
-            "Monitor any changes in symptoms",
-            "Keep track of vital signs if applicable",
-            "Note any new symptoms that develop"
-        ],
-        "disclaimer": "This summary is for your records only and does not replace professional medical advice"
-    }
-
-
-@tool
-def search_medical_knowledge(query: str) -> dict:
-    """Searches medical knowledge base for relevant information."""
-    knowledge_base = {
-        "blood pressure": "Blood pressure is the force of blood pushing against artery walls. Normal is below 120/80. High blood pressure (hypertension) increases risk of heart disease and stroke.",
-        "heart rate": "Normal resting heart rate is 60-100 beats per minute. Athletes may have lower rates. Stress, caffeine, and illness can raise it.",
-        "stress": "Chronic stress can raise blood pressure, weaken immunity, and cause headaches. Managing stress through exercise, sleep, and relaxation helps.",
-        "metformin": "A diabetes medication that helps control blood sugar. Take with food to avoid stomach upset. Can interact with alcohol.",
-        "lisinopril": "A blood pressure medication (ACE inhibitor). May cause a dry cough. Take at the same time each day.",
-    }
-    
-    query_lower = query.lower()
-    for key, value in knowledge_base.items():
-        if key in query_lower:
-            return {
-                "query": query,
-                "result": value,
-                "source": "Clinical knowledge base"
-            }
-    
-    return {
-        "query": query,
-        "result": "No specific information found. Please consult a healthcare provider.",
-        "source": "Clinical knowledge base"
-    }
-
-
 # ============================================================================
 # AGENT SETUP
 # ============================================================================
@@ -267,49 +59,110 @@ def stream_response(response_text):
         placeholder.write(full_text)
         time.sleep(0.02)  # Small delay between words for streaming effect
 
-system_prompt = """You are a friendly and knowledgeable clinical assistant. You talk to patients in simple, warm, plain English — never cold or robotic.
+def build_agent():
+    """Import strands and the clinical tools, then construct the agent."""
+    if AGENTS_DIR not in sys.path:
+        sys.path.insert(0, AGENTS_DIR)
+    from clinical_tools import create_clinical_agent
+    return create_clinical_agent()
 
-KEY BEHAVIORS:
-1. When someone shares a symptom or vital, acknowledge how they feel first, then ask ONE natural follow-up question
-2. Listen carefully and remember everything they tell you
-3. Once you have enough context, transition smoothly into simple practical advice
-4. Never keep asking questions without eventually giving guidance
-5. If a patient says "no" to a symptom, acknowledge it and either ask one more relevant question OR move into advice naturally
-6. Mirror the patient's energy - if casual, be casual; if worried, be warm and reassuring
-7. Always remind users to see a real doctor for anything serious
-8. End responses with a natural follow-up question to keep conversation going
-9. Never dump all information at once - share one key insight at a time
 
-TONE: Like a friendly, experienced doctor who actually listens and explains things clearly.
+@st.cache_resource
+def start_agent_warmup():
+    """Start building the agent in the background, once per server process."""
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agent-warmup")
+    return executor.submit(build_agent)
 
-DISCLAIMER: Always remind patients that you're a clinical assistant, not a replacement for real medical care. For serious concerns, they need to see a real doctor."""
 
-@st.cache_resource
 def get_agent():
-    """Initialize the agent once and cache it."""
-    return Agent(
-        model="us.amazon.nova-2-lite-v1:0",
-        tools=[
-            assess_vitals,
-            check_symptoms,
-            check_drug_interaction,
-            get_treatment_guidelines,
-            summarize_patient_session,
-            search_medical_knowledge
-        ],
-        system_prompt=system_prompt
-    )
+    """Return the shared agent, waiting for the warmup if it is still running."""
+    try:
+        return start_agent_warmup().result()
+    except Exception:
+        # Don't cache a failed build; the next request retries it
+        start_agent_warmup.clear()
+        raise
+
+
+# ============================================================================
+# CHAT HISTORY
+# ============================================================================
+
+# Only the latest page of messages is rendered on each rerun; older messages
+# are loaded a page at a time on demand, so reruns don't slow down as the
+# conversation grows.
+HISTORY_PAGE_SIZE = 20
+
+
+def format_message_markdown(content):
+    """Prepare message text for st.markdown (runs once per message, not per rerun)."""
+    # Streamlit renders $...$ as LaTeX, so escape dollar signs in chat text
+    text = content.replace("$", "\\$")
+    # Keep the agent's line breaks instead of collapsing them into one paragraph
+    return text.replace("\n", "  \n")
+
+
+def add_message(role, content, kind="text"):
+    """Append a message to the chat history along with its rendered markdown.
+
+    kind is "text" or "error"; errors are redrawn with st.error on reruns.
+    """
+    st.session_state.messages.append({
+        "role": role,
+        "content": content,
+        "kind": kind,
+        "markdown": format_message_markdown(content)
+    })
+
+
+def render_message(message):
+    """Draw one history message in its chat bubble."""
+    # Messages stored before "markdown"/"kind" were added only have role/content
+    container = st.chat_message(message["role"])
+    markdown = message.get("markdown", message["content"])
+    if message.get("kind") == "error":
+        container.error(markdown)
+    else:
+        container.markdown(markdown)
+
+
+def load_older_messages():
+    """Widen the history window by one page."""
+    st.session_state.history_window += HISTORY_PAGE_SIZE
+
+
+# A fragment, so paging in older messages only redraws the history
+@st.fragment
+def render_chat_history():
+    """Render the most recent messages, with a button to page in older ones."""
+    messages = st.session_state.messages
+    window = st.session_state.history_window
+    hidden = len(messages) - window
+    
+    if hidden > 0:
+        st.button(
+            f"⬆️ Load older messages ({hidden} hidden)",
+            on_click=load_older_messages,
+            use_container_width=True,
+            key="btn_load_older"
+        )
+    
+    for message in messages[-window:]:
+        render_message(message)
 
 
 # ============================================================================
 # STREAMLIT UI
 # ============================================================================
 
+# Kick off agent construction without blocking the first page render
+start_agent_warmup()
+
 # Initialize session state FIRST (before any UI elements)
 if "messages" not in st.session_state:
     st.session_state.messages = []
-if "agent" not in st.session_state:
-    st.session_state.agent = get_agent()
+if "history_window" not in st.session_state:
+    st.session_state.history_window = HISTORY_PAGE_SIZE
 if "patient" not in st.session_state:
     st.session_state.patient = None
 if "show_registration" not in st.session_state:
@@ -392,6 +245,7 @@ if st.session_state.patient:
     if st.button("🔄 Change Patient"):
         st.session_state.patient = None
         st.session_state.messages = []
+        st.session_state.history_window = HISTORY_PAGE_SIZE
         st.session_state.show_registration = True
         st.rerun()
     
@@ -428,20 +282,16 @@ with st.sidebar:
 # Chat display
 st.markdown("### 💬 Conversation")
 
-# Display chat history
-for message in st.session_state.messages:
-    if message["role"] == "user":
-        st.chat_message("user").write(message["content"])
-    else:
-        st.chat_message("assistant").write(message["content"])
+# Display chat history (latest page only)
+render_chat_history()
 
 # Chat input
 user_input = st.chat_input("Tell me about your health concern...")
 
 if user_input:
     # Add user message to history
-    st.session_state.messages.append({"role": "user", "content": user_input})
-    st.chat_message("user").write(user_input)
+    add_message("user", user_input)
+    render_message(st.session_state.messages[-1])
     
     # Get agent response
     with st.spinner("Thinking..."):
@@ -453,16 +303,18 @@ if user_input:
                 patient_context = f"\n\n[Patient Context: Name: {patient['name']}, Age: {patient['age']}, Gender: {patient['gender']}]"
             
             full_input = user_input + patient_context
+            if "agent" not in st.session_state:
+                st.session_state.agent = get_agent()
             response = process_agent_request(full_input, st.session_state.agent)
-            st.session_state.messages.append({"role": "assistant", "content": response})
+            add_message("assistant", response)
             
             # Stream the response
             with st.chat_message("assistant"):
                 stream_response(response)
         except Exception as e:
             error_msg = f"I encountered an issue: {str(e)}"
-            st.session_state.messages.append({"role": "assistant", "content": error_msg})
-            st.chat_message("assistant").error(error_msg)
+            add_message("assistant", error_msg, kind="error")
+            render_message(st.session_state.messages[-1])
 
 # Footer
 st.markdown("---")